@@ -0,0 +1,241 @@
+"""
+Benchmark de latencia de la cadena de Q&A (ask_question)
+
+Repite un corpus de preguntas por el pipeline completo (parser, caché de
+Cypher, generación de Cypher, consulta a Neo4j y respuesta) y reporta los
+percentiles p50/p95/p99 de cada etapa, medidos con los "timings" de
+ask_question().
+
+Por defecto usa el backend "local" (LocalCypherLLM) con una latencia fija
+por llamada: así se mide el costo propio del pipeline separado de la
+velocidad del modelo. Con --backend ollama se mide contra el modelo real.
+
+Etapas:
+    intent   preparación: parser, caché de Cypher (en búsquedas estructuradas
+             incluye su consulta a Neo4j)
+    cypher   generación del Cypher (0 si vino del caché)
+    rows     consulta del Cypher en Neo4j
+    answer   respuesta armada desde las filas o redactada por el LLM
+    total    pregunta completa
+
+Uso:
+    python benchmark_qa.py                           # LLM local, Neo4j real
+    python benchmark_qa.py --en-memoria              # sin Neo4j ni Ollama
+    python benchmark_qa.py --backend ollama --corpus preguntas.txt
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import numpy as np
+from langchain_community.graphs.graph_store import GraphStore
+from workflow.langchain_integration import ask_question, create_housing_qa, get_cypher_cache
+from workflow.llm_backends import LocalCypherLLM, create_llm
+from workflow.qa_service import HousingQAService, set_qa_service
+
+CORPUS_DEFECTO = [
+    "Casas en Godoy Cruz con 2 ambientes a menos de 550000",
+    "departamentos en capital hasta 300 mil",
+    "¿Cuántas propiedades hay en total?",
+    "¿Qué barrios tienen más propiedades?",
+    "Busca casas en Ciudad de Mendoza",
+    "casas en maipu hasta 400 mil",
+    "Propiedades cerca de un hospital con cochera",
+    "Casas con pileta y jardín en Luján de Cuyo",
+    "¿Por qué las casas en Chacras de Coria son más caras?",
+    "¿Conviene alquilar en Guaymallén o en Las Heras?",
+    "Lofts luminosos para una persona",
+    "Casas con pileta y jardín en Maipú",
+]
+
+ETAPAS = ("intent", "cypher", "rows", "answer", "total")
+
+CIUDADES_MEMORIA = ("capital", "godoy cruz", "guaymallen", "lujan de cuyo", "maipu", "las heras")
+
+ESQUEMA_MEMORIA = {
+    "node_props": {
+        "Property": [{"property": "name", "type": "STRING"}, {"property": "price", "type": "FLOAT"},
+                     {"property": "rooms", "type": "INTEGER"}, {"property": "bedrooms", "type": "INTEGER"}],
+        "Address": [{"property": "city", "type": "STRING"}, {"property": "neighborhood", "type": "STRING"}],
+    },
+    "rel_props": {},
+    "relationships": [{"start": "Property", "type": "HAS_ADDRESS", "end": "Address"}],
+    "metadata": {"constraint": [], "index": []},
+}
+
+
+def filas_en_memoria(cypher: str, cantidad: int = 10) -> List[Dict[str, Any]]:
+    """Filas sintéticas con las columnas que devolvería el Cypher en Neo4j"""
+    rnd = random.Random(cypher)
+    if "AS total" in cypher or ("count(p)" in cypher and "AS cantidad" not in cypher):
+        return [{"total": rnd.randint(0, 5000)}]
+    if "AS barrio" in cypher:
+        return [{"barrio": c, "cantidad": rnd.randint(1, 900)} for c in CIUDADES_MEMORIA]
+    filas = []
+    for i in range(cantidad):
+        ciudad = rnd.choice(CIUDADES_MEMORIA)
+        filas.append({"p.name": f"Propiedad {i + 1}", "p.price": float(rnd.randint(80, 900) * 1000),
+                      "p.rooms": rnd.randint(1, 5), "a.city": ciudad, "a.neighborhood": ciudad})
+    return sorted(filas, key=lambda f: f["p.price"])
+
+
+class GrafoEnMemoria(GraphStore):
+    """Grafo para la cadena que devuelve filas sintéticas tras `latencia` segundos"""
+
+    _driver = None
+
+    def __init__(self, latencia: float = 0.0):
+        self.latencia = latencia
+
+    @property
+    def get_schema(self) -> str:
+        return "Property (name, price, rooms, bedrooms) -[:HAS_ADDRESS]-> Address (city, neighborhood)"
+
+    @property
+    def get_structured_schema(self) -> Dict[str, Any]:
+        return ESQUEMA_MEMORIA
+
+    def query(self, query: str, params: dict = {}) -> List[Dict[str, Any]]:
+        time.sleep(self.latencia)
+        return filas_en_memoria(query)
+
+    def refresh_schema(self) -> None:
+        pass
+
+    def add_graph_documents(self, graph_documents, include_source: bool = False) -> None:
+        raise NotImplementedError("El grafo en memoria es de solo lectura")
+
+
+class ConectorEnMemoria:
+    """Neo4jConnector mínimo para las búsquedas estructuradas del parser"""
+
+    def __init__(self, latencia: float = 0.0):
+        self.latencia = latencia
+
+    def is_connected(self) -> bool:
+        return True
+
+    @contextmanager
+    def get_session(self):
+        yield self
+
+    def run(self, cypher: str, **parametros):
+        time.sleep(self.latencia)
+        return filas_en_memoria(cypher)
+
+
+def percentiles(muestras: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 (en ms) de una lista de muestras"""
+    if not muestras:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    p50, p95, p99 = np.percentile(np.asarray(muestras), [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+
+def medir(preguntas: List[str], repeticiones: int = 3, connector=None,
+          sin_cache: bool = False) -> Dict[str, Any]:
+    """
+    Pasa el corpus `repeticiones` veces por ask_question y junta los tiempos
+
+    Args:
+        preguntas: Corpus de preguntas
+        repeticiones: Vueltas completas al corpus
+        connector: Conector para las búsquedas estructuradas (por defecto el compartido)
+        sin_cache: Vaciar el caché de Cypher antes de cada pregunta
+
+    Returns:
+        Dict con 'etapas' ({etapa: [ms]}), 'por_origen' ({origen: [ms totales]}),
+        'origenes' ({origen: cantidad}) y 'errores' ([(pregunta, error)])
+    """
+    etapas: Dict[str, List[float]] = defaultdict(list)
+    por_origen: Dict[str, List[float]] = defaultdict(list)
+    errores = []
+    for _ in range(repeticiones):
+        for pregunta in preguntas:
+            if sin_cache:
+                get_cypher_cache().clear()
+            resultado = ask_question(pregunta, connector)
+            if not resultado.get("success") or "timings" not in resultado:
+                errores.append((pregunta, resultado.get("error", "sin tiempos")))
+                continue
+            for etapa, ms in resultado["timings"].items():
+                etapas[etapa].append(ms)
+            if resultado.get("cached"):
+                origen = "caché"
+            elif "raw_cypher" in resultado:
+                origen = "llm + respuesta del llm" if resultado.get("llm_answer") else "llm"
+            else:
+                origen = "parser"
+            por_origen[origen].append(resultado["timings"]["total"])
+    origenes = {origen: len(muestras) for origen, muestras in por_origen.items()}
+    return {"etapas": dict(etapas), "por_origen": dict(por_origen), "origenes": origenes, "errores": errores}
+
+
+def imprimir_reporte(medicion: Dict[str, Any]):
+    """Tabla de percentiles por etapa y por origen del Cypher"""
+    print(f"\n{'Etapa':<28}{'n':>6}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}")
+    print("-" * 70)
+    for etapa in ETAPAS:
+        muestras = medicion["etapas"].get(etapa, [])
+        p = percentiles(muestras)
+        print(f"{etapa:<28}{len(muestras):>6}{p['p50']:>12.2f}{p['p95']:>12.2f}{p['p99']:>12.2f}")
+
+    print(f"\n{'Total por origen':<28}{'n':>6}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}")
+    print("-" * 70)
+    for origen, muestras in sorted(medicion["por_origen"].items()):
+        p = percentiles(muestras)
+        print(f"{origen:<28}{len(muestras):>6}{p['p50']:>12.2f}{p['p95']:>12.2f}{p['p99']:>12.2f}")
+
+    if medicion["errores"]:
+        print(f"\n⚠️ {len(medicion['errores'])} preguntas fallaron:")
+        for pregunta, error in medicion["errores"][:5]:
+            print(f"   • {pregunta}: {error}")
+
+
+def preparar_servicio(backend: str, latencia_llm: float, latencia_token: float,
+                      en_memoria: bool, latencia_neo4j: float) -> Optional[ConectorEnMemoria]:
+    """Instala el servicio de Q&A con el LLM y el grafo pedidos; devuelve el conector a usar"""
+    if backend == "local":
+        llm = LocalCypherLLM(latency=latencia_llm, token_latency=latencia_token)
+    else:
+        llm = create_llm(backend)
+    graph = GrafoEnMemoria(latencia_neo4j) if en_memoria else None
+    set_qa_service(HousingQAService(factory=lambda: create_housing_qa(llm=llm, graph=graph)))
+    return ConectorEnMemoria(latencia_neo4j) if en_memoria else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide p50/p95/p99 por etapa de la cadena de Q&A")
+    parser.add_argument("--corpus", help="Archivo con una pregunta por línea (default: corpus incluido)")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Vueltas al corpus (default: %(default)s)")
+    parser.add_argument("--backend", default="local", help="Backend de LLM: local, ollama, ... (default: %(default)s)")
+    parser.add_argument("--latencia-llm", type=float, default=0.5,
+                        help="Segundos por llamada del LLM local (default: %(default)s)")
+    parser.add_argument("--latencia-token", type=float, default=0.01,
+                        help="Segundos por palabra transmitida por el LLM local (default: %(default)s)")
+    parser.add_argument("--en-memoria", action="store_true", help="Usar un grafo en memoria en lugar de Neo4j")
+    parser.add_argument("--latencia-neo4j", type=float, default=0.005,
+                        help="Segundos por consulta del grafo en memoria (default: %(default)s)")
+    parser.add_argument("--sin-cache", action="store_true", help="Vaciar el caché de Cypher antes de cada pregunta")
+    args = parser.parse_args()
+
+    preguntas = CORPUS_DEFECTO
+    if args.corpus:
+        with open(args.corpus, "r", encoding="utf-8") as f:
+            preguntas = [linea.strip() for linea in f if linea.strip() and not linea.startswith("#")]
+
+    print("\n" + "=" * 70)
+    print("⏱️  BENCHMARK DE LA CADENA DE Q&A")
+    print("=" * 70)
+    print(f"📋 {len(preguntas)} preguntas x {args.repeticiones} vueltas | backend: {args.backend} | "
+          f"grafo: {'en memoria' if args.en_memoria else 'Neo4j'}")
+
+    conector = preparar_servicio(args.backend, args.latencia_llm, args.latencia_token,
+                                 args.en_memoria, args.latencia_neo4j)
+    inicio = time.perf_counter()
+    medicion = medir(preguntas, args.repeticiones, conector, args.sin_cache)
+    print(f"\n✅ {sum(medicion['origenes'].values())} preguntas en {time.perf_counter() - inicio:.1f} s")
+    imprimir_reporte(medicion)
@@ -0,0 +1,164 @@
+"""
+Conector Neo4j Asíncrono - Sistema de Recomendación de Viviendas
+Variante de Neo4jConnector construida sobre el AsyncDriver de neo4j.
+
+Permite mantener muchas consultas en vuelo desde un solo proceso (handlers
+async de Gradio, planificadores de demonios con asyncio) sin ocupar un hilo
+por consulta. Usa las mismas consultas Cypher que el conector síncrono.
+
+Uso:
+    async with AsyncNeo4jConnector() as connector:
+        stats = await connector.get_database_stats()
+"""
+
+from typing import List, Dict, Any, Optional
+from neo4j import AsyncGraphDatabase
+from models.frame_models import PropertyFrame, UserFrame, AmenityFrame
+from database.neo4j_connector import (
+    PROPERTY_QUERY,
+    USER_QUERY,
+    STATS_QUERY,
+    property_row,
+    user_row,
+    amenity_query,
+    amenity_params,
+)
+
+
+class AsyncNeo4jConnector:
+    """Conector asíncrono para base de datos Neo4j"""
+
+    def __init__(self, uri="bolt://localhost:7687", user="neo4j", password="password", database="housing",
+                 max_connection_pool_size: int = 50, connection_acquisition_timeout: float = 30.0,
+                 liveness_check_timeout: Optional[float] = None):
+        """
+        Prepara la conexión a Neo4j (la conexión se abre con `await connect()`
+        o al entrar en `async with`)
+
+        Args:
+            uri: URI de conexión a Neo4j
+            user: Usuario de Neo4j
+            password: Contraseña de Neo4j
+            database: Nombre de la base de datos (housing)
+            max_connection_pool_size: Conexiones máximas en el pool del driver
+            connection_acquisition_timeout: Segundos máximos esperando una conexión libre del pool
+            liveness_check_timeout: Conexiones ociosas por más de estos segundos se verifican
+                antes de reutilizarse (None = sin verificación)
+        """
+        self.uri = uri
+        self.database = database
+        self._auth = (user, password)
+        self._pool_options = {
+            "max_connection_pool_size": max_connection_pool_size,
+            "connection_acquisition_timeout": connection_acquisition_timeout,
+            "liveness_check_timeout": liveness_check_timeout,
+        }
+        self.driver = None
+
+    async def connect(self) -> bool:
+        """Crea el AsyncDriver y verifica la base de datos"""
+        try:
+            self.driver = AsyncGraphDatabase.driver(self.uri, auth=self._auth, **self._pool_options)
+            async with self.driver.session(database=self.database) as session:
+                result = await session.run("RETURN 1")
+                await result.consume()
+            print(f"✅ Conexión asíncrona a Neo4j establecida (base de datos: {self.database})")
+            return True
+        except Exception as e:
+            print(f"❌ Error conectando a Neo4j: {e}")
+            print(f"💡 Asegúrate de que Neo4j esté ejecutándose en {self.uri}")
+            if self.driver:
+                await self.driver.close()
+            self.driver = None
+            return False
+
+    async def close(self):
+        """Cierra la conexión a Neo4j"""
+        if self.driver:
+            await self.driver.close()
+            self.driver = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+        return False
+
+    def is_connected(self):
+        """Verifica si hay conexión activa"""
+        return self.driver is not None
+
+    def get_session(self):
+        """Obtiene una sesión asíncrona para la base de datos específica (usar con `async with`)"""
+        return self.driver.session(database=self.database)
+
+    async def run_query(self, query: str, **params) -> List[Dict[str, Any]]:
+        """Ejecuta una consulta y devuelve los registros como diccionarios"""
+        if not self.is_connected():
+            return []
+
+        async with self.get_session() as session:
+            result = await session.run(query, **params)
+            return await result.data()
+
+    async def write_rows(self, query: str, rows: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        """
+        Ejecuta una consulta `UNWIND $rows` en transacciones de `batch_size` filas
+
+        Returns:
+            Cantidad de filas escritas
+        """
+        if not self.is_connected():
+            return 0
+
+        async def write_rows_tx(tx, batch):
+            result = await tx.run(query, rows=batch)
+            await result.consume()
+
+        async with self.get_session() as session:
+            for start in range(0, len(rows), batch_size):
+                await session.execute_write(write_rows_tx, rows[start:start + batch_size])
+        return len(rows)
+
+    async def create_property(self, property_frame: PropertyFrame):
+        """Crea un nodo Property con su dirección y amenidades cercanas (una sola consulta)"""
+        if not self.is_connected():
+            return False
+
+        await self.write_rows(PROPERTY_QUERY, [property_row(property_frame)])
+        return True
+
+    async def create_properties(self, property_frames: List[PropertyFrame], batch_size: int = 500) -> int:
+        """Crea varias propiedades en lotes (una consulta por lote)"""
+        return await self.write_rows(PROPERTY_QUERY, [property_row(frame) for frame in property_frames],
+                                     batch_size=batch_size)
+
+    async def create_user(self, user_frame: UserFrame):
+        """Crea un nodo User con sus preferencias y transportes (una sola consulta)"""
+        if not self.is_connected():
+            return False
+
+        await self.write_rows(USER_QUERY, [user_row(user_frame)])
+        return True
+
+    async def create_users(self, user_frames: List[UserFrame], batch_size: int = 500) -> int:
+        """Crea varios usuarios en lotes (una consulta por lote)"""
+        return await self.write_rows(USER_QUERY, [user_row(frame) for frame in user_frames],
+                                     batch_size=batch_size)
+
+    async def create_amenity(self, amenity_frame: AmenityFrame):
+        """Crea un nodo Amenity en Neo4j"""
+        if not self.is_connected():
+            return False
+
+        async with self.get_session() as session:
+            result = await session.run(amenity_query(amenity_frame), **amenity_params(amenity_frame))
+            await result.consume()
+            return True
+
+    async def get_database_stats(self):
+        """Obtiene estadísticas de la base de datos (una consulta sobre el count store)"""
+        records = await self.run_query(STATS_QUERY)
+        return records[0] if records else {}
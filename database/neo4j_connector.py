@@ -7,17 +7,206 @@ from neo4j import GraphDatabase
 from typing import List, Dict, Any, Optional
 from models.frame_models import PropertyFrame, UserFrame, AmenityFrame, Address, AmenityType
 from fuzzy.transport_evaluation import TransportType
+import atexit
 import logging
+import os
+import threading
+import time
 import warnings
 
 # Silenciar warnings de Neo4j
 warnings.filterwarnings('ignore', category=Warning)
 logging.getLogger("neo4j").setLevel(logging.ERROR)
 
+# Esquema usado por las consultas frecuentes (todas las sentencias son idempotentes)
+SCHEMA_STATEMENTS = [
+    # Unicidad: convierte los MERGE/MATCH por clave en búsquedas por índice
+    ("property_id_unique",
+     "CREATE CONSTRAINT property_id_unique IF NOT EXISTS FOR (p:Property) REQUIRE p.id IS UNIQUE"),
+    ("property_name_unique",
+     "CREATE CONSTRAINT property_name_unique IF NOT EXISTS FOR (p:Property) REQUIRE p.name IS UNIQUE"),
+    ("property_url_unique",
+     "CREATE CONSTRAINT property_url_unique IF NOT EXISTS FOR (p:Property) REQUIRE p.url IS UNIQUE"),
+    ("user_name_unique",
+     "CREATE CONSTRAINT user_name_unique IF NOT EXISTS FOR (u:User) REQUIRE u.name IS UNIQUE"),
+    # Rango: filtros y ordenamiento por precio, ambientes y superficie
+    ("property_price_range",
+     "CREATE RANGE INDEX property_price_range IF NOT EXISTS FOR (p:Property) ON (p.price)"),
+    ("property_rooms_range",
+     "CREATE RANGE INDEX property_rooms_range IF NOT EXISTS FOR (p:Property) ON (p.rooms)"),
+    ("property_area_range",
+     "CREATE RANGE INDEX property_area_range IF NOT EXISTS FOR (p:Property) ON (p.area)"),
+    # Texto: CONTAINS / STARTS WITH sobre ciudad y barrio
+    ("address_city_text",
+     "CREATE TEXT INDEX address_city_text IF NOT EXISTS FOR (a:Address) ON (a.city)"),
+    ("address_neighborhood_text",
+     "CREATE TEXT INDEX address_neighborhood_text IF NOT EXISTS FOR (a:Address) ON (a.neighborhood)"),
+]
+
+# === CONSULTAS COMPARTIDAS (conector síncrono y asíncrono) ===
+
+# Una sola sentencia por lote: propiedad, dirección y todas sus amenidades cercanas.
+# FOREACH (en lugar de UNWIND) mantiene la fila aunque la lista de amenidades esté vacía.
+# Quitar score_signature marca los sub-scores materializados como vencidos (ver score_materializer).
+PROPERTY_QUERY = """
+UNWIND $rows AS row
+MERGE (p:Property {name: row.name})
+SET p.property_type = row.property_type,
+    p.price = row.price,
+    p.area = row.area,
+    p.rooms = row.rooms,
+    p.bathrooms = row.bathrooms
+REMOVE p.score_signature
+MERGE (a:Address {
+    street: row.street,
+    number: row.number,
+    neighborhood: row.neighborhood,
+    city: row.city,
+    province: row.province
+})
+MERGE (p)-[:HAS_ADDRESS]->(a)
+FOREACH (amenity IN row.amenities |
+    MERGE (am:Amenity {name: amenity.name, type: amenity.type})
+    MERGE (p)-[near:NEAR_TO]->(am)
+    ON CREATE SET near.distance = amenity.distance,
+                  near.amenity_type = amenity.type,
+                  near.amenity_name = amenity.name
+)
+RETURN p.name as property_name
+"""
+
+USER_QUERY = """
+UNWIND $rows AS row
+MERGE (u:User {name: row.name})
+SET u.age = row.age
+FOREACH (pref IN row.preferences |
+    MERGE (at:AmenityType {type: pref.type})
+    MERGE (u)-[prefers:PREFERS]->(at)
+    ON CREATE SET prefers.priority = pref.priority,
+                  prefers.amenity_name = pref.name
+)
+FOREACH (transport_type IN row.transports |
+    MERGE (t:Transport {type: transport_type})
+    MERGE (u)-[:MOVES_BY]->(t)
+)
+RETURN u.name as user_name
+"""
+
+# Búsqueda de un usuario (la leen los demonios para aprender sus preferencias)
+SEARCH_QUERY = """
+MATCH (u:User {name: $usuario})
+CREATE (u)-[:SEARCHED {
+    query: $pregunta,
+    timestamp: datetime()
+}]->(:SearchQuery {text: $pregunta})
+"""
+
+# Label específico según el tipo de amenidad
+AMENITY_LABELS = {
+    AmenityType.PARK: "Park",
+    AmenityType.HOSPITAL: "Hospital",
+    AmenityType.EDUCATION_CENTRE: "EducationCentre",
+    AmenityType.COMMERCIAL_CENTRE: "CommercialCentre",
+    AmenityType.BUS_STOP: "BusStop"
+}
+
+# Todos los conteos en una sola consulta. Cada subconsulta es un conteo por label
+# o por relación dirigida, que Neo4j resuelve desde el count store sin recorrer nodos.
+STATS_QUERY = """
+CALL { MATCH (p:Property) RETURN count(p) AS properties }
+CALL { MATCH (u:User) RETURN count(u) AS users }
+CALL { MATCH (a:Amenity) RETURN count(a) AS amenities }
+CALL { MATCH ()-[r]->() RETURN count(r) AS relationships }
+RETURN properties, users, amenities, relationships
+"""
+
+
+def property_row(property_frame: PropertyFrame) -> Dict[str, Any]:
+    """Fila de PROPERTY_QUERY para un PropertyFrame (incluye sus amenidades cercanas)"""
+    return {
+        "name": property_frame.name,
+        "property_type": property_frame.property_type,
+        "price": property_frame.price,
+        "area": property_frame.area,
+        "rooms": property_frame.rooms,
+        "bathrooms": property_frame.bathrooms,
+        "street": property_frame.address.street,
+        "number": property_frame.address.number,
+        "neighborhood": property_frame.address.neighborhood,
+        "city": property_frame.address.city,
+        "province": property_frame.address.province,
+        "amenities": [
+            {"name": amenity["name"], "type": amenity["type"], "distance": amenity["distance"]}
+            for amenity in property_frame.nearby_amenities
+        ]
+    }
+
+
+def user_row(user_frame: UserFrame) -> Dict[str, Any]:
+    """Fila de USER_QUERY para un UserFrame (incluye preferencias y transportes)"""
+    return {
+        "name": user_frame.name,
+        "age": user_frame.age,
+        "preferences": [
+            {"type": pref["type"], "name": pref["name"], "priority": pref["priority"]}
+            for pref in user_frame.preferences
+        ],
+        "transports": [transport.value for transport in user_frame.transport_preferences]
+    }
+
+
+def write_rows_tx(tx, query: str, rows: List[Dict[str, Any]]):
+    """Función de transacción: ejecuta una consulta `UNWIND $rows` y descarta el resultado"""
+    tx.run(query, rows=rows).consume()
+
+
+def amenity_query(amenity_frame: AmenityFrame) -> str:
+    """Consulta de creación de amenidad con su label específico"""
+    label = AMENITY_LABELS.get(amenity_frame.amenity_type, "Amenity")
+    return f"""
+    CREATE (am:{label}:Amenity {{
+        name: $name,
+        amenity_type: $amenity_type,
+        area: $area,
+        stores_count: $stores_count,
+        education_type: $education_type,
+        is_terminal: $is_terminal
+    }})
+    CREATE (a:Address {{
+        street: $street,
+        number: $number,
+        neighborhood: $neighborhood,
+        city: $city,
+        province: $province
+    }})
+    CREATE (am)-[:HAS_ADDRESS]->(a)
+    RETURN am.name as amenity_name
+    """
+
+
+def amenity_params(amenity_frame: AmenityFrame) -> Dict[str, Any]:
+    """Parámetros de amenity_query para un AmenityFrame"""
+    return {
+        "name": amenity_frame.name,
+        "amenity_type": amenity_frame.amenity_type.value,
+        "area": amenity_frame.area,
+        "stores_count": amenity_frame.stores_count,
+        "education_type": amenity_frame.education_type,
+        "is_terminal": amenity_frame.is_terminal,
+        "street": amenity_frame.address.street,
+        "number": amenity_frame.address.number,
+        "neighborhood": amenity_frame.address.neighborhood,
+        "city": amenity_frame.address.city,
+        "province": amenity_frame.address.province
+    }
+
+
 class Neo4jConnector:
     """Conector para base de datos Neo4j"""
     
-    def __init__(self, uri="bolt://localhost:7687", user="neo4j", password="password", database="housing"):
+    def __init__(self, uri="bolt://localhost:7687", user="neo4j", password="password", database="housing",
+                 max_connection_pool_size: int = 50, connection_acquisition_timeout: float = 30.0,
+                 liveness_check_timeout: Optional[float] = None):
         """
         Inicializa la conexión a Neo4j
         
@@ -26,29 +215,62 @@ class Neo4jConnector:
             user: Usuario de Neo4j
             password: Contraseña de Neo4j
             database: Nombre de la base de datos (housing)
+            max_connection_pool_size: Conexiones máximas en el pool del driver
+            connection_acquisition_timeout: Segundos máximos esperando una conexión libre del pool
+            liveness_check_timeout: Conexiones ociosas por más de estos segundos se verifican
+                antes de reutilizarse (None = sin verificación)
         """
+        self.uri = uri
         self.database = database
+        self._auth = (user, password)
+        self._pool_options = {
+            "max_connection_pool_size": max_connection_pool_size,
+            "connection_acquisition_timeout": connection_acquisition_timeout,
+            "liveness_check_timeout": liveness_check_timeout,
+        }
+        self.last_connect_attempt = 0.0
+        self.driver = None
+        self.connect()
+    
+    def connect(self) -> bool:
+        """Crea el driver (con su pool de conexiones) y verifica la base de datos"""
+        self.last_connect_attempt = time.monotonic()
         try:
-            self.driver = GraphDatabase.driver(uri, auth=(user, password))
+            self.driver = GraphDatabase.driver(self.uri, auth=self._auth, **self._pool_options)
             # Verificar conexión con la base de datos específica
             with self.driver.session(database=self.database) as session:
                 session.run("RETURN 1")
             print(f"✅ Conexión a Neo4j establecida exitosamente (base de datos: {self.database})")
+            return True
         except Exception as e:
             print(f"❌ Error conectando a Neo4j: {e}")
-            print(f"💡 Asegúrate de que Neo4j esté ejecutándose en {uri}")
+            print(f"💡 Asegúrate de que Neo4j esté ejecutándose en {self.uri}")
             print(f"💡 Y que la base de datos '{self.database}' esté activa")
+            if self.driver:
+                self.driver.close()
             self.driver = None
+            return False
     
     def close(self):
         """Cierra la conexión a Neo4j"""
         if self.driver:
             self.driver.close()
+            self.driver = None
     
     def is_connected(self):
         """Verifica si hay conexión activa"""
         return self.driver is not None
     
+    def is_alive(self) -> bool:
+        """Verifica que el servidor responda (no solo que exista el driver)"""
+        if not self.is_connected():
+            return False
+        try:
+            self.driver.verify_connectivity()
+            return True
+        except Exception:
+            return False
+    
     def get_session(self):
         """Obtiene una sesión de Neo4j para la base de datos específica"""
         return self.driver.session(database=self.database)
@@ -62,186 +284,275 @@ class Neo4jConnector:
             session.run("MATCH (n) DETACH DELETE n")
         print(f"🗑️ Base de datos '{self.database}' limpiada")
         return True
-    
+
+    def ensure_schema(self) -> Dict[str, str]:
+        """
+        Crea (si no existen) las constraints de unicidad y los índices del sistema
+
+        Es seguro llamarlo en cada arranque: todas las sentencias usan IF NOT EXISTS.
+        Una constraint que no se puede crear (por ejemplo, por nombres duplicados
+        ya cargados) se informa y no impide crear el resto.
+
+        Returns:
+            Dict {nombre: 'ok' | mensaje de error}
+        """
+        if not self.is_connected():
+            return {}
+
+        results = {}
+        with self.get_session() as session:
+            for name, statement in SCHEMA_STATEMENTS:
+                try:
+                    session.run(statement).consume()
+                    results[name] = "ok"
+                except Exception as e:
+                    results[name] = str(e)
+                    print(f"⚠️ No se pudo crear '{name}': {e}")
+
+        created = sum(1 for status in results.values() if status == "ok")
+        print(f"🗂️ Esquema verificado: {created}/{len(SCHEMA_STATEMENTS)} constraints e índices activos")
+        return results
+
+    def index_usage_report(self) -> List[Dict[str, Any]]:
+        """
+        Informa qué índices usa realmente la carga de trabajo actual
+
+        Usa los contadores de lectura de `SHOW INDEXES` (desde que el índice
+        se creó o desde el último reinicio de la base).
+
+        Returns:
+            Lista de índices con tipo, etiqueta, propiedades, lecturas y si fue usado
+        """
+        if not self.is_connected():
+            return []
+
+        with self.get_session() as session:
+            result = session.run("""
+                SHOW INDEXES
+                YIELD name, type, entityType, labelsOrTypes, properties, state, readCount, lastRead
+                RETURN name, type, entityType, labelsOrTypes, properties, state, readCount, lastRead
+                ORDER BY readCount DESC, name
+            """)
+            report = []
+            for record in result:
+                read_count = record["readCount"] or 0
+                report.append({
+                    "name": record["name"],
+                    "type": record["type"],
+                    "entity_type": record["entityType"],
+                    "labels": record["labelsOrTypes"] or [],
+                    "properties": record["properties"] or [],
+                    "state": record["state"],
+                    "read_count": read_count,
+                    "last_read": str(record["lastRead"]) if record["lastRead"] else None,
+                    "used": read_count > 0
+                })
+        return report
+
+    def print_index_usage_report(self):
+        """Muestra por consola el reporte de uso de índices"""
+        report = self.index_usage_report()
+        if not report:
+            print("⚠️ No hay información de índices disponible")
+            return
+
+        print("\n📑 USO DE ÍNDICES")
+        for index in report:
+            icon = "✅" if index["used"] else "💤"
+            target = f"{','.join(index['labels'])}({','.join(index['properties'])})"
+            print(f"   {icon} {index['name']} [{index['type']}] {target}: "
+                  f"{index['read_count']} lecturas (última: {index['last_read'] or 'nunca'})")
+
+        unused = [index["name"] for index in report if not index["used"]]
+        if unused:
+            print(f"   💡 Sin uso en la carga actual: {', '.join(unused)}")
+
+    def write_in_batches(self, query: str, rows: List[Dict[str, Any]], batch_size: int = 500,
+                         label: str = "filas") -> Dict[str, Any]:
+        """
+        Escribe filas en lotes usando `UNWIND $rows` dentro de transacciones explícitas
+
+        Cada lote se confirma en su propia transacción: si un lote falla se revierte
+        solo ese lote y la carga continúa con el siguiente.
+
+        Args:
+            query: Consulta Cypher que empieza con `UNWIND $rows AS row`
+            rows: Lista de diccionarios con tipos nativos de Python
+            batch_size: Cantidad de filas por transacción
+            label: Nombre de las filas para los mensajes de progreso
+
+        Returns:
+            Dict con filas escritas, filas fallidas y detalle de lotes fallidos
+        """
+        summary = {"written": 0, "failed": 0, "failed_batches": []}
+        if not rows:
+            return summary
+        if not self.is_connected():
+            summary["failed"] = len(rows)
+            return summary
+
+        batch_size = max(1, int(batch_size))
+        total = len(rows)
+
+        with self.get_session() as session:
+            for start in range(0, total, batch_size):
+                batch = rows[start:start + batch_size]
+                try:
+                    session.execute_write(write_rows_tx, query, batch)
+                    summary["written"] += len(batch)
+                except Exception as e:
+                    summary["failed"] += len(batch)
+                    summary["failed_batches"].append({"start": start, "size": len(batch), "error": str(e)})
+                    print(f"   ⚠️  Lote {start}-{start + len(batch) - 1} revertido: {e}")
+
+                done = min(start + batch_size, total)
+                print(f"   ✓ {done}/{total} {label} procesadas ({done / total * 100:.0f}%)")
+
+        return summary
+
     def create_property(self, property_frame: PropertyFrame):
-        """Crea un nodo Property en Neo4j"""
+        """Crea un nodo Property con su dirección y amenidades cercanas (una sola consulta)"""
         if not self.is_connected():
             return False
             
         with self.get_session() as session:
-            query = """
-            MERGE (p:Property {name: $name})
-            SET p.property_type = $property_type,
-                p.price = $price,
-                p.area = $area,
-                p.rooms = $rooms,
-                p.bathrooms = $bathrooms
-            MERGE (a:Address {
-                street: $street,
-                number: $number,
-                neighborhood: $neighborhood,
-                city: $city,
-                province: $province
-            })
-            MERGE (p)-[:HAS_ADDRESS]->(a)
-            RETURN p.name as property_name
-            """
-            result = session.run(query,
-                name=property_frame.name,
-                property_type=property_frame.property_type,
-                price=property_frame.price,
-                area=property_frame.area,
-                rooms=property_frame.rooms,
-                bathrooms=property_frame.bathrooms,
-                street=property_frame.address.street,
-                number=property_frame.address.number,
-                neighborhood=property_frame.address.neighborhood,
-                city=property_frame.address.city,
-                province=property_frame.address.province
-            )
-            
-            # Crear amenidades cercanas
-            for amenity in property_frame.nearby_amenities:
-                amenity_query = """
-                MATCH (p:Property {name: $property_name})
-                MERGE (a:Amenity {
-                    name: $amenity_name,
-                    type: $amenity_type
-                })
-                WITH p, a
-                WHERE NOT EXISTS((p)-[:NEAR_TO]->(a))
-                CREATE (p)-[:NEAR_TO {
-                    distance: $distance,
-                    amenity_type: $amenity_type,
-                    amenity_name: $amenity_name
-                }]->(a)
-                """
-                session.run(amenity_query,
-                    property_name=property_frame.name,
-                    distance=amenity["distance"],
-                    amenity_type=amenity["type"],
-                    amenity_name=amenity["name"]
-                )
-            
+            session.execute_write(write_rows_tx, PROPERTY_QUERY, [property_row(property_frame)])
             return True
     
+    def create_properties(self, property_frames: List[PropertyFrame], batch_size: int = 500) -> Dict[str, Any]:
+        """
+        Crea varias propiedades en lotes (una consulta por lote, sin importar
+        cuántas amenidades tenga cada propiedad)
+        
+        Returns:
+            Resumen de write_in_batches (escritas, fallidas, lotes fallidos)
+        """
+        rows = [property_row(frame) for frame in property_frames]
+        return self.write_in_batches(PROPERTY_QUERY, rows, batch_size=batch_size, label="propiedades")
+    
     def create_user(self, user_frame: UserFrame):
-        """Crea un nodo User en Neo4j"""
+        """Crea un nodo User con sus preferencias y transportes (una sola consulta)"""
         if not self.is_connected():
             return False
             
         with self.get_session() as session:
-            query = """
-            MERGE (u:User {name: $name})
-            SET u.age = $age
-            RETURN u.name as user_name
-            """
-            session.run(query, name=user_frame.name, age=user_frame.age)
-            
-            # Crear preferencias
-            for pref in user_frame.preferences:
-                pref_query = """
-                MATCH (u:User {name: $user_name})
-                MERGE (at:AmenityType {type: $amenity_type})
-                WITH u, at
-                WHERE NOT EXISTS((u)-[:PREFERS]->(at))
-                CREATE (u)-[:PREFERS {
-                    priority: $priority,
-                    amenity_name: $amenity_name
-                }]->(at)
-                """
-                session.run(pref_query,
-                    user_name=user_frame.name,
-                    priority=pref["priority"],
-                    amenity_type=pref["type"],
-                    amenity_name=pref["name"]
-                )
-            
-            # Crear preferencias de transporte
-            for transport in user_frame.transport_preferences:
-                transport_query = """
-                MATCH (u:User {name: $user_name})
-                MERGE (t:Transport {type: $transport_type})
-                WITH u, t
-                WHERE NOT EXISTS((u)-[:MOVES_BY]->(t))
-                CREATE (u)-[:MOVES_BY]->(t)
-                """
-                session.run(transport_query,
-                    user_name=user_frame.name,
-                    transport_type=transport.value
-                )
-            
+            session.execute_write(write_rows_tx, USER_QUERY, [user_row(user_frame)])
             return True
     
+    def create_users(self, user_frames: List[UserFrame], batch_size: int = 500) -> Dict[str, Any]:
+        """
+        Crea varios usuarios en lotes
+        
+        Returns:
+            Resumen de write_in_batches (escritos, fallidos, lotes fallidos)
+        """
+        rows = [user_row(frame) for frame in user_frames]
+        return self.write_in_batches(USER_QUERY, rows, batch_size=batch_size, label="usuarios")
+    
     def create_amenity(self, amenity_frame: AmenityFrame):
         """Crea un nodo Amenity en Neo4j"""
         if not self.is_connected():
             return False
             
         with self.get_session() as session:
-            # Determinar el label específico según el tipo
-            amenity_labels = {
-                AmenityType.PARK: "Park",
-                AmenityType.HOSPITAL: "Hospital",
-                AmenityType.EDUCATION_CENTRE: "EducationCentre",
-                AmenityType.COMMERCIAL_CENTRE: "CommercialCentre",
-                AmenityType.BUS_STOP: "BusStop"
-            }
-            
-            label = amenity_labels.get(amenity_frame.amenity_type, "Amenity")
-            
-            query = f"""
-            CREATE (am:{label}:Amenity {{
-                name: $name,
-                amenity_type: $amenity_type,
-                area: $area,
-                stores_count: $stores_count,
-                education_type: $education_type,
-                is_terminal: $is_terminal
-            }})
-            CREATE (a:Address {{
-                street: $street,
-                number: $number,
-                neighborhood: $neighborhood,
-                city: $city,
-                province: $province
-            }})
-            CREATE (am)-[:HAS_ADDRESS]->(a)
-            RETURN am.name as amenity_name
-            """
-            
-            session.run(query,
-                name=amenity_frame.name,
-                amenity_type=amenity_frame.amenity_type.value,
-                area=amenity_frame.area,
-                stores_count=amenity_frame.stores_count,
-                education_type=amenity_frame.education_type,
-                is_terminal=amenity_frame.is_terminal,
-                street=amenity_frame.address.street,
-                number=amenity_frame.address.number,
-                neighborhood=amenity_frame.address.neighborhood,
-                city=amenity_frame.address.city,
-                province=amenity_frame.address.province
-            )
-            
+            session.run(amenity_query(amenity_frame), **amenity_params(amenity_frame))
+            return True
+    
+    def record_search(self, usuario: str, pregunta: str) -> bool:
+        """Registra una búsqueda del usuario (relación SEARCHED a un nodo SearchQuery)"""
+        if not self.is_connected():
+            return False
+        
+        def record_search_tx(tx, usuario, pregunta):
+            tx.run(SEARCH_QUERY, usuario=usuario, pregunta=pregunta)
+        
+        with self.get_session() as session:
+            session.execute_write(record_search_tx, usuario, pregunta)
             return True
     
     def get_database_stats(self):
-        """Obtiene estadísticas de la base de datos"""
+        """
+        Obtiene estadísticas de la base de datos (una consulta sobre el count store)
+        
+        Para paneles de estado usar database.stats_service, que cachea el resultado.
+        """
         if not self.is_connected():
             return {}
             
         with self.get_session() as session:
-            queries = {
-                "properties": "MATCH (p:Property) RETURN count(p) AS count",
-                "users": "MATCH (u:User) RETURN count(u) AS count", 
-                "amenities": "MATCH (a:Amenity) RETURN count(a) AS count",
-                "relationships": "MATCH ()-[r]-() RETURN count(r) AS count"
-            }
-            
-            stats = {}
-            for stat_name, query in queries.items():
-                result = session.run(query)
-                stats[stat_name] = result.single()["count"]
-            
-            return stats
+            record = session.run(STATS_QUERY).single()
+            return dict(record) if record else {}
+
+
+# === REGISTRO DE CONECTORES COMPARTIDOS ===
+# Un driver por (uri, usuario, base) para todo el proceso: la UI y los demonios
+# toman sesiones del mismo pool en lugar de abrir un driver por cada operación.
+
+_shared_connectors: Dict[tuple, Neo4jConnector] = {}
+_registry_lock = threading.Lock()
+_shutdown_hooks: List = []
+
+# Segundos entre reintentos de conexión cuando Neo4j no está disponible
+RECONNECT_INTERVAL = 10.0
+
+
+def _pool_options_from_env() -> Dict[str, Any]:
+    """Configuración del pool desde variables de entorno"""
+    liveness = os.getenv("NEO4J_LIVENESS_CHECK_TIMEOUT", "30")
+    return {
+        "max_connection_pool_size": int(os.getenv("NEO4J_MAX_POOL_SIZE", "50")),
+        "connection_acquisition_timeout": float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "30")),
+        "liveness_check_timeout": float(liveness) if liveness else None,
+    }
+
+
+def get_connector(uri="bolt://localhost:7687", user="neo4j", password="password", database="housing",
+                  **pool_options) -> Neo4jConnector:
+    """
+    Devuelve el conector compartido del proceso para esos parámetros de conexión
+    
+    El conector se crea una sola vez; si Neo4j no estaba disponible se reintenta
+    la conexión como máximo cada RECONNECT_INTERVAL segundos. Los llamadores no
+    deben cerrarlo: se cierra al terminar el proceso (close_all_connectors).
+    
+    Args:
+        uri, user, password, database: Igual que Neo4jConnector
+        **pool_options: max_connection_pool_size, connection_acquisition_timeout,
+            liveness_check_timeout (por defecto desde NEO4J_MAX_POOL_SIZE,
+            NEO4J_ACQUISITION_TIMEOUT y NEO4J_LIVENESS_CHECK_TIMEOUT)
+    """
+    key = (uri, user, database)
+    with _registry_lock:
+        connector = _shared_connectors.get(key)
+        if connector is None:
+            options = _pool_options_from_env()
+            options.update(pool_options)
+            connector = Neo4jConnector(uri, user, password, database, **options)
+            _shared_connectors[key] = connector
+        elif not connector.is_connected():
+            if time.monotonic() - connector.last_connect_attempt >= RECONNECT_INTERVAL:
+                connector.connect()
+        return connector
+
+
+def register_shutdown_hook(hook):
+    """Registra una función a ejecutar antes de cerrar los conectores compartidos"""
+    _shutdown_hooks.append(hook)
+
+
+def close_all_connectors():
+    """Ejecuta los hooks de cierre y cierra todos los conectores compartidos"""
+    while _shutdown_hooks:
+        hook = _shutdown_hooks.pop()
+        try:
+            hook()
+        except Exception as e:
+            print(f"⚠️ Error en hook de cierre: {e}")
+
+    with _registry_lock:
+        for connector in _shared_connectors.values():
+            connector.close()
+        _shared_connectors.clear()
+
+
+atexit.register(close_all_connectors)
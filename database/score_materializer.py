@@ -0,0 +1,206 @@
+"""
+Materialización de Sub-scores - Sistema de Recomendación de Viviendas
+Precalcula la parte del score que no depende del usuario y la guarda en los nodos Property.
+
+El sub-score de amenidades (AMENIDADES_PESOS + DISTANCIAS_IDEALES sobre las
+relaciones NEAR_TO) y el de accesibilidad de transporte son iguales para todos
+los usuarios, así que se calculan una vez y se guardan como propiedades del nodo:
+
+    p.amenity_score, p.amenity_count, p.transport_score,
+    p.amenities_signature, p.score_signature
+
+Un sub-score está vigente solo si p.score_signature coincide con firma_scores():
+cambiar los pesos invalida todos, y PROPERTY_QUERY quita la firma de cada
+propiedad que reescribe (sus amenidades pueden haber cambiado). refresh()
+recalcula solo las vencidas y copia el resultado a data/property_scores.json,
+el caché local que usan los procesos que puntúan sin ir a Neo4j.
+
+Uso:
+    get_score_materializer().refresh()
+
+Quien puntúa (el flujo de recomendación de workflow/langgraph_workflow.py) debe
+completar las candidatas antes de llamar a calcular_score_propiedad:
+
+    get_score_materializer().apply_local_scores(candidatas)
+
+o traer p.amenity_score, p.amenity_count, p.transport_score y p.score_signature
+en su consulta de candidatas. Sin ninguna de las dos, el score se calcula igual
+pero recorriendo las amenidades de cada propiedad.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from database.neo4j_connector import Neo4jConnector, get_connector
+from models.housing_frames import calcular_subscores, firma_scores
+
+SCORES_CACHE_PATH = os.path.join('data', 'property_scores.json')
+
+# Propiedades sin sub-scores vigentes, con sus amenidades cercanas
+STALE_SCORES_QUERY = """
+MATCH (p:Property)
+WHERE p.score_signature IS NULL OR p.score_signature <> $signature
+OPTIONAL MATCH (p)-[near:NEAR_TO]->()
+RETURN p.name AS name,
+       collect(CASE WHEN near IS NOT NULL
+               THEN {type: near.amenity_type, distance: near.distance} END) AS amenities
+"""
+
+WRITE_SCORES_QUERY = """
+UNWIND $rows AS row
+MATCH (p:Property {name: row.name})
+SET p.amenity_score = row.amenity_score,
+    p.amenity_count = row.amenity_count,
+    p.transport_score = row.transport_score,
+    p.amenities_signature = row.amenities_signature,
+    p.score_signature = row.score_signature
+"""
+
+EXPORT_SCORES_QUERY = """
+MATCH (p:Property)
+WHERE p.score_signature = $signature
+RETURN p.name AS name, p.amenity_score AS amenity_score, p.amenity_count AS amenity_count,
+       p.transport_score AS transport_score, p.amenities_signature AS amenities_signature
+"""
+
+SCORE_FIELDS = ('amenity_score', 'amenity_count', 'transport_score', 'score_signature')
+
+
+def amenities_signature(amenities: Optional[List[Dict[str, Any]]]) -> str:
+    """Firma de las amenidades de una propiedad (tipo y distancia, sin importar el orden)"""
+    items = sorted((str(a.get('type', '')), float(a.get('distance', 999999))) for a in amenities or [])
+    return hashlib.sha1(json.dumps(items).encode('utf-8')).hexdigest()[:16]
+
+
+def score_row(name: str, amenities: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fila de WRITE_SCORES_QUERY para una propiedad"""
+    row = {'name': name, 'amenities_signature': amenities_signature(amenities)}
+    row.update(calcular_subscores(amenities))
+    return row
+
+
+class PropertyScoreMaterializer:
+    """Recalcula los sub-scores vencidos en Neo4j y mantiene el caché local"""
+
+    def __init__(self, connector_factory: Callable[[], Neo4jConnector] = get_connector,
+                 cache_path: str = SCORES_CACHE_PATH):
+        """
+        Args:
+            connector_factory: Devuelve el conector a usar (por defecto el compartido)
+            cache_path: Archivo JSON del caché local de sub-scores
+        """
+        self.connector_factory = connector_factory
+        self.cache_path = cache_path
+        self._local: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def stale_properties(self) -> List[Dict[str, Any]]:
+        """Propiedades cuyos sub-scores faltan o se calcularon con otra firma"""
+        connector = self.connector_factory()
+        if not connector.is_connected():
+            return []
+        with connector.get_session() as session:
+            result = session.run(STALE_SCORES_QUERY, signature=firma_scores())
+            return [{'name': record['name'], 'amenities': record['amenities']} for record in result]
+
+    def refresh(self, batch_size: int = 500) -> Dict[str, Any]:
+        """
+        Recalcula y guarda los sub-scores vencidos, y actualiza el caché local
+
+        Returns:
+            Dict con propiedades vencidas, escritas, fallidas y entradas del caché local
+        """
+        with self._lock:
+            connector = self.connector_factory()
+            summary = {'stale': 0, 'written': 0, 'failed': 0, 'cached': 0}
+            if not connector.is_connected():
+                return summary
+
+            stale = self.stale_properties()
+            summary['stale'] = len(stale)
+            if stale:
+                rows = [score_row(p['name'], p['amenities']) for p in stale]
+                result = connector.write_in_batches(WRITE_SCORES_QUERY, rows, batch_size=batch_size,
+                                                    label="sub-scores")
+                summary['written'] = result['written']
+                summary['failed'] = result['failed']
+
+            summary['cached'] = self.export_local_cache(connector)
+            print(f"🧮 Sub-scores: {summary['written']}/{summary['stale']} recalculados, "
+                  f"{summary['cached']} en caché local")
+            return summary
+
+    def export_local_cache(self, connector: Optional[Neo4jConnector] = None) -> int:
+        """Copia los sub-scores vigentes de Neo4j al caché local (escritura atómica)"""
+        connector = connector or self.connector_factory()
+        signature = firma_scores()
+        with connector.get_session() as session:
+            result = session.run(EXPORT_SCORES_QUERY, signature=signature)
+            local = {
+                record['name']: {
+                    'amenity_score': record['amenity_score'],
+                    'amenity_count': record['amenity_count'],
+                    'transport_score': record['transport_score'],
+                    'amenities_signature': record['amenities_signature'],
+                    'score_signature': signature,
+                }
+                for record in result
+            }
+
+        if os.path.dirname(self.cache_path):
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        temporal = self.cache_path + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(local, f, ensure_ascii=False)
+        os.replace(temporal, self.cache_path)
+        self._local = local
+        return len(local)
+
+    def load_local_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Sub-scores del caché local que siguen vigentes ({nombre: {...}})"""
+        if self._local is None:
+            if not os.path.exists(self.cache_path):
+                return {}
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self._local = json.load(f)
+        signature = firma_scores()
+        return {name: entry for name, entry in self._local.items() if entry.get('score_signature') == signature}
+
+    def apply_local_scores(self, properties: List[Dict[str, Any]]) -> int:
+        """
+        Completa dicts de propiedades con los sub-scores del caché local
+
+        Si el dict trae nearby_amenities, la entrada solo se usa si las amenidades
+        son las mismas con las que se calculó.
+
+        Returns:
+            Cantidad de propiedades completadas
+        """
+        local = self.load_local_cache()
+        applied = 0
+        for prop in properties:
+            entry = local.get(prop.get('name'))
+            if entry is None:
+                continue
+            if prop.get('nearby_amenities') is not None and \
+                    amenities_signature(prop['nearby_amenities']) != entry.get('amenities_signature'):
+                continue
+            for field in SCORE_FIELDS:
+                prop[field] = entry.get(field)
+            applied += 1
+        return applied
+
+
+_materializer: Optional[PropertyScoreMaterializer] = None
+_materializer_lock = threading.Lock()
+
+
+def get_score_materializer() -> PropertyScoreMaterializer:
+    """Devuelve el materializador compartido del proceso (sobre el conector compartido)"""
+    global _materializer
+    with _materializer_lock:
+        if _materializer is None:
+            _materializer = PropertyScoreMaterializer()
+        return _materializer
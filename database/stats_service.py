@@ -0,0 +1,119 @@
+"""
+Servicio de Estadísticas - Sistema de Recomendación de Viviendas
+Cachea los conteos de la base para los paneles de estado.
+
+Los conteos salen de una sola consulta sobre el count store
+(Neo4jConnector.get_database_stats) y se reutilizan durante `ttl` segundos.
+Con start_background_refresh() un hilo los renueva periódicamente, así
+"Verificar conexión" y el arranque responden en tiempo constante sin
+importar el tamaño del grafo.
+
+Uso:
+    stats = get_stats_service().get()
+"""
+
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+from database.neo4j_connector import Neo4jConnector, get_connector, register_shutdown_hook
+
+# Segundos que se reutilizan los conteos antes de volver a consultarlos
+STATS_TTL = 30.0
+
+
+class DatabaseStatsService:
+    """Caché con TTL de las estadísticas de la base, con refresco opcional en segundo plano"""
+
+    def __init__(self, connector_factory: Callable[[], Neo4jConnector] = get_connector, ttl: float = STATS_TTL):
+        """
+        Args:
+            connector_factory: Devuelve el conector a consultar (por defecto el compartido)
+            ttl: Segundos de validez de los conteos cacheados
+        """
+        self.connector_factory = connector_factory
+        self.ttl = ttl
+        self._stats: Dict[str, Any] = {}
+        self._updated_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def age(self) -> Optional[float]:
+        """Segundos desde la última actualización (None si nunca se consultó)"""
+        if self._updated_at is None:
+            return None
+        return time.monotonic() - self._updated_at
+
+    def is_fresh(self) -> bool:
+        """Indica si los conteos cacheados siguen dentro del TTL"""
+        age = self.age()
+        return age is not None and age < self.ttl
+
+    def refresh(self) -> Dict[str, Any]:
+        """Consulta los conteos y actualiza la caché (si la consulta falla se conserva el valor anterior)"""
+        with self._lock:
+            connector = self.connector_factory()
+            if not connector.is_connected():
+                return dict(self._stats)
+            try:
+                stats = connector.get_database_stats()
+            except Exception as e:
+                print(f"⚠️ No se pudieron actualizar las estadísticas: {e}")
+                return dict(self._stats)
+            self._stats = stats
+            self._updated_at = time.monotonic()
+            return dict(stats)
+
+    def get(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Devuelve los conteos, consultando la base solo si la caché venció
+
+        Args:
+            force: Ignora la caché y consulta siempre
+        """
+        if force or not self.is_fresh():
+            return self.refresh()
+        return dict(self._stats)
+
+    def invalidate(self):
+        """Marca los conteos como vencidos (llamar después de cargas masivas)"""
+        self._updated_at = None
+
+    def start_background_refresh(self, interval: Optional[float] = None):
+        """
+        Renueva los conteos en un hilo daemon cada `interval` segundos
+        (por defecto un poco antes de que venza el TTL)
+        """
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+        interval = interval or max(self.ttl * 0.8, 1.0)
+        self._stop_event.clear()
+
+        def loop():
+            while not self._stop_event.is_set():
+                self.refresh()
+                self._stop_event.wait(interval)
+
+        self._refresh_thread = threading.Thread(target=loop, name="stats-refresh", daemon=True)
+        self._refresh_thread.start()
+
+    def stop_background_refresh(self):
+        """Detiene el hilo de refresco si está activo"""
+        self._stop_event.set()
+        if self._refresh_thread:
+            self._refresh_thread.join(timeout=5)
+            self._refresh_thread = None
+
+
+_stats_service: Optional[DatabaseStatsService] = None
+_service_lock = threading.Lock()
+
+
+def get_stats_service() -> DatabaseStatsService:
+    """Devuelve el servicio de estadísticas compartido del proceso (sobre el conector compartido)"""
+    global _stats_service
+    with _service_lock:
+        if _stats_service is None:
+            _stats_service = DatabaseStatsService()
+            register_shutdown_hook(_stats_service.stop_background_refresh)
+        return _stats_service
@@ -11,7 +11,7 @@ Incluye:
 
 from typing import Dict, List
 from datetime import datetime, timedelta
-from database.neo4j_connector import Neo4jConnector
+from database.neo4j_connector import Neo4jConnector, get_connector
 from collections import defaultdict
 
 
@@ -19,7 +19,7 @@ class AdaptivePricingDemon:
     """Analiza rangos de precios reales por barrio"""
     
     def __init__(self, connector: Neo4jConnector = None):
-        self.connector = connector or Neo4jConnector()
+        self.connector = connector or get_connector()
         self.execution_count = 0
         self.precio_por_barrio = {}
     
@@ -34,6 +34,7 @@ class AdaptivePricingDemon:
             with self.connector.get_session() as session:
                 result = session.run("""
                     MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address)
+                    WHERE coalesce(p.active, true)
                     RETURN a.neighborhood AS barrio,
                            min(p.price) AS min_precio,
                            max(p.price) AS max_precio,
@@ -53,7 +54,7 @@ class TemporalTrendsDemon:
     """Detecta tendencias temporales en clics y búsquedas"""
     
     def __init__(self, connector: Neo4jConnector = None):
-        self.connector = connector or Neo4jConnector()
+        self.connector = connector or get_connector()
         self.execution_count = 0
     
     def execute(self):
@@ -88,7 +89,7 @@ class PatternDiscoveryDemon:
     """Descubre patrones en búsquedas y clics"""
     
     def __init__(self, connector: Neo4jConnector = None):
-        self.connector = connector or Neo4jConnector()
+        self.connector = connector or get_connector()
         self.execution_count = 0
     
     def execute(self):
@@ -127,7 +128,7 @@ class RecommendationOptimizerDemon:
     """Optimiza scores de recomendación basado en feedback"""
     
     def __init__(self, connector: Neo4jConnector = None):
-        self.connector = connector or Neo4jConnector()
+        self.connector = connector or get_connector()
         self.execution_count = 0
     
     def execute(self):
@@ -17,7 +17,7 @@ import threading
 import json
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-from database.neo4j_connector import Neo4jConnector
+from database.neo4j_connector import Neo4jConnector, get_connector
 
 # Importar demonios compatibles con Neo4j
 from demons.preference_learning_demon import PreferenceLearningDemon
@@ -34,7 +34,7 @@ class DemonsManager:
     
     def __init__(self, connector: Neo4jConnector = None):
         """Inicializa el gestor de demonios"""
-        self.connector = connector or Neo4jConnector()
+        self.connector = connector or get_connector()
         self.demons = {}
         self.running = False
         self.demon_threads = {}
@@ -146,9 +146,7 @@ class DemonsManager:
 
 # EJEMPLO DE USO
 if __name__ == "__main__":
-    from database.neo4j_connector import Neo4jConnector
-    
-    connector = Neo4jConnector()
+    connector = get_connector()
     
     if not connector.is_connected():
         print("❌ Neo4j no conectado")
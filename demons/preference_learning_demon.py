@@ -18,7 +18,7 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from collections import defaultdict
 import random
-from database.neo4j_connector import Neo4jConnector
+from database.neo4j_connector import Neo4jConnector, get_connector
 import warnings
 
 # Silenciar warnings de Neo4j
@@ -29,7 +29,7 @@ class PreferenceLearningDemon:
     """Demonio que aprende preferencias reales del usuario desde su comportamiento"""
     
     def __init__(self, connector: Neo4jConnector = None):
-        self.connector = connector or Neo4jConnector()
+        self.connector = connector or get_connector()
         self.learning_rate = 0.1
         self.execution_count = 0
         self.last_execution = None
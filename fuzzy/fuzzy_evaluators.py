@@ -8,6 +8,7 @@ QUÉ HACE: Evaluadores específicos para cada criterio
 """
 
 from typing import Dict, List, Any
+import numpy as np
 from fuzzy.fuzzy_logic import FuzzyLogic
 from fuzzy.transport_evaluation import TransportType, TransportAccessibilityEvaluator
 
@@ -50,6 +51,19 @@ class PriceFuzzyEvaluator:
         )
         
         return memberships
+    
+    def evaluate_price_membership_array(self, prices) -> Dict[str, np.ndarray]:
+        """
+        Igual que evaluate_price_membership pero para un array de precios
+        Retorna: {'very_cheap': array, 'cheap': array, 'moderate': array, 'expensive': array}
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        return {
+            'very_cheap': FuzzyLogic.triangular_membership_array(prices, 0, 20000, self.very_cheap_max),
+            'cheap': FuzzyLogic.triangular_membership_array(prices, 20000, 55000, self.cheap_max),
+            'moderate': FuzzyLogic.triangular_membership_array(prices, 55000, 95000, self.moderate_max),
+            'expensive': FuzzyLogic.trapezoidal_membership_array(prices, 95000, 120000, 160000, self.expensive_max)
+        }
 
 
 class DistanceFuzzyEvaluator:
@@ -84,6 +98,19 @@ class DistanceFuzzyEvaluator:
             memberships['far'] = FuzzyLogic.gaussian_membership(distance, 1500, 500)
             
             return memberships
+    
+    def evaluate_distance_membership_array(self, distances, transport_mode: TransportType = None) -> Dict[str, np.ndarray]:
+        """Igual que evaluate_distance_membership pero para un array de distancias"""
+        distances = np.asarray(distances, dtype=np.float64)
+        if transport_mode:
+            return self.transport_evaluator.calculate_transport_memberships_array(distances, transport_mode)
+        
+        return {
+            'very_close': FuzzyLogic.triangular_membership_array(distances, 0, 100, 200),
+            'close': FuzzyLogic.triangular_membership_array(distances, 100, 350, 500),
+            'moderate': FuzzyLogic.triangular_membership_array(distances, 350, 750, 1000),
+            'far': FuzzyLogic.gaussian_membership_array(distances, 1500, 500)
+        }
 
 
 class AmenityImportanceFuzzyEvaluator:
@@ -7,10 +7,12 @@ Implementa las funciones matemáticas fundamentales de la lógica difusa. Es la
 - gaussian_membership()      # Función gaussiana
 - fuzzy_and(), fuzzy_or()    # Operaciones difusas
 - weighted_average()         # Defuzzificación
+- *_array()                  # Versiones vectorizadas (NumPy) para evaluar miles de valores a la vez
 """
 
 from typing import Dict, List
 import math
+import numpy as np
 
 
 class FuzzyLogic:
@@ -65,3 +67,79 @@ class FuzzyLogic:
         if not values or not weights or len(values) != len(weights):
             return 0.0
         return sum(v * w for v, w in zip(values, weights)) / sum(weights)
+    
+    # === VERSIONES VECTORIZADAS ===
+    # Misma semántica que las funciones escalares, pero sobre arrays NumPy. Los
+    # parámetros pueden ser escalares o arrays que se combinan por broadcasting
+    # (p. ej. un rango distinto por propiedad).
+    
+    @staticmethod
+    def triangular_membership_array(x, a, b, c) -> np.ndarray:
+        """Función de pertenencia triangular para un array de valores"""
+        x = np.asarray(x, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            subida = (x - a) / np.subtract(b, a)
+            bajada = (c - x) / np.subtract(c, b)
+        return np.where((x <= a) | (x >= c), 0.0, np.where(x <= b, subida, bajada))
+    
+    @staticmethod
+    def trapezoidal_membership_array(x, a, b, c, d) -> np.ndarray:
+        """Función de pertenencia trapezoidal para un array de valores"""
+        x = np.asarray(x, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            subida = (x - a) / np.subtract(b, a)
+            bajada = (d - x) / np.subtract(d, c)
+        return np.where((x <= a) | (x >= d), 0.0,
+                        np.where(x <= b, subida, np.where(x <= c, 1.0, bajada)))
+    
+    @staticmethod
+    def gaussian_membership_array(x, center, sigma) -> np.ndarray:
+        """Función de pertenencia gaussiana para un array de valores"""
+        x = np.asarray(x, dtype=np.float64)
+        return np.exp(-0.5 * ((x - center) / sigma) ** 2)
+    
+    @staticmethod
+    def fuzzy_and_array(values, axis: int = 0) -> np.ndarray:
+        """
+        AND difuso (mínimo) a lo largo de `axis`
+        
+        Args:
+            values: Array (o lista de arrays) de grados de pertenencia, p. ej. forma (criterios, propiedades)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape[axis] == 0:
+            return np.zeros(np.delete(values.shape, axis))
+        return np.min(values, axis=axis)
+    
+    @staticmethod
+    def fuzzy_or_array(values, axis: int = 0) -> np.ndarray:
+        """OR difuso (máximo) a lo largo de `axis`"""
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape[axis] == 0:
+            return np.zeros(np.delete(values.shape, axis))
+        return np.max(values, axis=axis)
+    
+    @staticmethod
+    def weighted_average_array(values, weights, axis: int = 0) -> np.ndarray:
+        """
+        Promedio ponderado a lo largo de `axis` (defuzzificación por lotes)
+        
+        Args:
+            values: Array de valores, p. ej. forma (criterios, propiedades)
+            weights: Pesos con la misma forma que `values`, o 1-D con un peso por elemento de `axis`
+        
+        Returns:
+            Array con un promedio por posición; 0.0 donde la suma de pesos es 0
+        """
+        values = np.asarray(values, dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim == 1 and values.ndim > 1:
+            forma = [1] * values.ndim
+            forma[axis] = -1
+            weights = weights.reshape(forma)
+        weights = np.broadcast_to(weights, values.shape)
+        
+        total = np.sum(weights, axis=axis)
+        suma = np.sum(values * weights, axis=axis)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(total != 0, suma / np.where(total != 0, total, 1.0), 0.0)
@@ -0,0 +1,323 @@
+"""
+Módulo de Base de Reglas Difusas - Sistema de Recomendación de Viviendas
+Define reglas difusas de forma declarativa y las compila a un plan de evaluación por lotes.
+QUÉ HACE: "SI precio ES barato Y distancia ES muy_cerca ENTONCES score = 1.0"
+- FuzzyVariable      # Variable lingüística con sus términos (triangular, trapezoidal, gaussiana)
+- FuzzyRule          # Antecedentes (AND) → valor de salida (estilo Sugeno)
+- FuzzyRuleBase      # Colección declarativa de variables y reglas
+  - set_aggregation()  # Promedio ponderado (Sugeno) o suma de las reglas de una salida
+  - compile()        # Genera el CompiledRuleBase
+- CompiledRuleBase
+  - evaluate()       # Evalúa arrays de entradas (miles de propiedades a la vez)
+  - evaluate_one()   # Evalúa un solo caso
+- create_housing_rule_base()  # Reglas construidas desde las tablas de models.housing_frames
+
+Al compilar:
+- cada membresía (variable, término) usada por alguna regla se calcula una sola vez
+- los antecedentes se normalizan y sus conjunciones (mínimo) se memoizan por prefijo,
+  así reglas que comparten condiciones reutilizan el resultado
+- se eliminan reglas muertas (peso 0 o términos incompatibles de la misma variable)
+  y se fusionan reglas duplicadas sumando sus pesos
+
+Al evaluar solo algunas salidas, solo se calculan las membresías y conjunciones
+que esas salidas usan.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+import numpy as np
+from fuzzy.fuzzy_logic import FuzzyLogic
+
+# Funciones de pertenencia disponibles: tipo → (función vectorizada, cantidad de parámetros)
+MEMBERSHIP_FUNCTIONS = {
+    'triangular': (FuzzyLogic.triangular_membership_array, 3),
+    'trapezoidal': (FuzzyLogic.trapezoidal_membership_array, 4),
+    'gaussian': (FuzzyLogic.gaussian_membership_array, 2),
+}
+
+# Cómo se combinan las reglas de una salida:
+# - weighted_average: Σ valor·peso·activación / Σ peso·activación (Sugeno)
+# - sum: Σ valor·peso·activación (p. ej. sumar el aporte ponderado de cada amenidad)
+AGGREGATIONS = ('weighted_average', 'sum')
+
+
+@dataclass(frozen=True)
+class FuzzyTerm:
+    """Término lingüístico: tipo de función de pertenencia y sus parámetros"""
+    kind: str
+    params: Tuple[float, ...]
+
+    def __post_init__(self):
+        if self.kind not in MEMBERSHIP_FUNCTIONS:
+            raise ValueError(f"Función de pertenencia desconocida: {self.kind}")
+        if len(self.params) != MEMBERSHIP_FUNCTIONS[self.kind][1]:
+            raise ValueError(f"'{self.kind}' requiere {MEMBERSHIP_FUNCTIONS[self.kind][1]} parámetros")
+
+    def support(self) -> Tuple[float, float]:
+        """Intervalo abierto donde la pertenencia es mayor que 0"""
+        if self.kind == 'triangular':
+            return self.params[0], self.params[2]
+        if self.kind == 'trapezoidal':
+            return self.params[0], self.params[3]
+        return float('-inf'), float('inf')
+
+    def evaluate(self, values: np.ndarray) -> np.ndarray:
+        return MEMBERSHIP_FUNCTIONS[self.kind][0](values, *self.params)
+
+
+@dataclass
+class FuzzyVariable:
+    """Variable lingüística de entrada (p. ej. precio con términos barato/caro)"""
+    name: str
+    terms: Dict[str, FuzzyTerm] = field(default_factory=dict)
+
+    def add_term(self, label: str, kind: str, *params: float) -> "FuzzyVariable":
+        self.terms[label] = FuzzyTerm(kind, tuple(float(p) for p in params))
+        return self
+
+
+@dataclass(frozen=True)
+class FuzzyRule:
+    """
+    Regla difusa: SI todos los antecedentes se cumplen ENTONCES output = value
+    antecedents: ((variable, término), ...) combinados con AND (mínimo)
+    """
+    antecedents: Tuple[Tuple[str, str], ...]
+    output: str
+    value: float
+    weight: float = 1.0
+
+
+class FuzzyRuleBase:
+    """Base de reglas declarativa; compile() la convierte en un plan de evaluación"""
+
+    def __init__(self):
+        self.variables: Dict[str, FuzzyVariable] = {}
+        self.rules: List[FuzzyRule] = []
+        self.aggregations: Dict[str, str] = {}
+
+    def add_variable(self, variable: FuzzyVariable) -> FuzzyVariable:
+        self.variables[variable.name] = variable
+        return variable
+
+    def set_aggregation(self, output: str, aggregation: str):
+        """Define cómo se combinan las reglas de `output` (por defecto weighted_average)"""
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"Agregación desconocida: {aggregation}")
+        self.aggregations[output] = aggregation
+
+    def add_rule(self, antecedents: Sequence[Tuple[str, str]], output: str, value: float,
+                 weight: float = 1.0) -> FuzzyRule:
+        """
+        Agrega una regla
+
+        Args:
+            antecedents: Lista de (variable, término) que deben cumplirse a la vez
+            output: Nombre de la salida (p. ej. 'score')
+            value: Valor de la salida cuando la regla se activa por completo
+            weight: Importancia relativa de la regla
+        """
+        for variable, term in antecedents:
+            if variable not in self.variables:
+                raise ValueError(f"Variable difusa desconocida: {variable}")
+            if term not in self.variables[variable].terms:
+                raise ValueError(f"Término '{term}' no definido para '{variable}'")
+        rule = FuzzyRule(tuple(antecedents), output, float(value), float(weight))
+        self.rules.append(rule)
+        return rule
+
+    def _is_dead(self, antecedents: Tuple[Tuple[str, str], ...], weight: float) -> bool:
+        """Una regla nunca aporta si su peso es 0 o exige dos términos disjuntos de la misma variable"""
+        if weight <= 0 or not antecedents:
+            return True
+        by_variable: Dict[str, List[FuzzyTerm]] = {}
+        for variable, term in antecedents:
+            by_variable.setdefault(variable, []).append(self.variables[variable].terms[term])
+        for terms in by_variable.values():
+            lower = max(t.support()[0] for t in terms)
+            upper = min(t.support()[1] for t in terms)
+            if lower >= upper:
+                return True
+        return False
+
+    def compile(self) -> "CompiledRuleBase":
+        """Genera el plan de evaluación de las reglas vigentes"""
+        # Normalizar antecedentes (orden fijo, sin repetidos) y fusionar duplicados
+        merged: Dict[Tuple[Tuple[Tuple[str, str], ...], str, float], float] = {}
+        dead_rules: List[FuzzyRule] = []
+        for rule in self.rules:
+            antecedents = tuple(sorted(set(rule.antecedents)))
+            if self._is_dead(antecedents, rule.weight):
+                dead_rules.append(rule)
+                continue
+            key = (antecedents, rule.output, rule.value)
+            merged[key] = merged.get(key, 0.0) + rule.weight
+
+        # Membresías usadas (cada una se calcula una vez por evaluación)
+        memberships: List[Tuple[str, str]] = sorted({a for antecedents, _, _ in merged for a in antecedents})
+        membership_index = {m: i for i, m in enumerate(memberships)}
+
+        # Conjunciones memoizadas por prefijo: paso i = min(paso[prefijo], membresía)
+        steps: List[Tuple[int, int]] = []
+        conjunction_index: Dict[Tuple[Tuple[str, str], ...], int] = {}
+
+        def conjunction(antecedents: Tuple[Tuple[str, str], ...]) -> int:
+            if antecedents in conjunction_index:
+                return conjunction_index[antecedents]
+            prefix = conjunction(antecedents[:-1]) if len(antecedents) > 1 else -1
+            steps.append((prefix, membership_index[antecedents[-1]]))
+            conjunction_index[antecedents] = len(steps) - 1
+            return len(steps) - 1
+
+        outputs: Dict[str, Tuple[List[int], List[float], List[float]]] = {}
+        for (antecedents, output, value), weight in merged.items():
+            indices, values, weights = outputs.setdefault(output, ([], [], []))
+            indices.append(conjunction(antecedents))
+            values.append(value)
+            weights.append(weight)
+
+        return CompiledRuleBase(
+            terms=[self.variables[v].terms[t] for v, t in memberships],
+            membership_variables=[v for v, _ in memberships],
+            steps=steps,
+            outputs={name: (np.array(i, dtype=np.intp), np.array(v), np.array(w))
+                     for name, (i, v, w) in outputs.items()},
+            active_rules=len(merged),
+            dead_rules=dead_rules,
+            aggregations={name: self.aggregations.get(name, 'weighted_average') for name in outputs},
+        )
+
+
+class CompiledRuleBase:
+    """Plan de evaluación de una FuzzyRuleBase (ver FuzzyRuleBase.compile)"""
+
+    def __init__(self, terms: List[FuzzyTerm], membership_variables: List[str],
+                 steps: List[Tuple[int, int]], outputs: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]],
+                 active_rules: int, dead_rules: List[FuzzyRule], aggregations: Optional[Dict[str, str]] = None):
+        self.terms = terms
+        self.membership_variables = membership_variables
+        self.steps = steps
+        self.outputs = outputs
+        self.active_rules = active_rules
+        self.dead_rules = dead_rules
+        self.aggregations = aggregations or {}
+        self.input_variables = sorted(set(membership_variables))
+
+    def _required_steps(self, outputs: Iterable[str]) -> Set[int]:
+        """Conjunciones (con sus prefijos) que usan las salidas pedidas"""
+        required: Set[int] = set()
+        pending = [int(i) for output in outputs for i in self.outputs[output][0]]
+        while pending:
+            step = pending.pop()
+            if step >= 0 and step not in required:
+                required.add(step)
+                pending.append(self.steps[step][0])
+        return required
+
+    def required_inputs(self, outputs: Optional[Iterable[str]] = None) -> List[str]:
+        """Variables de entrada que necesitan las salidas pedidas (todas por defecto)"""
+        if outputs is None:
+            return self.input_variables
+        return sorted({self.membership_variables[self.steps[i][1]] for i in self._required_steps(outputs)})
+
+    def firing_strengths(self, inputs: Dict[str, np.ndarray],
+                         outputs: Optional[Iterable[str]] = None) -> np.ndarray:
+        """
+        Grado de activación de cada conjunción del plan: array (conjunciones, n)
+        Con `outputs` solo se calculan las conjunciones de esas salidas (las demás quedan en 0)
+        """
+        required = set(range(len(self.steps))) if outputs is None else self._required_steps(outputs)
+        variables = self.required_inputs(outputs)
+        missing = [v for v in variables if v not in inputs]
+        if missing:
+            raise ValueError(f"Faltan entradas para las variables: {', '.join(missing)}")
+
+        columns = {v: np.asarray(inputs[v], dtype=np.float64) for v in variables}
+        shape = np.broadcast_shapes(*(c.shape for c in columns.values())) if columns else ()
+        memberships = {m: self.terms[m].evaluate(columns[self.membership_variables[m]])
+                       for m in sorted({self.steps[i][1] for i in required})}
+
+        strengths = np.zeros((len(self.steps),) + shape, dtype=np.float64)
+        for i in sorted(required):
+            prefix, membership = self.steps[i]
+            if prefix < 0:
+                strengths[i] = memberships[membership]
+            else:
+                np.minimum(strengths[prefix], memberships[membership], out=strengths[i])
+        return strengths
+
+    def evaluate(self, inputs: Dict[str, np.ndarray],
+                 outputs: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Evalúa las reglas sobre arrays de entradas
+
+        Args:
+            inputs: {variable: array de valores}, un valor por propiedad
+            outputs: Salidas a calcular (todas por defecto); solo hacen falta sus entradas
+
+        Returns:
+            {salida: array} con el promedio de los valores de las reglas ponderado por
+            peso × activación (0.0 donde ninguna regla se activa), o con su suma si la
+            salida se agrega con 'sum'
+        """
+        outputs = list(self.outputs) if outputs is None else list(outputs)
+        unknown = [o for o in outputs if o not in self.outputs]
+        if unknown:
+            raise ValueError(f"Salidas sin reglas: {', '.join(unknown)}")
+        strengths = self.firing_strengths(inputs, outputs)
+        results = {}
+        for output in outputs:
+            indices, values, weights = self.outputs[output]
+            activation = strengths[indices] * weights.reshape((-1,) + (1,) * (strengths.ndim - 1))
+            weighted = np.tensordot(values, activation, axes=1)
+            if self.aggregations.get(output) == 'sum':
+                results[output] = weighted
+                continue
+            total = activation.sum(axis=0)
+            results[output] = np.divide(weighted, total, out=np.zeros_like(total), where=total > 0)
+        return results
+
+    def evaluate_one(self, **inputs: float) -> Dict[str, float]:
+        """Evalúa un solo caso con las salidas que alcanzan las entradas dadas: evaluate_one(precio=55000)"""
+        outputs = [o for o in self.outputs if set(self.required_inputs([o])) <= set(inputs)] or None
+        results = self.evaluate({v: np.array([value], dtype=np.float64) for v, value in inputs.items()}, outputs)
+        return {output: float(values[0]) for output, values in results.items()}
+
+
+def create_housing_rule_base(compiled: bool = True) -> Union[CompiledRuleBase, FuzzyRuleBase]:
+    """
+    Base de reglas de la recomendación, construida desde las tablas de models.housing_frames
+
+    - precio / area: un término por rango de RANGOS_PRECIO / RANGOS_AREA (trapecio
+      entre min y max, pleno en target ± tolerancia); las salidas 'precio_<rango>'
+      y 'area_<rango>' dan el grado de pertenencia a cada rango
+    - distancia_<amenidad>: término 'ideal' pleno hasta DISTANCIAS_IDEALES y nulo
+      desde el triple (el mismo que calcular_membership_distancia); la salida
+      'amenidades' suma peso de AMENIDADES_PESOS × pertenencia, y las amenidades
+      sin entrada en las tablas usan la variable de AMENIDAD_OTRA
+
+    Returns:
+        CompiledRuleBase (o FuzzyRuleBase si compiled=False)
+    """
+    from models.housing_frames import (AMENIDAD_OTRA, AMENIDADES_PESOS, DISTANCIA_IDEAL_DEFECTO, DISTANCIAS_IDEALES,
+                                       PESO_AMENIDAD_DEFECTO, RANGOS_AREA, RANGOS_PRECIO, variable_distancia)
+
+    rule_base = FuzzyRuleBase()
+    for variable, rangos in (('precio', RANGOS_PRECIO), ('area', RANGOS_AREA)):
+        fuzzy_variable = rule_base.add_variable(FuzzyVariable(variable))
+        for nombre, rango in rangos.items():
+            fuzzy_variable.add_term(nombre, 'trapezoidal', rango.min_val, rango.target - rango.tolerancia,
+                                    rango.target + rango.tolerancia, rango.max_val)
+            rule_base.add_rule([(variable, nombre)], f'{variable}_{nombre}', 1.0)
+            rule_base.set_aggregation(f'{variable}_{nombre}', 'sum')
+
+    tipos = list(dict.fromkeys([*AMENIDADES_PESOS, *DISTANCIAS_IDEALES, AMENIDAD_OTRA]))
+    for tipo in tipos:
+        ideal = DISTANCIAS_IDEALES.get(tipo, DISTANCIA_IDEAL_DEFECTO)
+        variable = rule_base.add_variable(FuzzyVariable(variable_distancia(tipo)))
+        variable.add_term('ideal', 'trapezoidal', float('-inf'), float('-inf'), ideal, ideal * 3)
+        rule_base.add_rule([(variable.name, 'ideal')], 'amenidades', 1.0,
+                           weight=AMENIDADES_PESOS.get(tipo, PESO_AMENIDAD_DEFECTO))
+    rule_base.set_aggregation('amenidades', 'sum')
+
+    return rule_base.compile() if compiled else rule_base
@@ -6,11 +6,15 @@ QUÉ HACE: Evalúa accesibilidad según modo de transporte
 - TransportAccessibilityEvaluator
   - evaluate_accessibility()           # Evalúa una distancia
   - compare_accessibility_modes()      # Compara varios transportes
+- CompiledTransportEvaluator
+  - evaluate_many()                    # Evalúa arrays de distancias/modos de una vez
+  - best_modes()                       # Mejor transporte para cada distancia
 
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Sequence, Union
 from enum import Enum
+import numpy as np
 from fuzzy.fuzzy_logic import FuzzyLogic
 
 
@@ -156,6 +160,24 @@ class TransportAccessibilityEvaluator:
         
         return memberships
     
+    def calculate_transport_memberships_array(self, distances, transport_mode: TransportType) -> Dict[str, np.ndarray]:
+        """Versión vectorizada de _calculate_transport_specific_memberships para un array de distancias"""
+        distances = np.asarray(distances, dtype=np.float64)
+        ranges = self.accessibility_ranges[transport_mode]
+        memberships = {}
+        
+        for label in ('very_close', 'close', 'moderate', 'far'):
+            inicio, fin = ranges[label]
+            memberships[label] = FuzzyLogic.triangular_membership_array(
+                distances, inicio, inicio + (fin - inicio) / 2, fin
+            )
+        
+        memberships['very_far'] = FuzzyLogic.gaussian_membership_array(
+            distances, ranges['very_far'][0] + 1000, 2000
+        )
+        
+        return memberships
+    
     def compare_accessibility_modes(self, distance: float, available_transports: List[TransportType]) -> Dict[str, Dict[str, Any]]:
         """
         Compara la accesibilidad usando diferentes modos de transporte para la misma distancia
@@ -184,3 +206,107 @@ class TransportAccessibilityEvaluator:
             'best_transport': sorted_transports[0][0] if sorted_transports else None,
             'accessibility_ranking': [transport[0] for transport in sorted_transports]
         }
+
+
+# Etiquetas en orden de cercanía y su score de accesibilidad (igual que evaluate_accessibility)
+CLASSIFICATIONS = ('very_close', 'close', 'moderate', 'far', 'very_far')
+CLASSIFICATION_SCORES = np.array([1.0, 0.8, 0.6, 0.3, 0.0])
+
+ACCESSIBILITY_DTYPE = np.dtype([
+    ('classification', np.uint8),          # posición en CLASSIFICATIONS
+    ('accessibility_score', np.float64),
+    ('estimated_time_minutes', np.float64),
+    ('distance_km', np.float64),
+    ('transport_mode', np.uint8),          # posición en CompiledTransportEvaluator.modes
+    ('very_close', np.float64),
+    ('close', np.float64),
+    ('moderate', np.float64),
+    ('far', np.float64),
+    ('very_far', np.float64),
+])
+
+
+class CompiledTransportEvaluator:
+    """
+    Evaluador de accesibilidad precompilado para lotes
+    Los rangos de cada modo se pasan a arrays una sola vez; evaluate_many evalúa
+    todos los pares distancia/modo con operaciones vectorizadas y devuelve un
+    array estructurado (ACCESSIBILITY_DTYPE) con los mismos valores que
+    evaluate_accessibility.
+    """
+    
+    def __init__(self, evaluator: Optional[TransportAccessibilityEvaluator] = None):
+        evaluator = evaluator or TransportAccessibilityEvaluator()
+        self.modes: List[TransportType] = list(evaluator.accessibility_ranges)
+        self.mode_index = {mode: i for i, mode in enumerate(self.modes)}
+        
+        ranges = [evaluator.accessibility_ranges[mode] for mode in self.modes]
+        # Límite superior de very_close, close, moderate y far por modo: (modos, 4)
+        self.upper_bounds = np.array([[r[label][1] for label in CLASSIFICATIONS[:4]] for r in ranges], dtype=np.float64)
+        # Triángulos (inicio, medio, fin) por modo y etiqueta: (modos, 4)
+        self.starts = np.array([[r[label][0] for label in CLASSIFICATIONS[:4]] for r in ranges], dtype=np.float64)
+        self.peaks = self.starts + (self.upper_bounds - self.starts) / 2
+        self.very_far_centers = np.array([r['very_far'][0] + 1000 for r in ranges], dtype=np.float64)
+        self.time_per_km = np.array([evaluator.time_per_km[mode] for mode in self.modes], dtype=np.float64)
+    
+    def _mode_indices(self, modes: Union[TransportType, Sequence[TransportType]]) -> np.ndarray:
+        if isinstance(modes, TransportType):
+            return np.array(self.mode_index[modes], dtype=np.intp)
+        return np.array([self.mode_index[mode] for mode in modes], dtype=np.intp)
+    
+    def evaluate_many(self, distances, modes: Union[TransportType, Sequence[TransportType]]) -> np.ndarray:
+        """
+        Evalúa la accesibilidad de muchas distancias a la vez
+        
+        Args:
+            distances: Distancias en metros (array)
+            modes: Un modo para todas o uno por distancia (se combinan por broadcasting)
+            
+        Returns:
+            Array estructurado ACCESSIBILITY_DTYPE con la forma de distances/modes
+        """
+        distances = np.asarray(distances, dtype=np.float64)
+        distances, idx = np.broadcast_arrays(distances, self._mode_indices(modes))
+        
+        result = np.empty(distances.shape, dtype=ACCESSIBILITY_DTYPE)
+        
+        # Clasificación: cantidad de límites superiores que la distancia supera
+        classification = (distances[..., None] > self.upper_bounds[idx]).sum(axis=-1)
+        result['classification'] = classification
+        result['accessibility_score'] = CLASSIFICATION_SCORES[classification]
+        
+        distance_km = distances / 1000
+        result['estimated_time_minutes'] = np.round(distance_km * self.time_per_km[idx], 1)
+        result['distance_km'] = np.round(distance_km, 2)
+        result['transport_mode'] = idx
+        
+        for j, label in enumerate(CLASSIFICATIONS[:4]):
+            result[label] = FuzzyLogic.triangular_membership_array(
+                distances, self.starts[idx, j], self.peaks[idx, j], self.upper_bounds[idx, j]
+            )
+        result['very_far'] = FuzzyLogic.gaussian_membership_array(distances, self.very_far_centers[idx], 2000)
+        
+        return result
+    
+    def best_modes(self, distances, available_transports: List[TransportType]) -> np.ndarray:
+        """
+        Mejor transporte para cada distancia (como best_transport de compare_accessibility_modes)
+        
+        Returns:
+            Array con la posición en available_transports del mejor modo
+        """
+        distances = np.asarray(distances, dtype=np.float64)
+        scores = self.evaluate_many(distances[..., None], available_transports)['accessibility_score']
+        # argmax devuelve el primero ante empates, igual que el sort estable de compare_accessibility_modes
+        return scores.argmax(axis=-1)
+    
+    def to_dict(self, row: np.void) -> Dict[str, Any]:
+        """Convierte una fila del resultado al formato de evaluate_accessibility"""
+        return {
+            'classification': CLASSIFICATIONS[int(row['classification'])],
+            'accessibility_score': float(row['accessibility_score']),
+            'estimated_time_minutes': float(row['estimated_time_minutes']),
+            'distance_km': float(row['distance_km']),
+            'transport_mode': self.modes[int(row['transport_mode'])].value,
+            'fuzzy_memberships': {label: float(row[label]) for label in CLASSIFICATIONS}
+        }
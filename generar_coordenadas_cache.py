@@ -1,99 +1,156 @@
 """
 Script para pre-calcular coordenadas de todas las propiedades
-Se ejecuta UNA SOLA VEZ y guarda resultados en JSON
+Guarda resultados en data/coordenadas_cache.json y en formato columnar
+(data/coordenadas/, arrays .npy que la UI abre con memory-map)
+
+Usa el pipeline de geocoding/batch_geocoder.py: las direcciones repetidas se
+consultan una sola vez, el progreso se guarda en un checkpoint y si se
+interrumpe, al volver a ejecutarlo retoma donde quedó.
+
+Uso:
+    python generar_coordenadas_cache.py [--hilos 4] [--reiniciar] [--offline]
+    python generar_coordenadas_cache.py --convertir
+
+Con --offline solo se usa el gazetteer local (sin Nominatim). Con --convertir
+solo se genera el formato columnar a partir del JSON existente.
 """
 
+import argparse
 import pandas as pd
 import json
-import time
-from geocoding.geocoder import Geocoder
+import os
+from geocoding.batch_geocoder import BatchGeocoder, GazetteerBackend, NominatimBackend, CHECKPOINT_DEFECTO
+from geocoding.coordinates_store import DIRECTORIO_DEFECTO, convertir_json, guardar_store
+
+CSV_PATH = 'data/alquiler_inmuebles.csv'
+CACHE_FILE = 'data/coordenadas_cache.json'
+
+
+def ubicacion_de_fila(row) -> str:
+    """Mejor dirección disponible de una fila del CSV"""
+    for columna in ('ubicacion', 'direccion', 'ciudad'):
+        valor = row.get(columna)
+        if pd.notna(valor) and str(valor).strip():
+            return str(valor).strip()
+    return 'Mendoza'
+
+
+def entrada_cache(row, ubicacion: str, coords) -> dict:
+    """Entrada de coordenadas_cache.json para una fila geocodificada"""
+    return {
+        'ubicacion': ubicacion,
+        'lat': coords[0],
+        'lon': coords[1],
+        'precio': float(row.get('alquiler', 0)) if pd.notna(row.get('alquiler')) else 0,
+        'habitaciones': int(row.get('dormitorios', 0)) if pd.notna(row.get('dormitorios')) else 0,
+        'ambientes': int(row.get('ambientes', 1)) if pd.notna(row.get('ambientes')) else 1,
+        'tipo': 'Departamento' if row.get('ambientes', 1) < 4 else 'Casa'
+    }
+
+
+def guardar_cache(cache_coordenadas: dict, cache_file: str = CACHE_FILE):
+    """Escribe el JSON en un archivo temporal y lo reemplaza (nunca queda a medio escribir)"""
+    temporal = cache_file + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(cache_coordenadas, f, indent=2, ensure_ascii=False)
+    os.replace(temporal, cache_file)
+
+
+def generar_cache_coordenadas(limite=None, hilos=4, backend=None, checkpoint=CHECKPOINT_DEFECTO,
+                              cache_file=CACHE_FILE, store_dir=DIRECTORIO_DEFECTO):
+    """
+    Geocodifica las propiedades del CSV y guarda el cache JSON
+
+    Args:
+        limite: Geocodificar solo las primeras N propiedades (None = todas)
+        hilos: Consultas simultáneas
+        backend: Backend de geocodificación (por defecto Nominatim con caché persistente)
+        checkpoint: Archivo de progreso para retomar ejecuciones interrumpidas
+        cache_file: Archivo JSON de salida
+        store_dir: Carpeta del formato columnar (None = no generarlo)
+    """
 
-def generar_cache_coordenadas():
-    """Geocodifica todas las propiedades y guarda en cache JSON"""
-    
     print("="*60)
     print("🗺️  GENERANDO CACHÉ DE COORDENADAS")
     print("="*60)
-    
+
     # Cargar CSV
     print("\n📂 Cargando propiedades desde CSV...")
-    df = pd.read_csv('data/alquiler_inmuebles.csv')
+    df = pd.read_csv(CSV_PATH)
+    if limite:
+        df = df.head(limite)
     print(f"✅ {len(df)} propiedades encontradas")
-    
-    geocoder = Geocoder()
-    cache_coordenadas = {}
-    
-    exitosos = 0
-    fallidos = 0
-    
+
+    ubicaciones = {idx: ubicacion_de_fila(row) for idx, row in df.iterrows()}
+
     print("\n🔄 Geocodificando propiedades...")
-    print("⏱️  Esto tomará varios minutos (1 request/segundo para respetar límites API)")
     print("-"*60)
-    
+    pipeline = BatchGeocoder(backend or NominatimBackend(), hilos=hilos, checkpoint=checkpoint)
+    resultados = pipeline.geocodificar(ubicaciones.values())
+
+    cache_coordenadas = {}
     for idx, row in df.iterrows():
-        # Obtener mejor dirección disponible
-        ubicacion = row.get('ubicacion') or row.get('direccion') or row.get('ciudad', 'Mendoza')
-        
-        # Mostrar progreso cada 10 propiedades
-        if idx % 10 == 0:
-            print(f"Progreso: {idx}/{len(df)} ({(idx/len(df)*100):.1f}%) - ✅ {exitosos} | ❌ {fallidos}")
-        
-        # Intentar geocodificar
-        coords = geocoder.geocode_poi(ubicacion)
-        
+        coords = resultados.get(ubicaciones[idx])
         if coords:
-            cache_coordenadas[str(idx)] = {
-                'ubicacion': ubicacion,
-                'lat': coords[0],
-                'lon': coords[1],
-                'precio': float(row.get('alquiler', 0)) if pd.notna(row.get('alquiler')) else 0,
-                'habitaciones': int(row.get('dormitorios', 0)) if pd.notna(row.get('dormitorios')) else 0,
-                'ambientes': int(row.get('ambientes', 1)) if pd.notna(row.get('ambientes')) else 1,
-                'tipo': 'Departamento' if row.get('ambientes', 1) < 4 else 'Casa'
-            }
-            exitosos += 1
-        else:
-            fallidos += 1
-        
-        # Respetar rate limit (1 req/seg)
-        time.sleep(1.1)
-    
+            cache_coordenadas[str(idx)] = entrada_cache(row, ubicaciones[idx], coords)
+
+    exitosos = len(cache_coordenadas)
+    fallidos = len(df) - exitosos
+
     print("-"*60)
     print(f"\n✅ Geocodificación completada!")
     print(f"   - Exitosos: {exitosos}/{len(df)} ({(exitosos/len(df)*100):.1f}%)")
     print(f"   - Fallidos: {fallidos}/{len(df)} ({(fallidos/len(df)*100):.1f}%)")
-    
+
     # Guardar en JSON
-    cache_file = 'data/coordenadas_cache.json'
     print(f"\n💾 Guardando caché en: {cache_file}")
-    
-    with open(cache_file, 'w', encoding='utf-8') as f:
-        json.dump(cache_coordenadas, f, indent=2, ensure_ascii=False)
-    
+    guardar_cache(cache_coordenadas, cache_file)
+    if store_dir:
+        guardar_store(cache_coordenadas, store_dir)
+
     print(f"✅ Caché guardado exitosamente!")
     print(f"   - Archivo: {cache_file}")
+    if store_dir:
+        print(f"   - Columnar: {store_dir}/")
     print(f"   - Tamaño: {len(cache_coordenadas)} propiedades geocodificadas")
-    
+
     print("\n" + "="*60)
     print("🎉 PROCESO COMPLETADO")
     print("="*60)
     print("\n💡 Ahora las búsquedas de proximidad serán INSTANTÁNEAS")
     print("   - No más esperas de 3-5 minutos")
     print("   - Los mapas se generarán en menos de 1 segundo")
-    
+
     return cache_coordenadas
 
 if __name__ == "__main__":
-    print("\n⚠️  ADVERTENCIA: Este script tomará 20-30 minutos")
+    parser = argparse.ArgumentParser(description="Genera data/coordenadas_cache.json")
+    parser.add_argument("--hilos", type=int, default=4, help="Consultas simultáneas")
+    parser.add_argument("--reiniciar", action="store_true", help="Descarta el checkpoint y empieza de cero")
+    parser.add_argument("--offline", action="store_true", help="Resolver solo con el gazetteer local")
+    parser.add_argument("--convertir", action="store_true",
+                        help="Solo convertir el JSON existente al formato columnar")
+    args = parser.parse_args()
+
+    if args.convertir:
+        filas = convertir_json(CACHE_FILE, DIRECTORIO_DEFECTO)
+        print(f"✅ {filas} propiedades convertidas a {DIRECTORIO_DEFECTO}/")
+        raise SystemExit(0)
+
+    if args.reiniciar and os.path.exists(CHECKPOINT_DEFECTO):
+        os.remove(CHECKPOINT_DEFECTO)
+
+    print("\n⚠️  ADVERTENCIA: la primera ejecución puede tomar varios minutos")
     print("   (respetamos el límite de 1 request/segundo de Nominatim)")
     print("\n💡 Puedes interrumpir con Ctrl+C en cualquier momento")
-    print("   y volver a ejecutar - el caché de geocoder evita re-consultas")
-    
+    print("   y volver a ejecutar - el checkpoint retoma donde quedó")
+
     respuesta = input("\n¿Continuar? (s/n): ")
-    
+
     if respuesta.lower() == 's':
         try:
-            generar_cache_coordenadas()
+            backend = GazetteerBackend() if args.offline else NominatimBackend()
+            generar_cache_coordenadas(hilos=args.hilos, backend=backend)
         except KeyboardInterrupt:
             print("\n\n⚠️  Proceso interrumpido por el usuario")
             print("💡 Puedes volver a ejecutar para continuar donde quedó")
@@ -0,0 +1,190 @@
+"""
+Geocodificación en lote con checkpoint
+Resuelve muchas direcciones (p. ej. la columna `ubicacion` del CSV) de forma
+concurrente y con tasa acotada:
+
+- Las direcciones repetidas se consultan una sola vez (clave normalizada)
+- Cada backend declara su tasa máxima; un token bucket la respeta entre todos los hilos
+- Cada resultado se agrega a un checkpoint JSONL apenas se obtiene, así una
+  ejecución interrumpida retoma desde donde quedó; al interrumpirla (Ctrl+C)
+  las consultas que no empezaron se cancelan en lugar de esperarlas
+- Los errores de red no se guardan en el checkpoint: se reintentan en la próxima ejecución
+"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+from geocoding.geocode_cache import normalizar_consulta
+from geocoding.gazetteer import Gazetteer, get_gazetteer
+from geocoding.geocoder import Geocoder
+from geocoding.rate_limiter import TokenBucket
+
+CHECKPOINT_DEFECTO = os.path.join('data', 'coordenadas_checkpoint.jsonl')
+
+Coordenadas = Optional[Tuple[float, float]]
+
+
+class GeocodingBackend:
+    """Interfaz de un backend de geocodificación para el lote"""
+
+    nombre = "base"
+    # Requests por segundo admitidas (None = sin límite, p. ej. backends locales)
+    tasa_maxima: Optional[float] = None
+
+    def buscar(self, consulta: str) -> Coordenadas:
+        """
+        Devuelve (lat, lon) o None si el lugar no existe
+
+        Raises:
+            Cualquier excepción para errores transitorios (se reintenta en otra ejecución)
+        """
+        raise NotImplementedError
+
+
+class NominatimBackend(GeocodingBackend):
+    """Backend sobre Geocoder: gazetteer local, caché persistente y Nominatim (1 req/s) como último recurso"""
+
+    nombre = "nominatim"
+    # Geocoder ya aplica LIMITE_NOMINATIM solo en las consultas que salen a la red,
+    # así los aciertos de caché no consumen turnos
+    tasa_maxima = None
+
+    def __init__(self, geocoder: Optional[Geocoder] = None):
+        self.geocoder = geocoder or Geocoder()
+
+    def buscar(self, consulta: str) -> Coordenadas:
+        if self.geocoder.gazetteer:
+            coords = self.geocoder.gazetteer.buscar(consulta)
+            if coords:
+                return coords
+        query = self.geocoder.construir_consulta(consulta)
+        encontrado, coords = self.geocoder.cache.obtener(query)
+        if encontrado:
+            return coords
+        return self.geocoder.consultar_nominatim(query)
+
+
+class GazetteerBackend(GeocodingBackend):
+    """Backend sin conexión: solo resuelve lo que está en el gazetteer local"""
+
+    nombre = "gazetteer"
+    tasa_maxima = None
+
+    def __init__(self, gazetteer: Optional[Gazetteer] = None):
+        self.gazetteer = gazetteer or get_gazetteer()
+
+    def buscar(self, consulta: str) -> Coordenadas:
+        return self.gazetteer.buscar(consulta)
+
+
+class BatchGeocoder:
+    """Pipeline de geocodificación en lote: deduplica, limita la tasa, paraleliza y guarda checkpoints"""
+
+    def __init__(self, backend: GeocodingBackend, hilos: int = 4,
+                 checkpoint: Optional[str] = CHECKPOINT_DEFECTO, capacidad_rafaga: float = 1.0):
+        """
+        Args:
+            backend: Backend que resuelve cada dirección
+            hilos: Consultas en vuelo simultáneas
+            checkpoint: Archivo JSONL de progreso (None = sin checkpoint)
+            capacidad_rafaga: Tokens acumulables del limitador
+        """
+        self.backend = backend
+        self.hilos = hilos
+        self.checkpoint = checkpoint
+        self.limitador = (TokenBucket(backend.tasa_maxima, capacidad_rafaga)
+                          if backend.tasa_maxima else None)
+        self._lock_checkpoint = threading.Lock()
+
+    def cargar_checkpoint(self) -> Dict[str, Coordenadas]:
+        """Lee los resultados ya obtenidos ({clave_normalizada: coords})"""
+        resueltas: Dict[str, Coordenadas] = {}
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return resueltas
+        with open(self.checkpoint, 'r', encoding='utf-8') as f:
+            for linea in f:
+                try:
+                    registro = json.loads(linea)
+                except json.JSONDecodeError:
+                    continue  # línea truncada por una interrupción
+                lat, lon = registro.get('lat'), registro.get('lon')
+                resueltas[registro['clave']] = None if lat is None else (lat, lon)
+        return resueltas
+
+    def _guardar(self, archivo, clave: str, consulta: str, coords: Coordenadas):
+        lat, lon = coords if coords else (None, None)
+        with self._lock_checkpoint:
+            archivo.write(json.dumps({'clave': clave, 'consulta': consulta, 'lat': lat, 'lon': lon},
+                                     ensure_ascii=False) + '\n')
+            archivo.flush()
+
+    def _resolver(self, consulta: str) -> Coordenadas:
+        if self.limitador:
+            self.limitador.adquirir()
+        return self.backend.buscar(consulta)
+
+    def geocodificar(self, consultas: Iterable[str], mostrar_progreso: bool = True) -> Dict[str, Coordenadas]:
+        """
+        Geocodifica un conjunto de direcciones
+
+        Returns:
+            {consulta: (lat, lon) o None}, para cada consulta de entrada resuelta
+            (las que fallaron por errores transitorios quedan afuera)
+        """
+        consultas = list(consultas)
+        unicas: Dict[str, str] = {}
+        for consulta in consultas:
+            unicas.setdefault(normalizar_consulta(consulta), consulta)
+
+        resueltas = self.cargar_checkpoint()
+        pendientes: List[Tuple[str, str]] = [(c, q) for c, q in unicas.items() if c not in resueltas]
+
+        if mostrar_progreso:
+            print(f"📋 {len(consultas)} direcciones → {len(unicas)} únicas "
+                  f"({len(unicas) - len(pendientes)} ya resueltas, {len(pendientes)} pendientes)")
+
+        errores = 0
+        if pendientes:
+            if self.checkpoint and os.path.dirname(self.checkpoint):
+                os.makedirs(os.path.dirname(self.checkpoint), exist_ok=True)
+            archivo = open(self.checkpoint, 'a', encoding='utf-8') if self.checkpoint else None
+            pool = ThreadPoolExecutor(max_workers=self.hilos)
+            futuros = {}
+            try:
+                futuros = {pool.submit(self._resolver, consulta): (clave, consulta)
+                           for clave, consulta in pendientes}
+                for hechas, futuro in enumerate(as_completed(futuros), 1):
+                    clave, consulta = futuros[futuro]
+                    try:
+                        coords = futuro.result()
+                    except Exception as e:
+                        errores += 1
+                        print(f"   ⚠️  Error geocodificando '{consulta}': {e}")
+                        continue
+                    resueltas[clave] = coords
+                    if archivo:
+                        self._guardar(archivo, clave, consulta, coords)
+                    if mostrar_progreso and (hechas % 25 == 0 or hechas == len(pendientes)):
+                        print(f"   ✓ {hechas}/{len(pendientes)} consultas ({hechas/len(pendientes)*100:.0f}%)")
+            except BaseException:
+                # Ctrl+C o error inesperado: no esperar a las consultas que todavía no
+                # empezaron y guardar las que ya terminaron antes de propagar
+                pool.shutdown(wait=False, cancel_futures=True)
+                for futuro, (clave, consulta) in futuros.items():
+                    if clave in resueltas or not futuro.done() or futuro.cancelled() or futuro.exception():
+                        continue
+                    resueltas[clave] = futuro.result()
+                    if archivo:
+                        self._guardar(archivo, clave, consulta, resueltas[clave])
+                raise
+            finally:
+                pool.shutdown(wait=False)
+                if archivo:
+                    archivo.close()
+
+        if mostrar_progreso and errores:
+            print(f"⚠️  {errores} direcciones con error (se reintentarán en la próxima ejecución)")
+
+        return {consulta: resueltas[normalizar_consulta(consulta)]
+                for consulta in consultas if normalizar_consulta(consulta) in resueltas}
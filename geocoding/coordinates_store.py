@@ -0,0 +1,159 @@
+"""
+Almacenamiento columnar del caché de coordenadas
+Alternativa binaria a data/coordenadas_cache.json: cada campo es un archivo
+.npy que se abre con memory-map, así la UI arranca sin parsear JSON y varios
+procesos comparten las mismas páginas del sistema operativo.
+
+Estructura de data/coordenadas/:
+    meta.json                 versión, cantidad de filas y tabla de tipos
+    ids.npy                   índice de fila del CSV (int64, ordenado)
+    lat.npy, lon.npy          float64
+    precio.npy                float64
+    habitaciones.npy          int32
+    ambientes.npy             int32
+    tipo.npy                  uint8 (posición en meta["tipos"])
+    ubicacion_bytes.npy       textos UTF-8 concatenados (uint8)
+    ubicacion_offsets.npy     inicio de cada texto (int64, n+1 valores)
+
+CoordinatesStore se comporta como el dict del JSON ({"idx": {...}}), de modo
+que el código existente sigue funcionando sin cambios.
+"""
+import json
+import os
+import shutil
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+import numpy as np
+
+DIRECTORIO_DEFECTO = os.path.join('data', 'coordenadas')
+VERSION = 1
+
+COLUMNAS_NUMERICAS = {
+    'lat': np.float64,
+    'lon': np.float64,
+    'precio': np.float64,
+    'habitaciones': np.int32,
+    'ambientes': np.int32,
+}
+
+
+def guardar_store(cache: Dict[str, Dict[str, Any]], directorio: str = DIRECTORIO_DEFECTO):
+    """
+    Escribe el caché ({idx: {'ubicacion', 'lat', 'lon', ...}}) en formato columnar
+
+    Se escribe en un directorio temporal que reemplaza al anterior al final,
+    así un lector nunca ve columnas de versiones distintas.
+    """
+    ids = sorted(cache, key=int)
+    filas = [cache[i] for i in ids]
+    tipos = sorted({fila.get('tipo', '') for fila in filas})
+
+    columnas = {'ids': np.array([int(i) for i in ids], dtype=np.int64)}
+    for nombre, dtype in COLUMNAS_NUMERICAS.items():
+        columnas[nombre] = np.array([fila.get(nombre, 0) for fila in filas], dtype=dtype)
+    columnas['tipo'] = np.array([tipos.index(fila.get('tipo', '')) for fila in filas], dtype=np.uint8)
+
+    textos = [fila.get('ubicacion', '').encode('utf-8') for fila in filas]
+    columnas['ubicacion_offsets'] = np.concatenate(([0], np.cumsum([len(t) for t in textos]))).astype(np.int64)
+    columnas['ubicacion_bytes'] = np.frombuffer(b''.join(textos), dtype=np.uint8)
+
+    temporal = directorio.rstrip(os.sep) + '.tmp'
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(temporal)
+    for nombre, valores in columnas.items():
+        np.save(os.path.join(temporal, f'{nombre}.npy'), valores)
+    with open(os.path.join(temporal, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'version': VERSION, 'filas': len(ids), 'tipos': tipos}, f, ensure_ascii=False)
+
+    anterior = directorio.rstrip(os.sep) + '.old'
+    shutil.rmtree(anterior, ignore_errors=True)
+    if os.path.exists(directorio):
+        os.replace(directorio, anterior)
+    os.replace(temporal, directorio)
+    shutil.rmtree(anterior, ignore_errors=True)
+
+
+def convertir_json(ruta_json: str, directorio: str = DIRECTORIO_DEFECTO) -> int:
+    """Convierte coordenadas_cache.json al formato columnar y devuelve la cantidad de filas"""
+    with open(ruta_json, 'r', encoding='utf-8') as f:
+        cache = json.load(f)
+    guardar_store(cache, directorio)
+    return len(cache)
+
+
+class CoordinatesStore(Mapping):
+    """Caché de coordenadas columnar (memory-mapped) con interfaz de dict de solo lectura"""
+
+    def __init__(self, directorio: str = DIRECTORIO_DEFECTO, mmap: bool = True):
+        """
+        Args:
+            directorio: Carpeta generada por guardar_store/convertir_json
+            mmap: Abrir las columnas con memory-map (False = cargarlas en memoria)
+        """
+        with open(os.path.join(directorio, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != VERSION:
+            raise ValueError(f"Versión de caché columnar no soportada: {self.meta.get('version')}")
+
+        modo = 'r' if mmap else None
+
+        def cargar(nombre):
+            return np.load(os.path.join(directorio, f'{nombre}.npy'), mmap_mode=modo)
+
+        self.ids = cargar('ids')
+        self.lat = cargar('lat')
+        self.lon = cargar('lon')
+        self.precio = cargar('precio')
+        self.habitaciones = cargar('habitaciones')
+        self.ambientes = cargar('ambientes')
+        self.tipo = cargar('tipo')
+        self._ubicacion_bytes = cargar('ubicacion_bytes')
+        self._ubicacion_offsets = cargar('ubicacion_offsets')
+        self.tipos = self.meta['tipos']
+
+    @staticmethod
+    def existe(directorio: str = DIRECTORIO_DEFECTO) -> bool:
+        return os.path.exists(os.path.join(directorio, 'meta.json'))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return (str(i) for i in self.ids.tolist())
+
+    def posicion(self, clave) -> int:
+        """Posición de un índice de fila en las columnas (KeyError si no existe)"""
+        try:
+            valor = int(clave)
+        except (TypeError, ValueError):
+            raise KeyError(clave)
+        posicion = int(np.searchsorted(self.ids, valor))
+        if posicion >= len(self.ids) or self.ids[posicion] != valor:
+            raise KeyError(clave)
+        return posicion
+
+    def ubicacion(self, posicion: int) -> str:
+        inicio, fin = self._ubicacion_offsets[posicion], self._ubicacion_offsets[posicion + 1]
+        return bytes(self._ubicacion_bytes[inicio:fin]).decode('utf-8')
+
+    def fila(self, posicion: int) -> Dict[str, Any]:
+        """Fila en el mismo formato que una entrada de coordenadas_cache.json"""
+        return {
+            'ubicacion': self.ubicacion(posicion),
+            'lat': float(self.lat[posicion]),
+            'lon': float(self.lon[posicion]),
+            'precio': float(self.precio[posicion]),
+            'habitaciones': int(self.habitaciones[posicion]),
+            'ambientes': int(self.ambientes[posicion]),
+            'tipo': self.tipos[int(self.tipo[posicion])],
+        }
+
+    def __getitem__(self, clave) -> Dict[str, Any]:
+        return self.fila(self.posicion(clave))
+
+    def __contains__(self, clave) -> bool:
+        try:
+            self.posicion(clave)
+            return True
+        except KeyError:
+            return False
@@ -0,0 +1,219 @@
+"""
+Gazetteer local para geocodificación sin conexión
+Índice en memoria de lugares con coordenadas ya conocidas, construido a partir de:
+
+- data/coordenadas_cache.json (direcciones del CSV ya geocodificadas)
+- los aciertos guardados en la caché persistente de Nominatim
+- un archivo opcional de calles/POIs importados (CSV con columnas nombre,lat,lon)
+
+Las direcciones se normalizan por componentes ("Av. San Martín 90, Ciudad de
+Mendoza, Mendoza" → calle "av san martin 90", localidad "ciudad de mendoza") y
+se buscan en orden: coincidencia exacta, misma calle sin localidad (si no es
+ambigua) y coincidencia aproximada entre candidatos que comparten palabras.
+La coincidencia aproximada solo tolera errores en los nombres de calle y
+localidad: la altura tiene que ser la misma ("Garibaldi 1000" no es
+"Garibaldi 100"). Si nada coincide, Geocoder recurre a Nominatim.
+"""
+import csv
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from geocoding.geocode_cache import get_geocode_cache, normalizar_consulta
+
+RUTA_COORDENADAS = os.path.join('data', 'coordenadas_cache.json')
+RUTA_IMPORTADOS = os.path.join('data', 'gazetteer.csv')
+
+# Componentes finales que solo dan contexto (no distinguen lugares dentro de la provincia)
+CONTEXTO = {'mendoza', 'argentina', 'provincia de mendoza', 'mendoza argentina'}
+
+# Variantes de escritura frecuentes en las publicaciones
+SINONIMOS = {'avenida': 'av', 'avda': 'av', 'bº': 'barrio', 'bo': 'barrio', 'b': 'barrio', 'gral': 'general'}
+DESCARTAR = {'n', 'nro', 'al', 'calle', 's', 'sn'}
+
+# Similitud mínima para aceptar una coincidencia aproximada
+UMBRAL_SIMILITUD = 0.88
+MAX_CANDIDATOS = 25
+
+Coordenadas = Tuple[float, float]
+
+# Altura al final de la calle ("garibaldi 100", "25 de mayo 1200", "calle 100" → "100")
+ALTURA = re.compile(r'^(?:(.*\D)\s+)?(\d+)$')
+
+
+def _normalizar_componente(componente: str) -> str:
+    palabras = []
+    for palabra in normalizar_consulta(componente).split():
+        palabra = SINONIMOS.get(palabra, palabra)
+        if palabra not in DESCARTAR:
+            palabras.append(palabra)
+    return ' '.join(palabras)
+
+
+def componentes_direccion(direccion: str) -> Tuple[str, ...]:
+    """Componentes normalizados de una dirección, sin contexto provincial ni repeticiones"""
+    componentes: List[str] = []
+    for parte in direccion.split(','):
+        parte = _normalizar_componente(parte)
+        if parte and parte not in componentes:
+            componentes.append(parte)
+    while len(componentes) > 1 and componentes[-1] in CONTEXTO:
+        componentes.pop()
+    return tuple(componentes)
+
+
+def separar_altura(calle: str) -> Tuple[str, Optional[str]]:
+    """Separa la altura de una calle normalizada: "garibaldi 100" → ("garibaldi", "100")"""
+    match = ALTURA.match(calle)
+    if match:
+        return (match.group(1) or '').strip(), match.group(2)
+    return calle, None
+
+
+def _sin_altura(componentes: Iterable[str]) -> Tuple[Optional[str], str]:
+    """Altura de la calle y el resto de la dirección sin ella, para comparar nombres"""
+    componentes = list(componentes)
+    calle, altura = separar_altura(componentes[0])
+    return altura, ' | '.join([calle] + componentes[1:])
+
+
+class Gazetteer:
+    """Índice local de lugares → coordenadas con búsqueda exacta y aproximada"""
+
+    def __init__(self, umbral: float = UMBRAL_SIMILITUD):
+        self.umbral = umbral
+        self._lugares: Dict[str, Coordenadas] = {}
+        self._por_calle: Dict[str, Set[str]] = defaultdict(set)
+        self._por_palabra: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._lugares)
+
+    def agregar(self, nombre: str, lat: float, lon: float):
+        """Agrega (o reemplaza) un lugar conocido"""
+        componentes = componentes_direccion(nombre)
+        if not componentes:
+            return
+        clave = ' | '.join(componentes)
+        with self._lock:
+            self._lugares[clave] = (float(lat), float(lon))
+            self._por_calle[componentes[0]].add(clave)
+            for palabra in clave.replace('|', ' ').split():
+                self._por_palabra[palabra].add(clave)
+
+    def agregar_cache_coordenadas(self, ruta: str = RUTA_COORDENADAS) -> int:
+        """Incorpora las direcciones de coordenadas_cache.json"""
+        if not os.path.exists(ruta):
+            return 0
+        with open(ruta, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+        for entrada in datos.values():
+            self.agregar(entrada['ubicacion'], entrada['lat'], entrada['lon'])
+        return len(datos)
+
+    def agregar_csv(self, ruta: str = RUTA_IMPORTADOS) -> int:
+        """Incorpora un archivo de calles/POIs con columnas nombre,lat,lon"""
+        if not os.path.exists(ruta):
+            return 0
+        cantidad = 0
+        with open(ruta, 'r', encoding='utf-8', newline='') as f:
+            for fila in csv.DictReader(f):
+                self.agregar(fila['nombre'], float(fila['lat']), float(fila['lon']))
+                cantidad += 1
+        return cantidad
+
+    def agregar_lugares(self, lugares: Iterable[Tuple[str, float, float]]) -> int:
+        cantidad = 0
+        for nombre, lat, lon in lugares:
+            self.agregar(nombre, lat, lon)
+            cantidad += 1
+        return cantidad
+
+    def _unico(self, claves: Set[str]) -> Optional[Coordenadas]:
+        """Coordenadas si todas las claves apuntan prácticamente al mismo punto (~1 km)"""
+        puntos = {self._lugares[c] for c in claves}
+        lats = [p[0] for p in puntos]
+        lons = [p[1] for p in puntos]
+        if max(lats) - min(lats) < 0.01 and max(lons) - min(lons) < 0.01:
+            return min(puntos)
+        return None
+
+    def buscar(self, consulta: str) -> Optional[Coordenadas]:
+        """
+        Busca una dirección o POI en el gazetteer
+
+        Returns:
+            (lat, lon) o None si no hay una coincidencia confiable
+        """
+        componentes = componentes_direccion(consulta)
+        if not componentes:
+            return None
+        clave = ' | '.join(componentes)
+
+        # 1. Coincidencia exacta
+        coords = self._lugares.get(clave)
+        if coords:
+            return coords
+
+        # 2. Misma calle/POI sin localidad en la consulta (solo si no es ambigua)
+        if len(componentes) == 1 and componentes[0] in self._por_calle:
+            coords = self._unico(self._por_calle[componentes[0]])
+            if coords:
+                return coords
+
+        # 3. Coincidencia aproximada entre los lugares que comparten más palabras
+        votos: Dict[str, int] = defaultdict(int)
+        for palabra in set(clave.replace('|', ' ').split()):
+            for candidato in self._por_palabra.get(palabra, ()):
+                votos[candidato] += 1
+        if not votos:
+            return None
+        candidatos = sorted(votos, key=votos.get, reverse=True)[:MAX_CANDIDATOS]
+
+        # Solo los nombres se comparan de forma aproximada; la altura debe coincidir exacta
+        altura, nombres = _sin_altura(componentes)
+        # SequenceMatcher cachea la consulta (seq2); las cotas rápidas descartan candidatos sin calcular ratio()
+        matcher = SequenceMatcher(None, '', nombres)
+        mejor, mejor_similitud = None, 0.0
+        for candidato in candidatos:
+            partes = candidato.split(' | ')
+            # Sin localidad en la consulta se compara solo contra la calle del candidato
+            altura_candidato, objetivo = _sin_altura(partes[:1] if len(componentes) == 1 else partes)
+            if altura_candidato != altura:
+                continue
+            matcher.set_seq1(objetivo)
+            minimo = max(self.umbral, mejor_similitud)
+            if matcher.real_quick_ratio() < minimo or matcher.quick_ratio() < minimo:
+                continue
+            similitud = matcher.ratio()
+            if similitud > mejor_similitud:
+                mejor, mejor_similitud = candidato, similitud
+        if mejor_similitud >= self.umbral:
+            return self._lugares[mejor]
+        return None
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """
+    Devuelve el gazetteer compartido del proceso, construido la primera vez desde
+    coordenadas_cache.json, el CSV importado y los aciertos de la caché de Nominatim
+    """
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            gazetteer = Gazetteer()
+            direcciones = gazetteer.agregar_cache_coordenadas()
+            importados = gazetteer.agregar_csv()
+            nominatim = gazetteer.agregar_lugares(get_geocode_cache().lugares())
+            print(f"📚 Gazetteer local: {len(gazetteer)} lugares "
+                  f"({direcciones} del caché, {importados} importados, {nominatim} de Nominatim)")
+            _gazetteer = gazetteer
+        return _gazetteer
@@ -0,0 +1,160 @@
+"""
+Caché persistente de geocodificación (SQLite)
+Guarda en disco los resultados de Nominatim, compartidos por todo el proceso
+y entre ejecuciones, para que las búsquedas repetidas de un mismo lugar no
+vuelvan a esperar el rate limit ni a consultar la API.
+
+- Las consultas se normalizan (minúsculas, sin acentos ni puntuación) antes de usarse como clave
+- También se guardan los resultados negativos (lugar no encontrado), con un TTL más corto
+- Las entradas vencen por TTL y, al superar `max_entradas`, se descartan las menos usadas (LRU)
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import List, Optional, Tuple
+
+# Ubicación por defecto (se puede cambiar con GEOCODE_CACHE_PATH)
+RUTA_CACHE_DEFECTO = os.path.join('data', 'geocode_cache.sqlite3')
+
+TTL_POSITIVO = 180 * 24 * 3600   # las coordenadas de un lugar casi nunca cambian
+TTL_NEGATIVO = 24 * 3600         # un "no encontrado" se reintenta al día siguiente
+MAX_ENTRADAS = 50000
+
+# last_used solo se reescribe si pasó este tiempo: las lecturas no generan una escritura cada vez
+INTERVALO_TOQUE = 3600
+
+
+def normalizar_consulta(consulta: str) -> str:
+    """Clave de caché: minúsculas, sin acentos, sin puntuación y con espacios simples"""
+    texto = unicodedata.normalize('NFKD', consulta)
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+    texto = re.sub(r'[^\w\s]', ' ', texto)
+    return ' '.join(texto.split())
+
+
+class GeocodeCache:
+    """Caché de geocodificación en SQLite, segura para varios hilos"""
+
+    def __init__(self, ruta: str = RUTA_CACHE_DEFECTO, ttl_positivo: float = TTL_POSITIVO,
+                 ttl_negativo: float = TTL_NEGATIVO, max_entradas: int = MAX_ENTRADAS):
+        """
+        Args:
+            ruta: Archivo SQLite (':memory:' para una caché temporal)
+            ttl_positivo: Segundos de validez de unas coordenadas encontradas
+            ttl_negativo: Segundos de validez de un resultado "no encontrado"
+            max_entradas: Entradas máximas antes de descartar las menos usadas
+        """
+        self.ruta = ruta
+        self.ttl_positivo = ttl_positivo
+        self.ttl_negativo = ttl_negativo
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+
+        if ruta != ':memory:' and os.path.dirname(ruta):
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        self._conn = sqlite3.connect(ruta, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode (
+                clave TEXT PRIMARY KEY,
+                consulta TEXT NOT NULL,
+                lat REAL,
+                lon REAL,
+                creado REAL NOT NULL,
+                usado REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS geocode_usado ON geocode(usado)")
+        self._conn.commit()
+
+    def obtener(self, consulta: str) -> Tuple[bool, Optional[Tuple[float, float]]]:
+        """
+        Busca una consulta en la caché
+
+        Returns:
+            (encontrado, coords): encontrado=False si no hay entrada vigente;
+            coords=None con encontrado=True es un resultado negativo cacheado
+        """
+        clave = normalizar_consulta(consulta)
+        ahora = time.time()
+        with self._lock:
+            fila = self._conn.execute(
+                "SELECT lat, lon, creado, usado FROM geocode WHERE clave = ?", (clave,)
+            ).fetchone()
+            if fila is None:
+                return False, None
+
+            lat, lon, creado, usado = fila
+            ttl = self.ttl_negativo if lat is None else self.ttl_positivo
+            if ahora - creado > ttl:
+                self._conn.execute("DELETE FROM geocode WHERE clave = ?", (clave,))
+                self._conn.commit()
+                return False, None
+
+            if ahora - usado > INTERVALO_TOQUE:
+                self._conn.execute("UPDATE geocode SET usado = ? WHERE clave = ?", (ahora, clave))
+                self._conn.commit()
+
+        return True, (None if lat is None else (lat, lon))
+
+    def guardar(self, consulta: str, coords: Optional[Tuple[float, float]]):
+        """Guarda el resultado de una consulta (coords=None para "no encontrado")"""
+        clave = normalizar_consulta(consulta)
+        lat, lon = coords if coords else (None, None)
+        ahora = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode (clave, consulta, lat, lon, creado, usado) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (clave, consulta, lat, lon, ahora, ahora)
+            )
+            sobrantes = self._conn.execute("SELECT count(*) FROM geocode").fetchone()[0] - self.max_entradas
+            if sobrantes > 0:
+                self._conn.execute(
+                    "DELETE FROM geocode WHERE clave IN "
+                    "(SELECT clave FROM geocode ORDER BY usado LIMIT ?)", (sobrantes,)
+                )
+            self._conn.commit()
+
+    def lugares(self) -> List[Tuple[str, float, float]]:
+        """Consultas resueltas con coordenadas: (consulta original, lat, lon)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT consulta, lat, lon FROM geocode WHERE lat IS NOT NULL"
+            ).fetchall()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM geocode").fetchone()[0]
+
+    def limpiar_vencidas(self) -> int:
+        """Elimina las entradas vencidas y devuelve cuántas se borraron"""
+        ahora = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM geocode WHERE (lat IS NULL AND creado < ?) OR (lat IS NOT NULL AND creado < ?)",
+                (ahora - self.ttl_negativo, ahora - self.ttl_positivo)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def cerrar(self):
+        with self._lock:
+            self._conn.close()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_geocode_cache(ruta: Optional[str] = None) -> GeocodeCache:
+    """Devuelve la caché compartida del proceso para esa ruta (por defecto GEOCODE_CACHE_PATH)"""
+    ruta = ruta or os.getenv('GEOCODE_CACHE_PATH', RUTA_CACHE_DEFECTO)
+    with _caches_lock:
+        if ruta not in _caches:
+            _caches[ruta] = GeocodeCache(ruta)
+        return _caches[ruta]
@@ -2,54 +2,105 @@
 Sistema de geocodificación usando OpenStreetMap Nominatim
 Convierte direcciones en coordenadas y calcula distancias
 """
-import time
 import requests
-from typing import Optional, Tuple
+import numpy as np
+from typing import Optional, Sequence, Tuple
 from math import radians, sin, cos, sqrt, atan2
+from geocoding.geocode_cache import GeocodeCache, get_geocode_cache
+from geocoding.gazetteer import Gazetteer, get_gazetteer
+from geocoding.rate_limiter import TokenBucket
+
+RADIO_TIERRA_KM = 6371.0
+
+# Nominatim admite 1 request/segundo por cliente: el límite es del proceso, no de cada Geocoder
+LIMITE_NOMINATIM = TokenBucket(tasa=1.0, capacidad=1)
+
 
 class Geocoder:
-    def __init__(self):
+    def __init__(self, cache: Optional[GeocodeCache] = None, gazetteer: Optional[Gazetteer] = None,
+                 usar_gazetteer: bool = True):
+        """
+        Args:
+            cache: Caché de resultados (por defecto la caché persistente compartida)
+            gazetteer: Gazetteer local (por defecto el compartido, construido al primer uso)
+            usar_gazetteer: False para consultar siempre la caché/Nominatim
+        """
         self.base_url = "https://nominatim.openstreetmap.org/search"
         self.headers = {'User-Agent': 'SistemaRecomendacionInmuebles/1.0'}
-        self.cache = {}
+        self.cache = cache if cache is not None else get_geocode_cache()
+        self.usar_gazetteer = usar_gazetteer
+        self._gazetteer = gazetteer
+    
+    @property
+    def gazetteer(self) -> Optional[Gazetteer]:
+        if not self.usar_gazetteer:
+            return None
+        if self._gazetteer is None:
+            self._gazetteer = get_gazetteer()
+        return self._gazetteer
         
-    def geocode_poi(self, nombre_lugar: str) -> Optional[Tuple[float, float]]:
-        """Busca coordenadas de un punto de interés"""
-        # Agregar contexto solo si no está presente
+    def construir_consulta(self, nombre_lugar: str) -> str:
+        """Consulta enviada a Nominatim (agrega contexto solo si no está presente)"""
         if "mendoza" not in nombre_lugar.lower() or "argentina" not in nombre_lugar.lower():
-            query = f"{nombre_lugar}, Mendoza, Argentina"
-        else:
-            query = nombre_lugar
+            return f"{nombre_lugar}, Mendoza, Argentina"
+        return nombre_lugar
         
-        if query in self.cache:
-            return self.cache[query]
+    def geocode_poi(self, nombre_lugar: str) -> Optional[Tuple[float, float]]:
+        """Busca coordenadas de un punto de interés (gazetteer local → caché → Nominatim)"""
+        if self.gazetteer:
+            coords = self.gazetteer.buscar(nombre_lugar)
+            if coords:
+                return coords
         
-        params = {'q': query, 'format': 'json', 'limit': 1}
+        query = self.construir_consulta(nombre_lugar)
+        
+        encontrado, coords = self.cache.obtener(query)
+        if encontrado:
+            return coords
         
         try:
-            time.sleep(1)  # Rate limiting
-            response = requests.get(self.base_url, params=params, headers=self.headers, timeout=5)
-            response.raise_for_status()
-            
-            results = response.json()
-            if results and len(results) > 0:
-                lat = float(results[0]['lat'])
-                lon = float(results[0]['lon'])
-                coords = (lat, lon)
-                self.cache[query] = coords
-                print(f"   📍 Encontrado: {nombre_lugar} → ({lat:.4f}, {lon:.4f})")
-                return coords
+            coords = self.consultar_nominatim(query)
+            if coords:
+                print(f"   📍 Encontrado: {nombre_lugar} → ({coords[0]:.4f}, {coords[1]:.4f})")
+            return coords
         except Exception as e:
             print(f"   ⚠️  Error buscando '{nombre_lugar}': {e}")
         
         return None
     
+    def consultar_nominatim(self, query: str) -> Optional[Tuple[float, float]]:
+        """
+        Consulta Nominatim (respetando el rate limit) y guarda el resultado en la caché
+        
+        Returns:
+            (lat, lon) o None si Nominatim no encontró el lugar
+        
+        Raises:
+            Errores de red o HTTP (no se cachean, para reintentar después)
+        """
+        params = {'q': query, 'format': 'json', 'limit': 1}
+        
+        LIMITE_NOMINATIM.adquirir()  # Rate limiting (solo cuando se consulta la API)
+        response = requests.get(self.base_url, params=params, headers=self.headers, timeout=5)
+        response.raise_for_status()
+        
+        results = response.json()
+        coords = None
+        if results and len(results) > 0:
+            coords = (float(results[0]['lat']), float(results[0]['lon']))
+        
+        # Una respuesta válida sin resultados se cachea como negativa
+        self.cache.guardar(query, coords)
+        if coords and self.gazetteer:
+            self.gazetteer.agregar(query, *coords)
+        return coords
+    
     @staticmethod
     def haversine_distance(coord1: Tuple[float, float], coord2: Tuple[float, float]) -> float:
         """Calcula distancia en km usando Haversine"""
         lat1, lon1 = coord1
         lat2, lon2 = coord2
-        R = 6371.0
+        R = RADIO_TIERRA_KM
         
         lat1_rad, lon1_rad = radians(lat1), radians(lon1)
         lat2_rad, lon2_rad = radians(lat2), radians(lon2)
@@ -61,3 +112,41 @@ class Geocoder:
         c = 2 * atan2(sqrt(a), sqrt(1 - a))
         
         return R * c
+    
+    @staticmethod
+    def haversine_many(origin: Tuple[float, float], lats: Sequence[float], lons: Sequence[float]) -> np.ndarray:
+        """
+        Distancias en km desde `origin` a muchos puntos a la vez (vectorizado con NumPy)
+        
+        Args:
+            origin: (lat, lon) de origen
+            lats, lons: Coordenadas destino (listas o arrays del mismo largo)
+        
+        Returns:
+            Array float64 con una distancia por punto
+        """
+        lat1, lon1 = np.radians(origin[0]), np.radians(origin[1])
+        lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+        lon2 = np.radians(np.asarray(lons, dtype=np.float64))
+        
+        a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+        a = np.clip(a, 0.0, 1.0)  # el redondeo puede dejar a > 1 en puntos antipodales
+        return RADIO_TIERRA_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    
+    @staticmethod
+    def haversine_matrix(lats1: Sequence[float], lons1: Sequence[float],
+                         lats2: Sequence[float], lons2: Sequence[float]) -> np.ndarray:
+        """
+        Matriz de distancias en km entre dos conjuntos de puntos
+        
+        Returns:
+            Array (len(lats1), len(lats2)): fila i = distancias del punto i a todos los del segundo conjunto
+        """
+        lat1 = np.radians(np.asarray(lats1, dtype=np.float64))[:, None]
+        lon1 = np.radians(np.asarray(lons1, dtype=np.float64))[:, None]
+        lat2 = np.radians(np.asarray(lats2, dtype=np.float64))[None, :]
+        lon2 = np.radians(np.asarray(lons2, dtype=np.float64))[None, :]
+        
+        a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+        a = np.clip(a, 0.0, 1.0)  # el redondeo puede dejar a > 1 en puntos antipodales
+        return RADIO_TIERRA_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
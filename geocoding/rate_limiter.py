@@ -0,0 +1,50 @@
+"""
+Limitador de tasa (token bucket) compartido entre hilos
+Se usa para respetar el límite de 1 request/segundo de Nominatim y para
+acotar la tasa de cualquier backend de geocodificación en lote.
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket seguro para varios hilos: `tasa` tokens por segundo, hasta `capacidad` acumulados"""
+
+    def __init__(self, tasa: float, capacidad: float = 1.0):
+        """
+        Args:
+            tasa: Tokens repuestos por segundo (requests/segundo sostenidos)
+            capacidad: Tokens máximos acumulables (tamaño de ráfaga)
+        """
+        if tasa <= 0:
+            raise ValueError("La tasa debe ser positiva")
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self._tokens = capacidad
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reponer(self):
+        ahora = time.monotonic()
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+
+    def intentar(self, tokens: float = 1.0) -> bool:
+        """Consume tokens si hay disponibles, sin esperar"""
+        with self._lock:
+            self._reponer()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def adquirir(self, tokens: float = 1.0):
+        """Bloquea hasta poder consumir `tokens`"""
+        while True:
+            with self._lock:
+                self._reponer()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                espera = (tokens - self._tokens) / self.tasa
+            time.sleep(espera)
@@ -0,0 +1,182 @@
+"""
+Índice espacial en grilla para búsquedas de proximidad
+Agrupa coordenadas en celdas de tamaño fijo (en grados) para responder
+consultas por radio y k vecinos más cercanos revisando solo las celdas
+próximas al punto, en lugar de calcular la distancia a todas las propiedades.
+
+Las coordenadas se guardan en arrays NumPy contiguos ordenados por celda:
+cada celda es un rango [inicio, fin) de esos arrays y las distancias de las
+celdas candidatas se calculan de una sola vez con Geocoder.haversine_many.
+"""
+from math import cos, floor, radians
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+import numpy as np
+from geocoding.coordinates_store import CoordinatesStore
+from geocoding.geocoder import Geocoder
+
+# Kilómetros por grado de latitud (radio terrestre 6371 km)
+KM_POR_GRADO = 111.195
+
+# ~1.1 km de lado: con los radios típicos (1-5 km) se revisan pocas decenas de celdas
+TAMANO_CELDA_GRADOS = 0.01
+
+
+class SpatialIndex:
+    """Índice de grilla lat/lon con consultas por radio y k vecinos"""
+
+    def __init__(self, puntos: Iterable[Tuple[Hashable, float, float]] = (),
+                 tamano_celda: float = TAMANO_CELDA_GRADOS):
+        """
+        Args:
+            puntos: Tuplas (clave, lat, lon)
+            tamano_celda: Lado de cada celda en grados
+        """
+        self.tamano_celda = tamano_celda
+        puntos = list(puntos)
+        self._construir([clave for clave, _, _ in puntos],
+                        np.fromiter((lat for _, lat, _ in puntos), dtype=np.float64, count=len(puntos)),
+                        np.fromiter((lon for _, _, lon in puntos), dtype=np.float64, count=len(puntos)))
+
+    @classmethod
+    def desde_arrays(cls, claves: List[Hashable], lats: np.ndarray, lons: np.ndarray,
+                     tamano_celda: float = TAMANO_CELDA_GRADOS) -> "SpatialIndex":
+        """Construye el índice directamente desde columnas (p. ej. un CoordinatesStore)"""
+        indice = cls(tamano_celda=tamano_celda)
+        indice._construir(list(claves), np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64))
+        return indice
+
+    def _construir(self, claves: List[Hashable], lats: np.ndarray, lons: np.ndarray):
+        tamano_celda = self.tamano_celda
+
+        # Ordenar por celda para que cada celda sea un rango contiguo
+        filas = np.floor(lats / tamano_celda).astype(np.int64)
+        cols = np.floor(lons / tamano_celda).astype(np.int64)
+        orden = np.lexsort((cols, filas))
+        self.lats = np.ascontiguousarray(lats[orden])
+        self.lons = np.ascontiguousarray(lons[orden])
+        self.claves: List[Hashable] = [claves[i] for i in orden]
+
+        self.celdas: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        filas, cols = filas[orden], cols[orden]
+        if len(orden):
+            cortes = np.flatnonzero((np.diff(filas) != 0) | (np.diff(cols) != 0)) + 1
+            inicios = np.concatenate(([0], cortes))
+            fines = np.concatenate((cortes, [len(orden)]))
+            for inicio, fin in zip(inicios.tolist(), fines.tolist()):
+                self.celdas[(int(filas[inicio]), int(cols[inicio]))] = (inicio, fin)
+
+    @classmethod
+    def desde_cache(cls, cache: Dict[str, Dict[str, Any]], **kwargs) -> "SpatialIndex":
+        """Construye el índice desde el caché de coordenadas ({idx: {'lat', 'lon', ...}} o CoordinatesStore)"""
+        if isinstance(cache, CoordinatesStore):
+            return cls.desde_arrays(list(cache), cache.lat, cache.lon, **kwargs)
+        return cls(((idx, datos['lat'], datos['lon']) for idx, datos in cache.items()), **kwargs)
+
+    def __len__(self):
+        return len(self.claves)
+
+    def _celda(self, lat: float, lon: float) -> Tuple[int, int]:
+        return floor(lat / self.tamano_celda), floor(lon / self.tamano_celda)
+
+    def _km_por_grado_lon(self, lat_max: float) -> float:
+        """Km por grado de longitud en la latitud más alejada del ecuador del rango (cota inferior)"""
+        return KM_POR_GRADO * max(cos(radians(min(abs(lat_max), 90.0))), 1e-6)
+
+    def _posiciones(self, celdas: Iterable[Tuple[int, int]]) -> np.ndarray:
+        """Posiciones (en los arrays ordenados) de los puntos de las celdas dadas"""
+        rangos = [self.celdas[c] for c in celdas if c in self.celdas]
+        if not rangos:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(inicio, fin) for inicio, fin in rangos])
+
+    def _distancias(self, origen: Tuple[float, float], posiciones: np.ndarray) -> np.ndarray:
+        return Geocoder.haversine_many(origen, self.lats[posiciones], self.lons[posiciones])
+
+    def _resultado(self, posiciones: np.ndarray, distancias: np.ndarray) -> List[Tuple[Hashable, float]]:
+        orden = np.argsort(distancias, kind="stable")
+        return [(self.claves[p], d) for p, d in zip(posiciones[orden].tolist(), distancias[orden].tolist())]
+
+    def consultar_radio(self, lat: float, lon: float, radio_km: float) -> List[Tuple[Hashable, float]]:
+        """
+        Devuelve los puntos a `radio_km` o menos del origen
+
+        Returns:
+            Lista de (clave, distancia_km) ordenada por distancia
+        """
+        if not self.claves:
+            return []
+
+        delta_lat = radio_km / KM_POR_GRADO
+        delta_lon = radio_km / self._km_por_grado_lon(abs(lat) + delta_lat)
+        fila_min, col_min = self._celda(lat - delta_lat, lon - delta_lon)
+        fila_max, col_max = self._celda(lat + delta_lat, lon + delta_lon)
+
+        # Con radios muy grandes es más barato recorrer las celdas ocupadas
+        if (fila_max - fila_min + 1) * (col_max - col_min + 1) > len(self.celdas):
+            candidatas = (c for c in self.celdas
+                          if fila_min <= c[0] <= fila_max and col_min <= c[1] <= col_max)
+        else:
+            candidatas = ((f, c) for f in range(fila_min, fila_max + 1) for c in range(col_min, col_max + 1))
+
+        posiciones = self._posiciones(candidatas)
+        distancias = self._distancias((lat, lon), posiciones)
+        dentro = distancias <= radio_km
+        return self._resultado(posiciones[dentro], distancias[dentro])
+
+    def _anillo(self, fila: int, col: int, r: int):
+        """Celdas a distancia de Chebyshev exactamente `r` de (fila, col)"""
+        if r == 0:
+            yield fila, col
+            return
+        for c in range(col - r, col + r + 1):
+            yield fila - r, c
+            yield fila + r, c
+        for f in range(fila - r + 1, fila + r):
+            yield f, col - r
+            yield f, col + r
+
+    def k_vecinos(self, lat: float, lon: float, k: int,
+                  max_km: Optional[float] = None) -> List[Tuple[Hashable, float]]:
+        """
+        Devuelve los `k` puntos más cercanos al origen
+
+        Revisa anillos de celdas crecientes y se detiene cuando ningún punto fuera
+        de los anillos revisados puede estar más cerca que el k-ésimo encontrado.
+
+        Args:
+            k: Cantidad de vecinos
+            max_km: Distancia máxima opcional
+
+        Returns:
+            Lista de (clave, distancia_km) ordenada por distancia
+        """
+        if not self.claves or k <= 0:
+            return []
+
+        fila, col = self._celda(lat, lon)
+        ocupadas = np.array(list(self.celdas), dtype=np.int64)
+        r_max = int(max(np.abs(ocupadas[:, 0] - fila).max(), np.abs(ocupadas[:, 1] - col).max()))
+
+        posiciones = np.empty(0, dtype=np.int64)
+        distancias = np.empty(0, dtype=np.float64)
+        for r in range(r_max + 1):
+            nuevas = self._posiciones(self._anillo(fila, col, r))
+            if len(nuevas):
+                posiciones = np.concatenate((posiciones, nuevas))
+                distancias = np.concatenate((distancias, self._distancias((lat, lon), nuevas)))
+                if len(distancias) > k:
+                    mejores = np.argpartition(distancias, k - 1)[:k]
+                    posiciones, distancias = posiciones[mejores], distancias[mejores]
+
+            # Todo punto no revisado está fuera del cuadrado de anillos 0..r
+            lat_lejana = abs(lat) + (r + 1) * self.tamano_celda
+            cota_km = r * self.tamano_celda * min(KM_POR_GRADO, self._km_por_grado_lon(lat_lejana))
+            if max_km is not None and cota_km > max_km:
+                break
+            if len(distancias) == k and cota_km >= distancias.max():
+                break
+
+        if max_km is not None:
+            dentro = distancias <= max_km
+            posiciones, distancias = posiciones[dentro], distancias[dentro]
+        return self._resultado(posiciones, distancias)
@@ -1,14 +1,233 @@
 """
 Carga propiedades reales desde alquiler_inmuebles.csv a Neo4j
+Las propiedades se escriben en lotes con UNWIND dentro de transacciones explícitas
+
+Modos:
+- Carga completa: limpia la base y crea todo desde cero
+- Sincronización incremental (--incremental): usa la columna `url` como clave
+  (o un hash de descripción y dirección si falta),
+  solo escribe propiedades nuevas o modificadas y marca como inactivas las que
+  ya no están en el CSV, sin tocar usuarios ni su historial. Las consultas
+  filtran las inactivas con coalesce(p.active, true)
 """
+import argparse
+import hashlib
+import json
+import re
 import pandas as pd
 from database.neo4j_connector import Neo4jConnector
+from typing import Dict, List
 import os
 
-def cargar_propiedades_desde_csv():
-    """Carga todas las propiedades del CSV real a Neo4j"""
+CSV_PATH = "data/alquiler_inmuebles.csv"
+TAMANO_LOTE_DEFECTO = 500
+
+QUERY_CREAR_PROPIEDADES = """
+    UNWIND $rows AS row
+    CREATE (p:Property {
+        id: row.id,
+        name: row.name,
+        url: row.url,
+        price: row.price,
+        rooms: row.rooms,
+        bedrooms: row.bedrooms,
+        bathrooms: row.bathrooms,
+        area: row.area,
+        content_hash: row.content_hash,
+        active: true
+    })
+    CREATE (a:Address {
+        street: row.street,
+        city: row.city,
+        neighborhood: row.neighborhood
+    })
+    CREATE (p)-[:HAS_ADDRESS]->(a)
+"""
+
+# Upsert por url: crea las nuevas y actualiza las modificadas (reactivándolas)
+QUERY_UPSERT_PROPIEDADES = """
+    UNWIND $rows AS row
+    MERGE (p:Property {url: row.url})
+    ON CREATE SET p.created_at = datetime()
+    SET p.id = row.id,
+        p.name = row.name,
+        p.price = row.price,
+        p.rooms = row.rooms,
+        p.bedrooms = row.bedrooms,
+        p.bathrooms = row.bathrooms,
+        p.area = row.area,
+        p.content_hash = row.content_hash,
+        p.active = true,
+        p.updated_at = datetime()
+    REMOVE p.inactive_since
+    MERGE (p)-[:HAS_ADDRESS]->(a:Address)
+    SET a.street = row.street,
+        a.city = row.city,
+        a.neighborhood = row.neighborhood
+"""
+
+# Publicaciones que desaparecieron del CSV: se conservan (y sus CLICKED/VIEWED) pero inactivas
+QUERY_DESACTIVAR_PROPIEDADES = """
+    UNWIND $rows AS row
+    MATCH (p:Property {url: row.url})
+    SET p.active = false,
+        p.inactive_since = datetime()
+"""
+
+QUERY_ESTADO_PROPIEDADES = """
+    MATCH (p:Property)
+    WHERE p.url IS NOT NULL
+    RETURN p.url AS url, p.id AS id, p.content_hash AS content_hash,
+           coalesce(p.active, true) AS active
+"""
+
+CAMPOS_CONTENIDO = ("price", "rooms", "bedrooms", "bathrooms", "area", "street", "city", "neighborhood")
+
+# Columnas del CSV que identifican una publicación sin url (no dependen de su posición).
+# El precio no: un cambio de precio es una modificación (content_hash), no otra publicación
+COLUMNAS_CLAVE_SIN_URL = ('descripcion', 'direccion', 'ciudad')
+
+
+def _columna_entera(df: pd.DataFrame, columna: str, defecto: int) -> List[int]:
+    """Convierte una columna a enteros nativos usando un valor por defecto para nulos"""
+    if columna not in df.columns:
+        return [defecto] * len(df)
+    valores = pd.to_numeric(df[columna], errors='coerce').fillna(defecto)
+    return valores.astype('int64').tolist()
+
+
+def _columna_texto(df: pd.DataFrame, columna: str, defecto: str) -> List[str]:
+    """Convierte una columna a texto sin espacios extremos usando un valor por defecto para nulos"""
+    if columna not in df.columns:
+        return [defecto] * len(df)
+    return df[columna].where(df[columna].notna(), defecto).astype(str).str.strip().tolist()
+
+
+def construir_filas_propiedades(df: pd.DataFrame) -> List[Dict]:
+    """
+    Construye los parámetros tipados de cada propiedad a partir del DataFrame
+    
+    Las columnas se convierten de una sola vez (sin iterrows) y los valores quedan
+    como tipos nativos de Python, listos para enviarse como `$rows` a Neo4j.
+    
+    Args:
+        df: DataFrame leído de alquiler_inmuebles.csv
+        
+    Returns:
+        Lista de diccionarios, una entrada por fila del CSV
+    """
+    ciudades = _columna_texto(df, 'ciudad', 'mendoza')
+    direcciones = _columna_texto(df, 'direccion', 'Sin dirección')
+    precios = _columna_entera(df, 'alquiler', 0)
+    ambientes = _columna_entera(df, 'ambientes', 2)
+    dormitorios = _columna_entera(df, 'dormitorios', 1)
+    banos = _columna_entera(df, 'banos', 1)
+    areas = _columna_entera(df, 'm2_total', 50)
+    
+    urls = _columna_texto(df, 'url', '')
+    claves = [_columna_texto(df, columna, '') for columna in COLUMNAS_CLAVE_SIN_URL]
+    
+    filas = []
+    repetidas: Dict[str, int] = {}
+    for i, idx in enumerate(df.index):
+        url = urls[i]
+        if not url:
+            url = clave_sin_url(*(columna[i] for columna in claves))
+            # Publicaciones idénticas sin url: se numeran en orden de aparición
+            repetidas[url] = repetidas.get(url, 0) + 1
+            if repetidas[url] > 1:
+                url = f"{url}-{repetidas[url]}"
+        filas.append({
+            "id": f"P{idx+1:04d}",
+            "name": f"Propiedad #{idx+1} - {ciudades[i].title()}",
+            "url": url,
+            "price": precios[i],
+            "rooms": ambientes[i],
+            "bedrooms": dormitorios[i],
+            "bathrooms": banos[i],
+            "area": areas[i],
+            "street": direcciones[i],
+            "city": ciudades[i],
+            "neighborhood": ciudades[i]  # Por ahora usar ciudad también como neighborhood
+        })
+        filas[-1]["content_hash"] = calcular_hash_contenido(filas[-1])
+    return filas
+
+
+def clave_sin_url(*valores: str) -> str:
+    """
+    Clave de sincronización para una publicación sin url
+    
+    Se deriva de lo que identifica la publicación (descripción, dirección y
+    ciudad) y no de su posición ni de su precio, para que insertar o quitar
+    filas del CSV no cambie la clave de las demás y un cambio de precio se
+    sincronice como modificación.
+    """
+    serializado = json.dumps([v.strip().lower() for v in valores], ensure_ascii=False)
+    return "csv://" + hashlib.sha1(serializado.encode('utf-8')).hexdigest()[:16]
+
+
+def calcular_hash_contenido(fila: Dict) -> str:
+    """Hash estable del contenido de una publicación (excluye id/nombre, que dependen de la posición)"""
+    contenido = {campo: fila[campo] for campo in CAMPOS_CONTENIDO}
+    serializado = json.dumps(contenido, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(serializado.encode('utf-8')).hexdigest()
+
+
+def _numero_de_id(property_id) -> int:
+    """Extrae el número de un id tipo 'P0042' (0 si no tiene ese formato)"""
+    match = re.fullmatch(r'P(\d+)', str(property_id or ''))
+    return int(match.group(1)) if match else 0
+
+
+def calcular_delta(filas: List[Dict], existentes: Dict[str, Dict]) -> Dict[str, List[Dict]]:
+    """
+    Compara las filas del CSV con el estado actual de Neo4j
+    
+    Args:
+        filas: Filas construidas con construir_filas_propiedades
+        existentes: {url: {'id', 'content_hash', 'active'}} leído de Neo4j
+        
+    Returns:
+        Dict con listas 'nuevas', 'modificadas', 'sin_cambios' y 'desaparecidas'
+    """
+    siguiente = max((_numero_de_id(e.get('id')) for e in existentes.values()), default=0) + 1
+    delta = {"nuevas": [], "modificadas": [], "sin_cambios": [], "desaparecidas": []}
+    urls_csv = set()
+    
+    for fila in filas:
+        urls_csv.add(fila["url"])
+        actual = existentes.get(fila["url"])
+        
+        if actual is None:
+            # Los ids nuevos continúan la numeración existente para no chocar con otros
+            fila = dict(fila, id=f"P{siguiente:04d}",
+                        name=f"Propiedad #{siguiente} - {fila['city'].title()}")
+            siguiente += 1
+            delta["nuevas"].append(fila)
+        elif actual.get("content_hash") != fila["content_hash"] or not actual.get("active", True):
+            numero = _numero_de_id(actual.get("id")) or _numero_de_id(fila["id"])
+            fila = dict(fila, id=actual.get("id") or fila["id"],
+                        name=f"Propiedad #{numero} - {fila['city'].title()}")
+            delta["modificadas"].append(fila)
+        else:
+            delta["sin_cambios"].append(fila)
+    
+    delta["desaparecidas"] = [
+        {"url": url} for url, actual in existentes.items()
+        if url not in urls_csv and actual.get("active", True)
+    ]
+    return delta
+
+
+def cargar_propiedades_desde_csv(csv_path: str = CSV_PATH, tamano_lote: int = TAMANO_LOTE_DEFECTO):
+    """
+    Carga todas las propiedades del CSV real a Neo4j
     
-    csv_path = "data/alquiler_inmuebles.csv"
+    Args:
+        csv_path: Ruta al CSV de propiedades
+        tamano_lote: Cantidad de propiedades por transacción
+    """
     
     if not os.path.exists(csv_path):
         print(f"❌ No se encontró el archivo: {csv_path}")
@@ -37,6 +256,7 @@ def cargar_propiedades_desde_csv():
         return
     
     print("🔗 Conectado a Neo4j\n")
+    connector.ensure_schema()
     
     # Limpiar datos existentes
     print("🗑️  Limpiando base de datos...")
@@ -44,65 +264,19 @@ def cargar_propiedades_desde_csv():
         session.run("MATCH (n) DETACH DELETE n")
     print("✅ Base de datos limpiada\n")
     
-    # Crear propiedades desde CSV
-    print("🏠 Creando propiedades...")
-    created_count = 0
-    error_count = 0
-    
-    with connector.get_session() as session:
-        for idx, row in df.iterrows():
-            try:
-                # Extraer datos del CSV
-                ciudad = row.get('ciudad', '').strip() if pd.notna(row.get('ciudad')) else 'mendoza'
-                direccion = row.get('direccion', '').strip() if pd.notna(row.get('direccion')) else 'Sin dirección'
-                precio = int(row.get('alquiler', 0)) if pd.notna(row.get('alquiler')) else 0
-                ambientes = int(row.get('ambientes', 2)) if pd.notna(row.get('ambientes')) else 2
-                dormitorios = int(row.get('dormitorios', 1)) if pd.notna(row.get('dormitorios')) else 1
-                banos = int(row.get('banos', 1)) if pd.notna(row.get('banos')) else 1
-                m2_total = int(row.get('m2_total', 50)) if pd.notna(row.get('m2_total')) else 50
-                
-                # Crear Property Y Address con relación
-                session.run("""
-                    CREATE (p:Property {
-                        id: $id,
-                        name: $name,
-                        price: $price,
-                        rooms: $rooms,
-                        bedrooms: $bedrooms,
-                        bathrooms: $bathrooms,
-                        area: $area
-                    })
-                    CREATE (a:Address {
-                        street: $street,
-                        city: $city,
-                        neighborhood: $neighborhood
-                    })
-                    CREATE (p)-[:HAS_ADDRESS]->(a)
-                """, 
-                    id=f"P{idx+1:04d}",
-                    name=f'Propiedad #{idx+1} - {ciudad.title()}',
-                    price=precio,
-                    rooms=ambientes,
-                    bedrooms=dormitorios,
-                    bathrooms=banos,
-                    area=m2_total,
-                    street=direccion,
-                    city=ciudad,
-                    neighborhood=ciudad  # Por ahora usar ciudad también como neighborhood
-                )
-                created_count += 1
-                
-                if (created_count % 100 == 0):
-                    print(f"   ✓ {created_count} propiedades creadas...")
-                    
-            except Exception as e:
-                error_count += 1
-                if error_count <= 5:  # Solo mostrar primeros 5 errores
-                    print(f"   ⚠️  Error en fila {idx}: {e}")
+    # Crear propiedades desde CSV en lotes (UNWIND + transacciones explícitas)
+    print(f"🏠 Creando propiedades en lotes de {tamano_lote}...")
+    filas = construir_filas_propiedades(df)
+    resumen = connector.write_in_batches(
+        QUERY_CREAR_PROPIEDADES, filas, batch_size=tamano_lote, label="propiedades"
+    )
+    created_count = resumen["written"]
+    error_count = resumen["failed"]
     
     print(f"\n✅ {created_count} propiedades creadas exitosamente")
     if error_count > 0:
-        print(f"⚠️  {error_count} propiedades con errores (omitidas)")
+        print(f"⚠️  {error_count} propiedades con errores (omitidas) en "
+              f"{len(resumen['failed_batches'])} lotes")
     
     # Crear amenidades básicas
     print("\n🎯 Creando amenidades...")
@@ -194,5 +368,102 @@ def cargar_propiedades_desde_csv():
     print("="*60 + "\n")
 
 
+def sincronizar_propiedades_desde_csv(csv_path: str = CSV_PATH, tamano_lote: int = TAMANO_LOTE_DEFECTO):
+    """
+    Sincroniza incrementalmente las propiedades del CSV con Neo4j
+    
+    No borra nada: usuarios, CLICKED/VIEWED/SEARCHED y preferencias aprendidas
+    quedan intactos. Solo se escriben las publicaciones nuevas o modificadas
+    (según el hash de contenido) y las que faltan en el CSV se marcan inactivas.
+    
+    Args:
+        csv_path: Ruta al CSV de propiedades
+        tamano_lote: Cantidad de propiedades por transacción
+        
+    Returns:
+        Dict con la cantidad de propiedades nuevas, modificadas, sin cambios y desactivadas
+    """
+    if not os.path.exists(csv_path):
+        print(f"❌ No se encontró el archivo: {csv_path}")
+        return None
+    
+    print("\n" + "="*60)
+    print("🔄 SINCRONIZACIÓN INCREMENTAL CSV → NEO4J")
+    print("="*60 + "\n")
+    
+    df = pd.read_csv(csv_path)
+    filas = construir_filas_propiedades(df)
+    print(f"📂 {len(filas)} publicaciones en {csv_path}")
+    
+    connector = Neo4jConnector()
+    if not connector.is_connected():
+        print("❌ No se pudo conectar a Neo4j")
+        return None
+    
+    # Con la constraint sobre url, cada MERGE por url es una búsqueda por índice
+    connector.ensure_schema()
+    
+    with connector.get_session() as session:
+        existentes = {
+            r["url"]: {"id": r["id"], "content_hash": r["content_hash"], "active": r["active"]}
+            for r in session.run(QUERY_ESTADO_PROPIEDADES)
+        }
+    print(f"🗄️  {len(existentes)} publicaciones ya registradas en Neo4j\n")
+    
+    delta = calcular_delta(filas, existentes)
+    print(f"   • Nuevas: {len(delta['nuevas'])}")
+    print(f"   • Modificadas: {len(delta['modificadas'])}")
+    print(f"   • Sin cambios: {len(delta['sin_cambios'])}")
+    print(f"   • Desaparecidas: {len(delta['desaparecidas'])}\n")
+    
+    resumen = {
+        "nuevas": len(delta["nuevas"]),
+        "modificadas": len(delta["modificadas"]),
+        "sin_cambios": len(delta["sin_cambios"]),
+        "escritas": 0,
+        "desactivadas": 0,
+        "errores": 0
+    }
+    
+    cambios = delta["nuevas"] + delta["modificadas"]
+    if cambios:
+        print("🏠 Escribiendo propiedades nuevas y modificadas...")
+        escritura = connector.write_in_batches(
+            QUERY_UPSERT_PROPIEDADES, cambios, batch_size=tamano_lote, label="propiedades"
+        )
+        resumen["escritas"] = escritura["written"]
+        resumen["errores"] += escritura["failed"]
+    
+    if delta["desaparecidas"]:
+        print("💤 Marcando publicaciones desaparecidas como inactivas...")
+        desactivacion = connector.write_in_batches(
+            QUERY_DESACTIVAR_PROPIEDADES, delta["desaparecidas"], batch_size=tamano_lote, label="propiedades"
+        )
+        resumen["desactivadas"] = desactivacion["written"]
+        resumen["errores"] += desactivacion["failed"]
+    
+    connector.close()
+    
+    print("\n" + "="*60)
+    print("✅ SINCRONIZACIÓN COMPLETADA")
+    print("="*60)
+    print(f"   • Escritas: {resumen['escritas']} | Desactivadas: {resumen['desactivadas']}"
+          f" | Errores: {resumen['errores']}")
+    print("="*60 + "\n")
+    
+    return resumen
+
+
 if __name__ == "__main__":
-    cargar_propiedades_desde_csv()
+    parser = argparse.ArgumentParser(description="Carga propiedades desde CSV a Neo4j")
+    parser.add_argument("--csv", default=CSV_PATH, help="Ruta al CSV de propiedades")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE_DEFECTO,
+                        help="Propiedades por transacción (default: %(default)s)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Sincroniza solo el delta sin borrar usuarios ni historial")
+    args = parser.parse_args()
+    
+    if args.incremental:
+        sincronizar_propiedades_desde_csv(csv_path=args.csv, tamano_lote=args.lote)
+    else:
+        cargar_propiedades_desde_csv(csv_path=args.csv, tamano_lote=args.lote)
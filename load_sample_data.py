@@ -1,30 +1,48 @@
 """
 Script para cargar datos de ejemplo en Neo4j
 Crea propiedades, usuarios y amenidades para probar el sistema
+
+Es idempotente (usa MERGE): volver a ejecutarlo no duplica nodos ni borra
+usuarios, historial ni preferencias aprendidas. Para empezar de cero usar --reset.
 """
+import argparse
 import os
 from dotenv import load_dotenv
-from neo4j import GraphDatabase
+from database.neo4j_connector import Neo4jConnector
 
 load_dotenv()
 
-driver = GraphDatabase.driver(
-    os.getenv("NEO4J_URI", "bolt://localhost:7687"),
-    auth=(os.getenv("NEO4J_USER", "neo4j"), os.getenv("NEO4J_PASSWORD"))
-)
+parser = argparse.ArgumentParser(description="Carga datos de ejemplo en Neo4j")
+parser.add_argument("--reset", action="store_true",
+                    help="Borra TODA la base (incluye usuarios e historial) antes de cargar")
+args = parser.parse_args()
 
 # Usar la base de datos configurada
 database = os.getenv("NEO4J_DATABASE", "neo4j")
 
+connector = Neo4jConnector(
+    uri=os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+    user=os.getenv("NEO4J_USER", "neo4j"),
+    password=os.getenv("NEO4J_PASSWORD"),
+    database=database
+)
+if not connector.is_connected():
+    raise SystemExit(1)
+driver = connector.driver
+
 print("=" * 70)
 print("📦 CARGANDO DATOS DE EJEMPLO EN NEO4J")
 print("=" * 70 + "\n")
 
+connector.ensure_schema()
+print()
+
 with driver.session(database=database) as session:
-    # Limpiar base de datos
-    print(f"🧹 Limpiando base de datos '{database}'...")
-    session.run("MATCH (n) DETACH DELETE n")
-    print("✅ Base de datos limpia\n")
+    # Limpiar base de datos (solo si se pide explícitamente)
+    if args.reset:
+        print(f"🧹 Limpiando base de datos '{database}'...")
+        session.run("MATCH (n) DETACH DELETE n")
+        print("✅ Base de datos limpia\n")
     
     # Crear propiedades
     print("🏠 Creando propiedades...")
@@ -41,17 +59,15 @@ with driver.session(database=database) as session:
     
     for prop in propiedades:
         session.run("""
-            CREATE (p:Property {
-                id: $id,
-                name: $name,
-                city: $city,
-                location: $location,
-                price: $price,
-                rooms: $rooms,
-                bedrooms: $bedrooms,
-                bathrooms: $bathrooms,
-                area: $area
-            })
+            MERGE (p:Property {id: $id})
+            SET p.name = $name,
+                p.city = $city,
+                p.location = $location,
+                p.price = $price,
+                p.rooms = $rooms,
+                p.bedrooms = $bedrooms,
+                p.bathrooms = $bathrooms,
+                p.area = $area
         """, **prop)
     print(f"✅ {len(propiedades)} propiedades creadas\n")
     
@@ -67,7 +83,7 @@ with driver.session(database=database) as session:
     ]
     
     for amenity in amenidades:
-        session.run("CREATE (a:Amenity {name: $name, display_name: $display_name})", **amenity)
+        session.run("MERGE (a:Amenity {name: $name}) SET a.display_name = $display_name", **amenity)
     print(f"✅ {len(amenidades)} amenidades creadas\n")
     
     # Crear usuarios
@@ -79,7 +95,7 @@ with driver.session(database=database) as session:
     ]
     
     for user in usuarios:
-        session.run("CREATE (u:User {id: $id, name: $name, age: $age})", **user)
+        session.run("MERGE (u:User {id: $id}) SET u.name = $name, u.age = $age", **user)
     print(f"✅ {len(usuarios)} usuarios creados\n")
     
     # Crear relaciones Property -> Amenity
@@ -108,7 +124,7 @@ with driver.session(database=database) as session:
         session.run("""
             MATCH (p:Property {id: $prop_id})
             MATCH (a:Amenity {name: $amenity_name})
-            CREATE (p)-[:HAS_AMENITY]->(a)
+            MERGE (p)-[:HAS_AMENITY]->(a)
         """, prop_id=prop_id, amenity_name=amenity_name)
     print(f"✅ {len(relaciones_amenity)} relaciones HAS_AMENITY creadas\n")
     
@@ -129,7 +145,7 @@ with driver.session(database=database) as session:
         session.run("""
             MATCH (u:User {id: $user_id})
             MATCH (p:Property {id: $prop_id})
-            CREATE (u)-[:VISITED]->(p)
+            MERGE (u)-[:VISITED]->(p)
         """, user_id=user_id, prop_id=prop_id)
     print(f"✅ {len(visitas)} relaciones VISITED creadas\n")
     
@@ -148,7 +164,7 @@ with driver.session(database=database) as session:
         session.run("""
             MATCH (u:User {id: $user_id})
             MATCH (a:Amenity {name: $amenity_name})
-            CREATE (u)-[:PREFERS_AMENITY]->(a)
+            MERGE (u)-[:PREFERS_AMENITY]->(a)
         """, user_id=user_id, amenity_name=amenity_name)
     print(f"✅ {len(preferencias)} relaciones PREFERS_AMENITY creadas\n")
     
@@ -163,12 +179,10 @@ with driver.session(database=database) as session:
     
     for transport in transportes:
         session.run("""
-            CREATE (t:Transport {
-                name: $name,
-                type: $type,
-                speed_kmh: $speed_kmh,
-                cost_per_km: $cost_per_km
-            })
+            MERGE (t:Transport {name: $name})
+            SET t.type = $type,
+                t.speed_kmh = $speed_kmh,
+                t.cost_per_km = $cost_per_km
         """, **transport)
     print(f"✅ {len(transportes)} tipos de transporte creados\n")
     
@@ -187,7 +201,8 @@ with driver.session(database=database) as session:
         session.run("""
             MATCH (u:User {id: $user_id})
             MATCH (t:Transport {name: $transport_name})
-            CREATE (u)-[:USES {preference: $preference}]->(t)
+            MERGE (u)-[r:USES]->(t)
+            SET r.preference = $preference
         """, user_id=user_id, transport_name=transport_name, preference=preference)
     print(f"✅ {len(uso_transporte)} relaciones USES creadas\n")
 
@@ -31,10 +31,11 @@ def main():
     print("="*70 + "\n")
     
     # Verificar conexion Neo4j
-    from database.neo4j_connector import Neo4jConnector
+    from database.neo4j_connector import get_connector, close_all_connectors, register_shutdown_hook
+    from database.stats_service import get_stats_service
     
     print(" Verificando conexion a Neo4j...")
-    connector = Neo4jConnector()
+    connector = get_connector()
     
     if not connector.is_connected():
         print(" No se puede conectar a Neo4j")
@@ -45,7 +46,9 @@ def main():
         print("   4. Usuario: neo4j | Contrasena: password\n")
         return 1
     
-    stats = connector.get_database_stats()
+    connector.ensure_schema()
+    stats_service = get_stats_service()
+    stats = stats_service.get()
     
     print(f" Conectado exitosamente a Neo4j")
     print(f"    {stats.get('properties', 0)} propiedades | "
@@ -62,10 +65,15 @@ def main():
                 from populate_real_data import populate_database
                 print("\n Cargando datos de ejemplo...")
                 populate_database()
+                stats_service.invalidate()
                 print(" Datos cargados correctamente\n")
             except ImportError:
                 print(" Nota: populate_real_data.py no encontrado. Carga datos manualmente.\n")
     
+    # Sub-scores de amenidades/transporte (solo recalcula los vencidos)
+    from database.score_materializer import get_score_materializer
+    get_score_materializer().refresh()
+    
     # INICIAR DEMONIOS AUTOMATICAMENTE
     print(" Iniciando sistema de aprendizaje automatico...")
     from demons.demons_manager import DemonsManager
@@ -73,6 +81,8 @@ def main():
     global demons_manager
     demons_manager = DemonsManager(connector)
     demons_manager.start_all_demons()
+    register_shutdown_hook(demons_manager.stop_all_demons)
+    stats_service.start_background_refresh()
     
     print(" Demonios IA activos - El sistema aprendera automaticamente")
     print("   - PreferenceLearning: Aprende preferencias cada 60s")
@@ -84,10 +94,9 @@ def main():
     # Mostrar menu
     mostrar_menu()
     
-    # Detener demonios al salir
+    # Detener demonios y cerrar el pool compartido al salir
     print("\n Deteniendo sistema de aprendizaje...")
-    demons_manager.stop_all_demons()
-    connector.close()
+    close_all_connectors()
     
     return 0
 
@@ -215,25 +224,29 @@ def ver_estadisticas():
     print("-" * 70)
     
     try:
-        from database.neo4j_connector import Neo4jConnector
+        from database.neo4j_connector import get_connector
+        from database.stats_service import get_stats_service
         
-        connector = Neo4jConnector()
+        connector = get_connector()
         if not connector.is_connected():
             print(" No conectado a Neo4j")
             return
         
-        stats = connector.get_database_stats()
+        stats = get_stats_service().get()
         
         print(f"\n Propiedades: {stats.get('properties', 0)}")
         print(f" Usuarios: {stats.get('users', 0)}")
         print(f" Amenidades: {stats.get('amenities', 0)}")
         print(f" Relaciones: {stats.get('relationships', 0)}")
         
+        connector.print_index_usage_report()
+        
         # Consultar detalles adicionales
         with connector.get_session() as session:
             # Precios
             result = session.run("""
                 MATCH (p:Property)
+                WHERE coalesce(p.active, true)
                 RETURN min(p.price) AS min_price, 
                        max(p.price) AS max_price,
                        avg(p.price) AS avg_price
@@ -249,6 +262,7 @@ def ver_estadisticas():
             # Barrios
             result = session.run("""
                 MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address)
+                WHERE coalesce(p.active, true)
                 RETURN a.neighborhood AS barrio, count(p) AS cantidad
                 ORDER BY cantidad DESC
                 LIMIT 5
@@ -293,8 +307,6 @@ def ver_estadisticas():
             
             print("\n Estado: Demonios IA activos - Aprendiendo continuamente")
         
-        connector.close()
-        
     except Exception as e:
         print(f" Error: {e}")
 
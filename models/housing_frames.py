@@ -1,12 +1,25 @@
 """
 Modelo de Frames para Sistema de Recomendación de Inmuebles
 Representa conocimiento sobre propiedades, usuarios, preferencias y lógica difusa
+
+Para puntuar muchas candidatas de una vez, el flujo de recomendación
+(workflow/langgraph_workflow.py) debe usar la versión por lotes en lugar de
+llamar a calcular_score_propiedad por propiedad:
+
+    bloque = BloquePropiedades.desde_dicts(candidatas)
+    for posicion, score in top_k_propiedades(bloque, usuario, k):
+        candidatas[posicion]
 """
 
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from dataclasses import astuple, dataclass, field
+from typing import List, Dict, Optional, Tuple
 from enum import Enum
 from datetime import datetime
+import hashlib
+import json
+import numpy as np
+from fuzzy.rule_base import CompiledRuleBase, create_housing_rule_base
+from fuzzy.transport_evaluation import TransportAccessibilityEvaluator, TransportType
 
 class PropertyType(Enum):
     """Tipos de propiedad"""
@@ -104,9 +117,59 @@ DISTANCIAS_IDEALES = {
     "centro_comercial": 1500,
 }
 
+# Amenidades que no figuran en las tablas
+PESO_AMENIDAD_DEFECTO = 0.5
+DISTANCIA_IDEAL_DEFECTO = 1000
+AMENIDAD_OTRA = "otra"
+
+# Tipos de amenidad que cuentan como parada de transporte público
+TIPOS_PARADA = ("transporte", "bus_stop")
+
+# Subir si cambia la fórmula de los sub-scores precalculados (invalida los materializados)
+VERSION_SCORES = 1
+
+_evaluador_transporte = TransportAccessibilityEvaluator()
+_firma_cache: Tuple[Optional[tuple], str] = (None, "")
+
+def firma_scores() -> str:
+    """
+    Firma de los parámetros de los sub-scores independientes del usuario
+    (AMENIDADES_PESOS, DISTANCIAS_IDEALES y rangos de transporte). Un sub-score
+    materializado solo se usa si se guardó con la firma actual.
+    """
+    global _firma_cache
+    clave = (tuple(AMENIDADES_PESOS.items()), tuple(DISTANCIAS_IDEALES.items()))
+    if _firma_cache[0] != clave:
+        rangos = sorted((modo.value, sorted(r.items())) for modo, r in _evaluador_transporte.accessibility_ranges.items())
+        datos = json.dumps([VERSION_SCORES, sorted(AMENIDADES_PESOS.items()), sorted(DISTANCIAS_IDEALES.items()), rangos])
+        _firma_cache = (clave, hashlib.sha1(datos.encode("utf-8")).hexdigest()[:16])
+    return _firma_cache[1]
+
+def variable_distancia(amenity_type: str) -> str:
+    """Variable de la base de reglas con la distancia a una amenidad de ese tipo"""
+    if amenity_type not in AMENIDADES_PESOS and amenity_type not in DISTANCIAS_IDEALES:
+        amenity_type = AMENIDAD_OTRA
+    return f"distancia_{amenity_type}"
+
+_plan_cache: Tuple[Optional[tuple], Optional[CompiledRuleBase]] = (None, None)
+
+def plan_reglas() -> CompiledRuleBase:
+    """
+    Base de reglas difusas compilada desde RANGOS_PRECIO, RANGOS_AREA,
+    AMENIDADES_PESOS y DISTANCIAS_IDEALES (ver create_housing_rule_base).
+    Se recompila si cambia alguna de las tablas.
+    """
+    global _plan_cache
+    clave = (tuple(AMENIDADES_PESOS.items()), tuple(DISTANCIAS_IDEALES.items()),
+             tuple((k, astuple(r)) for k, r in RANGOS_PRECIO.items()),
+             tuple((k, astuple(r)) for k, r in RANGOS_AREA.items()))
+    if _plan_cache[0] != clave:
+        _plan_cache = (clave, create_housing_rule_base())
+    return _plan_cache[1]
+
 def calcular_membership_distancia(distancia: float, amenity_type: str) -> float:
     """Calcula membership difuso de distancia a amenidad"""
-    ideal = DISTANCIAS_IDEALES.get(amenity_type, 1000)
+    ideal = DISTANCIAS_IDEALES.get(amenity_type, DISTANCIA_IDEAL_DEFECTO)
     
     if distancia <= ideal:
         return 1.0
@@ -115,13 +178,94 @@ def calcular_membership_distancia(distancia: float, amenity_type: str) -> float:
     else:
         return 1.0 - ((distancia - ideal) / (ideal * 2))
 
+def pesos_score(incluir_transporte: bool = False) -> Tuple[float, float, float, float]:
+    """Pesos (precio, habitaciones, amenidades, transporte) del score de propiedad"""
+    # Ajustar pesos si se incluye transporte
+    if incluir_transporte:
+        return 0.25, 0.15, 0.40, 0.20
+    return 0.30, 0.20, 0.50, 0.0
+
+def calcular_score_amenidades(amenidades: Optional[List[Dict]]) -> Optional[float]:
+    """
+    Sub-score de amenidades cercanas (independiente del usuario)
+    
+    Returns:
+        Score entre 0.0 y 1.0, o None si la propiedad no tiene amenidades
+    """
+    if not amenidades:
+        return None
+    score_amenidades = 0.0
+    for amenidad in amenidades:
+        tipo = amenidad.get('type', '')
+        distancia = amenidad.get('distance', 999999)
+        score_amenidades += calcular_membership_distancia(distancia, tipo) * AMENIDADES_PESOS.get(tipo, PESO_AMENIDAD_DEFECTO)
+    # Normalizar por cantidad de amenidades importantes
+    return score_amenidades / len(AMENIDADES_PESOS)
+
+def calcular_accesibilidad_transporte(amenidades: Optional[List[Dict]]) -> Optional[Dict[str, Dict]]:
+    """
+    Accesibilidad de la parada de transporte más cercana en cada modo
+    (mismo formato que propiedad['transport_accessibility'])
+    
+    Returns:
+        {modo: evaluate_accessibility(...)} o None si no hay paradas cercanas
+    """
+    distancias = [a.get('distance', 999999) for a in amenidades or [] if a.get('type') in TIPOS_PARADA]
+    if not distancias:
+        return None
+    distancia = min(distancias)
+    return {modo.value: _evaluador_transporte.evaluate_accessibility(distancia, modo) for modo in TransportType}
+
+def promedio_accesibilidad(transport_scores: Dict[str, Dict]) -> float:
+    """Promedio de los scores de accesibilidad de todos los transportes disponibles"""
+    if not transport_scores:
+        return 0.0
+    return sum(datos.get('accessibility_score', 0.0) for datos in transport_scores.values()) / len(transport_scores)
+
+def calcular_subscores(amenidades: Optional[List[Dict]]) -> Dict:
+    """
+    Sub-scores independientes del usuario para materializar en el nodo Property
+    
+    Returns:
+        Dict con amenity_score, amenity_count, transport_score (None si no aplica) y score_signature
+    """
+    accesibilidad = calcular_accesibilidad_transporte(amenidades)
+    return {
+        'amenity_score': calcular_score_amenidades(amenidades),
+        'amenity_count': len(amenidades or []),
+        'transport_score': promedio_accesibilidad(accesibilidad) if accesibilidad is not None else None,
+        'score_signature': firma_scores(),
+    }
+
+def subscore_amenidades(propiedad: Dict) -> Optional[float]:
+    """Sub-score de amenidades: el materializado si está vigente, si no se calcula"""
+    firma = propiedad.get('score_signature')
+    if firma is not None and firma == firma_scores():
+        return propiedad.get('amenity_score')
+    return calcular_score_amenidades(propiedad.get('nearby_amenities'))
+
+def subscore_transporte(propiedad: Dict) -> Optional[float]:
+    """
+    Sub-score de transporte: transport_accessibility explícito, el materializado
+    vigente o, si no, la parada más cercana de sus amenidades (el mismo cálculo
+    que se materializa)
+    """
+    if 'transport_accessibility' in propiedad:
+        return promedio_accesibilidad(propiedad['transport_accessibility'])
+    firma = propiedad.get('score_signature')
+    if firma is not None and firma == firma_scores():
+        return propiedad.get('transport_score')
+    accesibilidad = calcular_accesibilidad_transporte(propiedad.get('nearby_amenities'))
+    return promedio_accesibilidad(accesibilidad) if accesibilidad is not None else None
+
 def calcular_score_propiedad(propiedad: Dict, usuario: UserFrame, incluir_transporte: bool = False) -> float:
     """
     Calcula score difuso de una propiedad para un usuario
     Combina: precio, habitaciones, amenidades cercanas, accesibilidad de transporte
     
     Args:
-        propiedad: Dict con datos de la propiedad
+        propiedad: Dict con datos de la propiedad (si trae sub-scores materializados
+            con la firma vigente, ver calcular_subscores, no se recorren sus amenidades)
         usuario: UserFrame con preferencias del usuario
         incluir_transporte: Si True, incluye evaluación de transporte en el scoring
     
@@ -131,17 +275,7 @@ def calcular_score_propiedad(propiedad: Dict, usuario: UserFrame, incluir_transp
     score_total = 0.0
     peso_total = 0.0
     
-    # Ajustar pesos si se incluye transporte
-    if incluir_transporte:
-        PESO_PRECIO = 0.25
-        PESO_HABITACIONES = 0.15
-        PESO_AMENIDADES = 0.40
-        PESO_TRANSPORTE = 0.20
-    else:
-        PESO_PRECIO = 0.30
-        PESO_HABITACIONES = 0.20
-        PESO_AMENIDADES = 0.50
-        PESO_TRANSPORTE = 0.0
+    PESO_PRECIO, PESO_HABITACIONES, PESO_AMENIDADES, PESO_TRANSPORTE = pesos_score(incluir_transporte)
     
     # 1. PRECIO
     if usuario.budget:
@@ -161,41 +295,170 @@ def calcular_score_propiedad(propiedad: Dict, usuario: UserFrame, incluir_transp
         peso_total += PESO_HABITACIONES
     
     # 3. AMENIDADES CERCANAS
-    if 'nearby_amenities' in propiedad and propiedad['nearby_amenities']:
-        score_amenidades = 0.0
-        for amenidad in propiedad['nearby_amenities']:
-            tipo = amenidad.get('type', '')
-            distancia = amenidad.get('distance', 999999)
-            
-            peso_amenidad = AMENIDADES_PESOS.get(tipo, 0.5)
-            membership_dist = calcular_membership_distancia(distancia, tipo)
-            
-            score_amenidades += membership_dist * peso_amenidad
-        
-        # Normalizar por cantidad de amenidades importantes
-        if len(propiedad['nearby_amenities']) > 0:
-            score_amenidades /= len(AMENIDADES_PESOS)
-        
+    score_amenidades = subscore_amenidades(propiedad)
+    if score_amenidades is not None:
         score_total += score_amenidades * PESO_AMENIDADES
         peso_total += PESO_AMENIDADES
     
-    # 4. ACCESIBILIDAD DE TRANSPORTE (nuevo)
-    if incluir_transporte and 'transport_accessibility' in propiedad:
-        from fuzzy.transport_evaluation import TransportAccessibilityEvaluator
-        
-        transport_scores = propiedad['transport_accessibility']
-        score_transporte = 0.0
-        
-        # Promediar scores de accesibilidad de todos los transportes disponibles
-        if transport_scores:
-            for transport_type, accessibility_data in transport_scores.items():
-                score_transporte += accessibility_data.get('accessibility_score', 0.0)
-            score_transporte /= len(transport_scores)
-        
-        score_total += score_transporte * PESO_TRANSPORTE
-        peso_total += PESO_TRANSPORTE
+    # 4. ACCESIBILIDAD DE TRANSPORTE
+    if incluir_transporte:
+        score_transporte = subscore_transporte(propiedad)
+        if score_transporte is not None:
+            score_total += score_transporte * PESO_TRANSPORTE
+            peso_total += PESO_TRANSPORTE
     
     # Normalizar score final
     if peso_total > 0:
         return score_total / peso_total
     return 0.0
+
+@dataclass
+class BloquePropiedades:
+    """
+    Bloque columnar de propiedades candidatas para scoring por lotes
+    Las amenidades (lista de largo variable por propiedad) se guardan aplanadas:
+    la amenidad j pertenece a la propiedad amenidad_propiedad[j] y su distancia es
+    la entrada amenidad_variable[j] de la base de reglas (ver variable_distancia).
+    Las propiedades con sub-scores materializados vigentes no aportan amenidades:
+    su score va directo en score_amenidades_precalculado (NaN = calcular)
+    """
+    nombres: List[str]
+    precios: np.ndarray
+    habitaciones: np.ndarray
+    cantidad_amenidades: np.ndarray
+    amenidad_propiedad: np.ndarray
+    amenidad_variable: np.ndarray
+    amenidad_distancia: np.ndarray
+    score_amenidades_precalculado: np.ndarray
+    tiene_transporte: np.ndarray
+    score_transporte: np.ndarray
+    
+    def __len__(self):
+        return len(self.nombres)
+    
+    @classmethod
+    def desde_dicts(cls, propiedades: List[Dict]) -> "BloquePropiedades":
+        """Construye el bloque desde dicts con el formato de calcular_score_propiedad"""
+        n = len(propiedades)
+        firma = firma_scores()
+        cantidad = np.zeros(n, dtype=np.int64)
+        precalculado = np.full(n, np.nan)
+        tiene_transporte = np.zeros(n, dtype=bool)
+        score_transporte = np.zeros(n, dtype=np.float64)
+        amenidad_propiedad, variables, distancias = [], [], []
+        
+        for i, propiedad in enumerate(propiedades):
+            vigente = propiedad.get('score_signature') == firma
+            if vigente:
+                if propiedad.get('amenity_score') is not None:
+                    precalculado[i] = propiedad['amenity_score']
+                    cantidad[i] = propiedad.get('amenity_count') or 1
+                amenidades = []
+            else:
+                amenidades = propiedad.get('nearby_amenities') or []
+                cantidad[i] = len(amenidades)
+            for amenidad in amenidades:
+                tipo = amenidad.get('type', '')
+                amenidad_propiedad.append(i)
+                variables.append(variable_distancia(tipo))
+                distancias.append(amenidad.get('distance', 999999))
+            
+            transporte = subscore_transporte(propiedad)
+            if transporte is not None:
+                tiene_transporte[i] = True
+                score_transporte[i] = transporte
+        
+        return cls(
+            nombres=[propiedad.get('name', '') for propiedad in propiedades],
+            precios=np.array([propiedad['price'] for propiedad in propiedades], dtype=np.float64),
+            habitaciones=np.array([propiedad['rooms'] for propiedad in propiedades], dtype=np.float64),
+            cantidad_amenidades=cantidad,
+            amenidad_propiedad=np.array(amenidad_propiedad, dtype=np.int64),
+            amenidad_variable=np.array(variables, dtype=object),
+            amenidad_distancia=np.array(distancias, dtype=np.float64),
+            score_amenidades_precalculado=precalculado,
+            tiene_transporte=tiene_transporte,
+            score_transporte=score_transporte,
+        )
+
+def calcular_scores_propiedades(bloque: BloquePropiedades, usuario: UserFrame,
+                                incluir_transporte: bool = False) -> np.ndarray:
+    """
+    Versión por lotes de calcular_score_propiedad
+    
+    Args:
+        bloque: BloquePropiedades con las candidatas
+        usuario: UserFrame con preferencias del usuario
+        incluir_transporte: Si True, incluye evaluación de transporte en el scoring
+    
+    Returns:
+        np.ndarray: Score entre 0.0 y 1.0 de cada propiedad (mismo orden que el bloque)
+    """
+    n = len(bloque)
+    PESO_PRECIO, PESO_HABITACIONES, PESO_AMENIDADES, PESO_TRANSPORTE = pesos_score(incluir_transporte)
+    score_total = np.zeros(n, dtype=np.float64)
+    peso_total = np.zeros(n, dtype=np.float64)
+    
+    # 1. PRECIO
+    if usuario.budget:
+        tolerance = usuario.budget * 0.3
+        diff_precio = np.abs(bloque.precios - usuario.budget)
+        score_total += np.maximum(0, 1 - diff_precio / (usuario.budget + tolerance)) * PESO_PRECIO
+        peso_total += PESO_PRECIO
+    
+    # 2. HABITACIONES
+    if usuario.min_rooms:
+        score_rooms = np.where(bloque.habitaciones >= usuario.min_rooms, 1.0,
+                               bloque.habitaciones / usuario.min_rooms)
+        score_total += score_rooms * PESO_HABITACIONES
+        peso_total += PESO_HABITACIONES
+    
+    # 3. AMENIDADES CERCANAS (salida 'amenidades' de la base de reglas por amenidad, sumada
+    #    por propiedad, o el sub-score materializado)
+    con_amenidades = bloque.cantidad_amenidades > 0
+    if con_amenidades.any():
+        plan = plan_reglas()
+        # Cada amenidad solo activa la variable de su tipo (las demás quedan fuera de rango)
+        entradas = {variable: np.where(bloque.amenidad_variable == variable, bloque.amenidad_distancia, np.inf)
+                    for variable in plan.required_inputs(['amenidades'])}
+        aportes = plan.evaluate(entradas, ['amenidades'])['amenidades']
+        score_amenidades = np.bincount(bloque.amenidad_propiedad, weights=aportes, minlength=n)
+        score_amenidades /= len(AMENIDADES_PESOS)
+        precalculadas = ~np.isnan(bloque.score_amenidades_precalculado)
+        score_amenidades[precalculadas] = bloque.score_amenidades_precalculado[precalculadas]
+        score_total += np.where(con_amenidades, score_amenidades * PESO_AMENIDADES, 0.0)
+        peso_total += np.where(con_amenidades, PESO_AMENIDADES, 0.0)
+    
+    # 4. ACCESIBILIDAD DE TRANSPORTE
+    if incluir_transporte:
+        score_total += np.where(bloque.tiene_transporte, bloque.score_transporte * PESO_TRANSPORTE, 0.0)
+        peso_total += np.where(bloque.tiene_transporte, PESO_TRANSPORTE, 0.0)
+    
+    # Normalizar score final
+    scores = np.zeros(n, dtype=np.float64)
+    np.divide(score_total, peso_total, out=scores, where=peso_total > 0)
+    return scores
+
+def top_k_propiedades(bloque: BloquePropiedades, usuario: UserFrame, k: int,
+                      incluir_transporte: bool = False) -> List[Tuple[int, float]]:
+    """
+    Las k propiedades con mejor score para el usuario
+    Usa selección parcial (argpartition) y solo ordena las k elegidas
+    
+    Returns:
+        Lista de (posición en el bloque, score) de mayor a menor score
+        (a igual score, primero la de menor posición)
+    """
+    scores = calcular_scores_propiedades(bloque, usuario, incluir_transporte)
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return []
+    
+    if k < n:
+        # Umbral del k-ésimo score; se incluyen todos los empates para desempatar por posición
+        umbral = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        candidatas = np.flatnonzero(scores >= umbral)
+    else:
+        candidatas = np.arange(n)
+    orden = np.lexsort((candidatas, -scores[candidatas]))[:k]
+    return [(int(i), float(scores[i])) for i in candidatas[orden]]
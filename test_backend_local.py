@@ -0,0 +1,97 @@
+"""
+Test: Backend de LLM local y benchmark de latencia de la cadena de Q&A
+No requiere Neo4j ni Ollama
+"""
+
+import time
+from types import SimpleNamespace
+import workflow.langchain_integration as integracion
+import workflow.llm_backends as llm_backends
+import workflow.qa_service as qa_service
+from benchmark_qa import ConectorEnMemoria, GrafoEnMemoria, medir, percentiles
+from workflow.langchain_integration import CypherCache, ask_question, create_housing_qa
+from workflow.llm_backends import CYPHER_POR_DEFECTO, LocalCypherLLM, create_llm, register_llm_backend
+
+
+def test_cypher_del_backend_local():
+    llm = LocalCypherLLM(script={"¿Cuántas propiedades hay?": "MATCH (p:Property) RETURN count(p) AS total"})
+    # Del guion, sin importar mayúsculas ni tildes
+    assert llm.generate_cypher("cuantas propiedades hay") == "MATCH (p:Property) RETURN count(p) AS total"
+    # Del parser, con los valores escritos como literales
+    cypher = llm.generate_cypher("Casas en Godoy Cruz con 2 ambientes a menos de 550000")
+    assert "$" not in cypher and "550000" in cypher and "godoy cruz" in cypher.lower()
+    # Ni guion ni parser
+    assert llm.generate_cypher("¿Por qué los lofts son caros?") == CYPHER_POR_DEFECTO
+    print("✅ Cypher del guion, del parser y por defecto")
+
+
+def test_latencia_y_streaming():
+    llm = LocalCypherLLM(latency=0.1, token_latency=0.02)
+    prompt = "Question: ¿Conviene Maipú?\nHelpful Answer:"
+    esperas = []
+    llm_backends.time = SimpleNamespace(sleep=esperas.append)
+    try:
+        tokens = list(llm.stream(prompt))
+    finally:
+        llm_backends.time = time
+    assert "".join(tokens) == llm.respond(prompt)
+    # Una espera por llamada y otra antes de cada token
+    assert esperas == [0.1] + [0.02] * len(tokens)
+    print(f"✅ {len(tokens)} tokens con {len(esperas)} esperas simuladas")
+
+
+def test_registro_de_backends():
+    try:
+        create_llm("inexistente")
+        assert False, "Debería fallar con un backend desconocido"
+    except ValueError as e:
+        assert "inexistente" in str(e)
+    register_llm_backend("lento", lambda: LocalCypherLLM(latency=1.0))
+    assert create_llm("lento").latency == 1.0
+    assert isinstance(create_llm("local"), LocalCypherLLM)
+    print("✅ Backends registrados y desconocidos")
+
+
+def test_tiempos_por_etapa():
+    servicio_original = qa_service._qa_service
+    cache_original = integracion._cypher_cache
+    llm = LocalCypherLLM()
+    qa_service._qa_service = qa_service.HousingQAService(
+        factory=lambda: create_housing_qa(llm=llm, graph=GrafoEnMemoria()))
+    integracion._cypher_cache = CypherCache()
+    conector = ConectorEnMemoria()
+    try:
+        resultado = ask_question("Lofts luminosos para una persona", conector)
+        assert resultado["success"] and not resultado["cached"]
+        assert resultado["raw_cypher"] == CYPHER_POR_DEFECTO
+        tiempos = resultado["timings"]
+        assert set(tiempos) == {"intent", "cypher", "rows", "answer", "total"}
+        assert sum(ms for etapa, ms in tiempos.items() if etapa != "total") <= tiempos["total"] + 1e-6
+        assert resultado["answer"].startswith("Encontré 10 propiedades")
+
+        # Búsqueda estructurada: la resuelve el parser sin el LLM
+        resultado = ask_question("casas en maipu hasta 400 mil", conector)
+        assert "raw_cypher" not in resultado and not resultado["cached"]
+
+        medicion = medir(["Lofts luminosos para una persona", "casas en maipu hasta 400 mil"], 2, conector)
+        assert not medicion["errores"]
+        assert medicion["origenes"] == {"caché": 2, "parser": 2}
+        assert len(medicion["etapas"]["total"]) == 4
+    finally:
+        qa_service._qa_service = servicio_original
+        integracion._cypher_cache = cache_original
+    assert percentiles([1.0, 2.0, 3.0])["p50"] == 2.0
+    print(f"✅ Tiempos por etapa: {tiempos}")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DE BACKEND LOCAL Y BENCHMARK\n")
+
+    test_cypher_del_backend_local()
+    test_latencia_y_streaming()
+    test_registro_de_backends()
+    test_tiempos_por_etapa()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
@@ -0,0 +1,136 @@
+"""
+Test: Pipeline de geocodificación en lote (deduplicación, límite de tasa, checkpoint)
+No requiere conexión a internet: usa un backend local que cuenta las consultas
+"""
+
+import os
+import tempfile
+import threading
+import time
+from geocoding.batch_geocoder import BatchGeocoder, GeocodingBackend
+from geocoding.rate_limiter import TokenBucket
+
+
+class BackendLocal(GeocodingBackend):
+    """Backend de prueba: coordenadas ficticias, con direcciones inexistentes o que fallan"""
+
+    nombre = "local"
+
+    def __init__(self, tasa_maxima=None, fallar=(), interrumpir_en=None, demora=0.0):
+        self.tasa_maxima = tasa_maxima
+        self.fallar = set(fallar)
+        self.interrumpir_en = interrumpir_en
+        self.demora = demora
+        self.consultas = []
+        self._lock = threading.Lock()
+
+    def buscar(self, consulta):
+        with self._lock:
+            self.consultas.append(consulta)
+            numero = len(self.consultas)
+        time.sleep(self.demora)
+        if numero == self.interrumpir_en:
+            raise KeyboardInterrupt
+        if consulta in self.fallar:
+            raise ConnectionError("timeout")
+        if "inexistente" in consulta.lower():
+            return None
+        return (-32.9 + len(consulta) / 1000, -68.8)
+
+
+DIRECCIONES = [
+    "33 Orientales, Godoy Cruz, Mendoza",
+    "33 orientales, Godoy Cruz, Mendoza",
+    "Garibaldi 100, Ciudad de Mendoza, Mendoza",
+    "Calle Inexistente 1, Mendoza",
+    "Garibaldi 100, Ciudad de Mendoza, Mendoza",
+    "San Martín 1200, Luján de Cuyo, Mendoza",
+]
+
+
+def test_deduplicacion():
+    """Las direcciones repetidas (o que solo difieren en mayúsculas) se consultan una vez"""
+    backend = BackendLocal()
+    resultados = BatchGeocoder(backend, checkpoint=None).geocodificar(DIRECCIONES, mostrar_progreso=False)
+
+    assert len(backend.consultas) == 4
+    assert resultados[DIRECCIONES[0]] == resultados[DIRECCIONES[1]]
+    assert resultados["Calle Inexistente 1, Mendoza"] is None
+    assert len(resultados) == len(set(DIRECCIONES))
+    print("✅ 6 direcciones → 4 consultas")
+
+
+def test_checkpoint_y_reanudacion():
+    """Una segunda ejecución solo reintenta las direcciones que fallaron"""
+    with tempfile.TemporaryDirectory() as carpeta:
+        checkpoint = os.path.join(carpeta, "progreso.jsonl")
+
+        backend = BackendLocal(fallar={"San Martín 1200, Luján de Cuyo, Mendoza"})
+        resultados = BatchGeocoder(backend, checkpoint=checkpoint).geocodificar(DIRECCIONES, mostrar_progreso=False)
+        assert "San Martín 1200, Luján de Cuyo, Mendoza" not in resultados
+
+        # Simular una interrupción a mitad de una escritura
+        with open(checkpoint, "a", encoding="utf-8") as f:
+            f.write('{"clave": "incomp')
+
+        backend = BackendLocal()
+        resultados = BatchGeocoder(backend, checkpoint=checkpoint).geocodificar(DIRECCIONES, mostrar_progreso=False)
+        assert backend.consultas == ["San Martín 1200, Luján de Cuyo, Mendoza"]
+        assert resultados["Calle Inexistente 1, Mendoza"] is None
+        assert len(resultados) == len(set(DIRECCIONES))
+    print("✅ Reanudación desde checkpoint: 1 consulta pendiente")
+
+
+def test_interrupcion():
+    """Ctrl+C cancela las consultas pendientes y deja en el checkpoint las que terminaron"""
+    direcciones = [f"Calle {i}, Mendoza" for i in range(200)]
+    with tempfile.TemporaryDirectory() as carpeta:
+        checkpoint = os.path.join(carpeta, "progreso.jsonl")
+        backend = BackendLocal(interrumpir_en=10, demora=0.01)
+        geocoder = BatchGeocoder(backend, hilos=4, checkpoint=checkpoint)
+        try:
+            geocoder.geocodificar(direcciones, mostrar_progreso=False)
+            assert False, "Debería propagar la interrupción"
+        except KeyboardInterrupt:
+            pass
+
+        # Solo se llegaron a consultar las que estaban en vuelo al interrumpir
+        assert len(backend.consultas) < 20, len(backend.consultas)
+        guardadas = geocoder.cargar_checkpoint()
+        assert len(guardadas) >= 9 - 4
+
+        # La próxima ejecución solo consulta lo que faltó
+        backend = BackendLocal()
+        resultados = BatchGeocoder(backend, checkpoint=checkpoint).geocodificar(direcciones, mostrar_progreso=False)
+        assert len(resultados) == 200
+        assert len(backend.consultas) == 200 - len(guardadas)
+    print(f"✅ Interrupción: {len(guardadas)} resultados guardados, el resto cancelado")
+
+
+def test_limite_de_tasa():
+    """El token bucket acota la tasa aunque haya varios hilos"""
+    backend = BackendLocal(tasa_maxima=40)
+    direcciones = [f"Calle {i}, Mendoza" for i in range(21)]
+
+    inicio = time.perf_counter()
+    BatchGeocoder(backend, hilos=8, checkpoint=None).geocodificar(direcciones, mostrar_progreso=False)
+    transcurrido = time.perf_counter() - inicio
+
+    # 1 token inicial + 20 repuestos a 40/s → al menos 0.5 s
+    assert len(backend.consultas) == 21
+    assert transcurrido >= 0.45, transcurrido
+    assert not TokenBucket(1.0).intentar(2)
+    print(f"✅ 21 consultas a 40 req/s en {transcurrido:.2f} s con 8 hilos")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DE GEOCODIFICACIÓN EN LOTE\n")
+
+    test_deduplicacion()
+    test_checkpoint_y_reanudacion()
+    test_interrupcion()
+    test_limite_de_tasa()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
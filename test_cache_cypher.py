@@ -0,0 +1,132 @@
+"""
+Test: Caché del Cypher generado por el LLM
+No requiere Neo4j ni Ollama (la cadena y el grafo son falsos)
+"""
+
+import time
+import workflow.langchain_integration as integracion
+import workflow.qa_service as qa_service
+import workflow.query_parser as query_parser
+from workflow.langchain_integration import CypherCache, ask_question, normalize_question
+
+CYPHER = ('MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address) WHERE toLower(a.city) CONTAINS "capital" '
+          'RETURN p.name, p.price ORDER BY p.price LIMIT 10')
+
+
+class GrafoFalso:
+    def __init__(self):
+        self.consultas = []
+        self._driver = None
+
+    def query(self, cypher, params=None):
+        self.consultas.append(cypher)
+        return [{"p.name": "Casa 1", "p.price": 150000.0}, {"p.name": "Casa 2", "p.price": 180000.0}]
+
+
+class GeneracionFalsa:
+    output_key = "text"
+
+    def __init__(self):
+        self.llamadas_llm = 0
+
+    def invoke(self, inputs):
+        self.llamadas_llm += 1
+        time.sleep(0.2)  # Generación del LLM
+        return {"text": f'"{CYPHER}"'}
+
+
+class CadenaBase:
+    def __init__(self):
+        self.graph_schema = "Node properties: Property {name, price}"
+        self.top_k = 10
+        self.cypher_generation_chain = GeneracionFalsa()
+
+
+class CadenaFalsa:
+    def __init__(self):
+        self.base_chain = CadenaBase()
+
+
+def test_normalizacion():
+    assert normalize_question("Busca casas en Ciudad de Mendoza") == \
+        normalize_question("  busca CASAS en ciudad de Mendoza?")
+    assert normalize_question("Casas en Maipú hasta $550.000") == \
+        normalize_question("casas en maipu hasta 550 mil")
+    assert normalize_question("casas hasta 550k") == normalize_question("casas hasta 550,000")
+    assert normalize_question("casas hasta 550000") != normalize_question("casas hasta 650000")
+    print("✅ Mayúsculas, acentos y formatos numéricos normalizados")
+
+
+def test_ttl_lru_y_esquema():
+    cache = CypherCache(ttl=0.1, max_entries=2)
+    assert cache.put("pregunta uno", "esquema", "MATCH (n) RETURN n")
+    assert cache.get("Pregunta Uno", "esquema") == ("MATCH (n) RETURN n", {})
+
+    time.sleep(0.15)
+    assert cache.get("pregunta uno", "esquema") is None  # Vencida
+
+    cache = CypherCache(max_entries=2)
+    cache.put("a", "esquema", "MATCH (a) RETURN a")
+    cache.put("b", "esquema", "MATCH (b) RETURN b")
+    cache.get("a", "esquema")
+    cache.put("c", "esquema", "MATCH (c) RETURN c")
+    assert cache.get("b", "esquema") is None  # La menos usada
+    assert cache.get("a", "esquema") and cache.get("c", "esquema")
+
+    assert cache.get("a", "esquema nuevo") is None  # Cambio de esquema
+    assert len(cache) == 0
+
+    assert not cache.put("borrar", "esquema", "MATCH (p:Property) DETACH DELETE p")
+    assert not cache.put("vacia", "esquema", "")
+    print("✅ TTL, LRU, invalidación por esquema y Cypher de escritura excluido")
+
+
+def test_pregunta_repetida_sin_llm():
+    grafo = GrafoFalso()
+    cadena = CadenaFalsa()
+    generacion = cadena.base_chain.cypher_generation_chain
+    servicio_original = qa_service._qa_service
+    rapida_original = query_parser.responder_consulta_rapida
+    cache_original = integracion._cypher_cache
+    qa_service._qa_service = qa_service.HousingQAService(factory=lambda: (cadena, grafo))
+    query_parser.responder_consulta_rapida = lambda pregunta, connector=None: None
+    integracion._cypher_cache = CypherCache()
+    try:
+        inicio = time.perf_counter()
+        primera = ask_question("Busca casas en Ciudad de Mendoza")
+        t_llm = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        segunda = ask_question("busca casas en ciudad de mendoza")
+        t_cache = time.perf_counter() - inicio
+
+        assert primera["success"] and segunda["success"]
+        plantilla = CYPHER.replace('"capital"', '$p0').replace('LIMIT 10', 'LIMIT $p1')
+        assert primera["cypher"] == segunda["cypher"] == plantilla
+        assert primera["parameters"] == segunda["parameters"] == {"p0": "capital", "p1": 10}
+        assert not primera["cached"] and segunda["cached"]
+        assert "Casa 1" in segunda["answer"] and "$150,000" in segunda["answer"]
+        assert generacion.llamadas_llm == 1
+        assert grafo.consultas == [plantilla, plantilla]
+
+        # Con otro esquema el Cypher cacheado ya no se usa
+        cadena.base_chain.graph_schema += ", Address {city}"
+        assert not ask_question("busca casas en ciudad de mendoza").get("cached")
+        assert generacion.llamadas_llm == 2
+    finally:
+        qa_service._qa_service = servicio_original
+        query_parser.responder_consulta_rapida = rapida_original
+        integracion._cypher_cache = cache_original
+    print(f"✅ Pregunta repetida sin LLM: {t_llm*1000:.0f} ms → {t_cache*1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DEL CACHÉ DE CYPHER\n")
+
+    test_normalizacion()
+    test_ttl_lru_y_esquema()
+    test_pregunta_repetida_sin_llm()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
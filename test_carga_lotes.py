@@ -0,0 +1,176 @@
+"""
+Test: Carga por lotes del CSV (UNWIND + transacciones explícitas) y sincronización incremental
+No requiere Neo4j: usa una sesión en memoria que registra los lotes recibidos
+"""
+
+import pandas as pd
+from database.neo4j_connector import Neo4jConnector, PROPERTY_QUERY
+from models.frame_models import PropertyFrame, Address
+from load_csv_data import construir_filas_propiedades, calcular_delta, QUERY_CREAR_PROPIEDADES, CSV_PATH
+
+
+class SesionEnMemoria:
+    """Sesión mínima que ejecuta funciones de transacción y falla en los lotes indicados"""
+
+    def __init__(self, lotes, fallar_en):
+        self.lotes = lotes
+        self.fallar_en = fallar_en
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute_write(self, funcion, *args):
+        lote = args[-1]
+        if len(self.lotes) in self.fallar_en:
+            self.lotes.append(None)
+            raise RuntimeError("lote inválido")
+        self.lotes.append(lote)
+
+
+class DriverEnMemoria:
+    def __init__(self, fallar_en=()):
+        self.lotes = []
+        self.fallar_en = set(fallar_en)
+
+    def session(self, database=None):
+        return SesionEnMemoria(self.lotes, self.fallar_en)
+
+
+def crear_connector(driver):
+    connector = Neo4jConnector.__new__(Neo4jConnector)
+    connector.database = "housing"
+    connector.driver = driver
+    return connector
+
+
+def test_filas_tipadas():
+    """Las filas del CSV real quedan con tipos nativos y valores por defecto"""
+    df = pd.read_csv(CSV_PATH)
+    filas = construir_filas_propiedades(df)
+
+    assert len(filas) == len(df)
+    assert filas[0]["id"] == "P0001"
+    assert filas[0]["name"] == "Propiedad #1 - Godoy Cruz"
+    for fila in filas:
+        for campo in ("price", "rooms", "bedrooms", "bathrooms", "area"):
+            assert type(fila[campo]) is int, (campo, fila[campo])
+        assert isinstance(fila["city"], str) and fila["city"] == fila["city"].strip()
+
+    sin_ambientes = df.index[df["ambientes"].isna()][0]
+    assert filas[sin_ambientes]["rooms"] == 2
+    print(f"✅ {len(filas)} filas tipadas correctamente")
+
+
+def test_lotes_con_aislamiento_de_errores():
+    """Un lote fallido no impide escribir los siguientes"""
+    filas = [{"id": f"P{i:04d}"} for i in range(1, 1001)]
+    driver = DriverEnMemoria(fallar_en={1})
+    resumen = crear_connector(driver).write_in_batches(
+        QUERY_CREAR_PROPIEDADES, filas, batch_size=300, label="propiedades"
+    )
+
+    assert [len(l) for l in driver.lotes if l] == [300, 300, 100]
+    assert resumen["written"] == 700
+    assert resumen["failed"] == 300
+    assert resumen["failed_batches"][0]["start"] == 300
+    print("✅ Lote fallido aislado: 700 escritas, 300 revertidas")
+
+
+def test_propiedades_en_una_consulta():
+    """Cada lote de propiedades es una sola consulta, con las amenidades embebidas en la fila"""
+    frames = []
+    for i in range(1, 1201):
+        frame = PropertyFrame(name=f"Casa {i}", address=Address("San Martín", str(i), "Centro"),
+                              property_type="casa", price=100000 + i)
+        frame.add_amenity("park", "Parque Central", 300)
+        frame.add_amenity("school", "Escuela 1", 800)
+        frames.append(frame)
+    frames[0].nearby_amenities = []
+
+    driver = DriverEnMemoria()
+    connector = crear_connector(driver)
+    resumen = connector.create_properties(frames)
+
+    assert "FOREACH" in PROPERTY_QUERY and "UNWIND $rows" in PROPERTY_QUERY
+    assert [len(l) for l in driver.lotes] == [500, 500, 200]
+    assert resumen["written"] == 1200
+    assert driver.lotes[0][0]["amenities"] == []
+    assert driver.lotes[0][1]["amenities"][1] == {"name": "Escuela 1", "type": "school", "distance": 800}
+
+    assert connector.create_property(frames[1]) is True
+    assert [fila["name"] for fila in driver.lotes[-1]] == ["Casa 2"]
+    print("✅ 1200 propiedades con amenidades escritas en 3 consultas")
+
+
+def test_delta_incremental():
+    """Solo las publicaciones nuevas, modificadas o reactivadas se vuelven a escribir"""
+    df = pd.read_csv(CSV_PATH).head(5)
+    filas = construir_filas_propiedades(df)
+    existentes = {f["url"]: {"id": f["id"], "content_hash": f["content_hash"], "active": True} for f in filas}
+
+    # Publicación 0 cambia de precio, 1 estaba inactiva, 4 desaparece, llega una nueva
+    existentes[filas[0]["url"]]["content_hash"] = "precio-anterior"
+    existentes[filas[1]["url"]]["active"] = False
+    existentes["https://ejemplo/vieja"] = {"id": "P0099", "content_hash": "x", "active": True}
+    nueva = dict(filas[4], url="https://ejemplo/nueva")
+    del existentes[filas[4]["url"]]
+    filas = filas[:4] + [nueva]
+
+    delta = calcular_delta(filas, existentes)
+
+    assert [f["url"] for f in delta["modificadas"]] == [filas[0]["url"], filas[1]["url"]]
+    assert [f["id"] for f in delta["modificadas"]] == ["P0001", "P0002"]
+    assert len(delta["sin_cambios"]) == 2
+    assert delta["desaparecidas"] == [{"url": "https://ejemplo/vieja"}]
+    assert delta["nuevas"][0]["id"] == "P0100"
+    assert delta["nuevas"][0]["name"].startswith("Propiedad #100 - ")
+    print("✅ Delta incremental: 1 nueva, 2 modificadas, 2 sin cambios, 1 desaparecida")
+
+
+def test_clave_estable_sin_url():
+    """Las publicaciones sin url conservan su clave aunque cambie su posición en el CSV"""
+    df = pd.read_csv(CSV_PATH).head(6)
+    df["url"] = None
+    filas = construir_filas_propiedades(df)
+    assert all(f["url"].startswith("csv://") for f in filas)
+    assert len({f["url"] for f in filas}) == len(filas)
+
+    # Se inserta una fila al principio y se quita la cuarta
+    reordenado = pd.concat([df.iloc[[5]], df.drop(index=[3])]).reset_index(drop=True)
+    reordenado.loc[0, "descripcion"] = "Publicación nueva"
+    claves = {f["url"] for f in construir_filas_propiedades(reordenado)}
+    assert {f["url"] for i, f in enumerate(filas) if i != 3} <= claves
+
+    existentes = {f["url"]: {"id": f["id"], "content_hash": f["content_hash"], "active": True} for f in filas}
+    delta = calcular_delta(construir_filas_propiedades(reordenado), existentes)
+    assert len(delta["nuevas"]) == 1 and len(delta["desaparecidas"]) == 1
+    assert delta["desaparecidas"][0]["url"] == filas[3]["url"]
+
+    # Un cambio de precio es una modificación de la misma publicación
+    con_otro_precio = df.copy()
+    con_otro_precio.loc[0, "alquiler"] = con_otro_precio.loc[0, "alquiler"] + 1000
+    delta = calcular_delta(construir_filas_propiedades(con_otro_precio), existentes)
+    assert [f["url"] for f in delta["modificadas"]] == [filas[0]["url"]]
+    assert not delta["nuevas"] and not delta["desaparecidas"]
+
+    # Dos publicaciones idénticas no comparten clave
+    duplicadas = construir_filas_propiedades(pd.concat([df.head(1), df.head(1)]).reset_index(drop=True))
+    assert duplicadas[1]["url"] == duplicadas[0]["url"] + "-2"
+    print("✅ Claves sin url derivadas del contenido, no de la posición")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DE CARGA POR LOTES\n")
+
+    test_filas_tipadas()
+    test_lotes_con_aislamiento_de_errores()
+    test_propiedades_en_una_consulta()
+    test_delta_incremental()
+    test_clave_estable_sin_url()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
@@ -0,0 +1,139 @@
+"""
+Test: Conector Neo4j asíncrono (lotes, estadísticas y cierre)
+No requiere Neo4j: usa un driver asíncrono en memoria que registra las consultas
+"""
+
+import asyncio
+from database.async_neo4j_connector import AsyncNeo4jConnector
+from database.neo4j_connector import PROPERTY_QUERY, USER_QUERY, STATS_QUERY
+from models.frame_models import PropertyFrame, UserFrame, AmenityFrame, AmenityType, Address
+
+ESTADISTICAS = {"properties": 1200, "users": 3, "amenities": 40, "relationships": 5000}
+
+
+class ResultadoEnMemoria:
+    def __init__(self, registros):
+        self.registros = registros
+
+    async def data(self):
+        return self.registros
+
+    async def consume(self):
+        pass
+
+
+class SesionEnMemoria:
+    """Sesión asíncrona mínima: registra consultas y lotes, y si quedó cerrada"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.cerrada = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.cerrada = True
+        return False
+
+    async def run(self, query, **params):
+        self.driver.consultas.append((query, params))
+        return ResultadoEnMemoria([ESTADISTICAS] if query == STATS_QUERY else [])
+
+    async def execute_write(self, funcion, *args):
+        return await funcion(self, *args)
+
+
+class DriverEnMemoria:
+    def __init__(self):
+        self.consultas = []
+        self.sesiones = []
+        self.cerrado = False
+
+    def session(self, database=None):
+        sesion = SesionEnMemoria(self)
+        self.sesiones.append(sesion)
+        return sesion
+
+    async def close(self):
+        self.cerrado = True
+
+
+def crear_connector():
+    connector = AsyncNeo4jConnector()
+    connector.driver = DriverEnMemoria()
+    return connector
+
+
+def lotes(driver, query):
+    return [params["rows"] for q, params in driver.consultas if q == query]
+
+
+def test_propiedades_y_usuarios_en_lotes():
+    """Cada lote es una consulta UNWIND; create_property/create_user escriben una fila"""
+    connector = crear_connector()
+    driver = connector.driver
+    frames = [PropertyFrame(name=f"Casa {i}", address=Address("San Martín", str(i), "Centro"),
+                            property_type="casa", price=100000 + i) for i in range(1, 1201)]
+    frames[0].add_amenity("park", "Parque Central", 300)
+
+    escritas = asyncio.run(connector.create_properties(frames, batch_size=500))
+    assert escritas == 1200
+    assert [len(l) for l in lotes(driver, PROPERTY_QUERY)] == [500, 500, 200]
+    assert lotes(driver, PROPERTY_QUERY)[0][0]["amenities"][0]["name"] == "Parque Central"
+
+    assert asyncio.run(connector.create_property(frames[1])) is True
+    assert [fila["name"] for fila in lotes(driver, PROPERTY_QUERY)[-1]] == ["Casa 2"]
+
+    usuarios = [UserFrame(name=f"Usuario {i}", age=30) for i in range(3)]
+    assert asyncio.run(connector.create_users(usuarios, batch_size=2)) == 3
+    assert asyncio.run(connector.create_user(usuarios[0])) is True
+    assert [len(l) for l in lotes(driver, USER_QUERY)] == [2, 1, 1]
+    assert all(sesion.cerrada for sesion in driver.sesiones)
+    print("✅ 1200 propiedades en 3 consultas, usuarios en lotes y sesiones cerradas")
+
+
+def test_amenidad_y_estadisticas():
+    connector = crear_connector()
+    driver = connector.driver
+    amenidad = AmenityFrame(name="Parque Central", amenity_type=AmenityType.PARK,
+                            address=Address("Av. Libertador", "1", "Centro"), area=300.0)
+
+    assert asyncio.run(connector.create_amenity(amenidad)) is True
+    query, params = driver.consultas[-1]
+    assert "(am:Park:Amenity" in query
+    assert params["name"] == "Parque Central" and params["amenity_type"] == "park"
+
+    assert asyncio.run(connector.get_database_stats()) == ESTADISTICAS
+    assert driver.consultas[-1][0] == STATS_QUERY
+    assert all(sesion.cerrada for sesion in driver.sesiones)
+    print("✅ Amenidad creada y estadísticas en una consulta")
+
+
+def test_cierre_y_sin_conexion():
+    connector = crear_connector()
+    driver = connector.driver
+    asyncio.run(connector.close())
+    assert driver.cerrado and not connector.is_connected()
+
+    # Sin driver no se escribe ni se consulta nada
+    frame = PropertyFrame(name="Casa", address=Address("San Martín", "1", "Centro"), property_type="casa")
+    assert asyncio.run(connector.create_property(frame)) is False
+    assert asyncio.run(connector.create_user(UserFrame(name="Ana", age=30))) is False
+    assert asyncio.run(connector.create_properties([frame])) == 0
+    assert asyncio.run(connector.get_database_stats()) == {}
+    # Cerrar dos veces no falla
+    asyncio.run(connector.close())
+    print("✅ Driver cerrado y operaciones sin conexión ignoradas")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DE CONECTOR ASÍNCRONO\n")
+
+    test_propiedades_y_usuarios_en_lotes()
+    test_amenidad_y_estadisticas()
+    test_cierre_y_sin_conexion()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
@@ -0,0 +1,85 @@
+"""
+Test: Caché de coordenadas en formato columnar (.npy memory-mapped)
+No requiere Neo4j ni conexión a internet
+"""
+
+import json
+import os
+import random
+import tempfile
+import numpy as np
+from geocoding.coordinates_store import CoordinatesStore, convertir_json, guardar_store
+from geocoding.spatial_index import SpatialIndex
+
+CACHE_JSON = "data/coordenadas_cache.json"
+
+
+def test_conversion_sin_perdidas():
+    """Cada fila del JSON se recupera igual desde el formato columnar"""
+    with open(CACHE_JSON, "r", encoding="utf-8") as f:
+        original = json.load(f)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        directorio = os.path.join(carpeta, "coordenadas")
+        assert convertir_json(CACHE_JSON, directorio) == len(original)
+        store = CoordinatesStore(directorio)
+
+        assert len(store) == len(original)
+        assert set(store) == set(original)
+        for idx, fila in original.items():
+            assert store[idx] == fila, idx
+        assert "99999" not in store
+
+        # El índice espacial da lo mismo desde el JSON y desde las columnas
+        desde_json = SpatialIndex.desde_cache(original).consultar_radio(-32.89, -68.84, 10)
+        desde_store = SpatialIndex.desde_cache(store).consultar_radio(-32.89, -68.84, 10)
+        assert desde_json == desde_store
+    print(f"✅ {len(original)} filas convertidas sin pérdidas")
+
+
+def test_cache_vacio():
+    with tempfile.TemporaryDirectory() as carpeta:
+        directorio = os.path.join(carpeta, "coordenadas")
+        guardar_store({}, directorio)
+        store = CoordinatesStore(directorio)
+        assert len(store) == 0 and list(store) == []
+    print("✅ Caché vacío")
+
+
+def test_apertura_sin_copia():
+    """Abrir el formato columnar mapea los archivos sin leer ni parsear las filas"""
+    rnd = random.Random(1)
+    cache = {
+        str(i): {"ubicacion": f"Calle {i}, Godoy Cruz, Mendoza", "lat": -32.9 + rnd.random() / 10,
+                 "lon": -68.8 + rnd.random() / 10, "precio": float(rnd.randint(1, 900) * 1000),
+                 "habitaciones": rnd.randint(0, 4), "ambientes": rnd.randint(1, 6),
+                 "tipo": rnd.choice(["Casa", "Departamento"])}
+        for i in range(20000)
+    }
+    with tempfile.TemporaryDirectory() as carpeta:
+        directorio = os.path.join(carpeta, "coordenadas")
+        guardar_store(cache, directorio)
+
+        store = CoordinatesStore(directorio)
+        columnas = (store.ids, store.lat, store.lon, store.precio, store.habitaciones, store.ambientes,
+                    store.tipo, store._ubicacion_bytes, store._ubicacion_offsets)
+        assert all(isinstance(columna, np.memmap) for columna in columnas)
+        assert store["12345"] == cache["12345"]
+
+        en_memoria = CoordinatesStore(directorio, mmap=False)
+        assert not isinstance(en_memoria.lat, np.memmap)
+        assert en_memoria["12345"] == cache["12345"]
+        del store, columnas, en_memoria  # Liberar los mapeos antes de borrar la carpeta
+    print("✅ 20k filas abiertas con memory-map, sin copiar columnas")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DEL CACHÉ DE COORDENADAS COLUMNAR\n")
+
+    test_conversion_sin_perdidas()
+    test_cache_vacio()
+    test_apertura_sin_copia()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
@@ -0,0 +1,76 @@
+"""
+Test: Servicio de estadísticas con caché (TTL, invalidación y fallos de consulta)
+No requiere Neo4j: usa un conector falso que cuenta las consultas
+"""
+
+import time
+from database.stats_service import DatabaseStatsService
+
+
+class ConnectorFalso:
+    def __init__(self):
+        self.consultas = 0
+        self.fallar = False
+
+    def is_connected(self):
+        return True
+
+    def get_database_stats(self):
+        self.consultas += 1
+        if self.fallar:
+            raise RuntimeError("Neo4j no responde")
+        return {"properties": 1357, "users": 3, "amenities": 6, "relationships": 40 + self.consultas}
+
+
+def test_cache_con_ttl():
+    """Dentro del TTL no se vuelve a consultar la base"""
+    connector = ConnectorFalso()
+    servicio = DatabaseStatsService(lambda: connector, ttl=0.2)
+
+    for _ in range(50):
+        stats = servicio.get()
+    assert connector.consultas == 1
+    assert stats["properties"] == 1357
+
+    time.sleep(0.25)
+    assert servicio.get()["relationships"] == 42
+    servicio.invalidate()
+    servicio.get()
+    assert connector.consultas == 3
+    print("✅ 52 lecturas del panel, 3 consultas a la base")
+
+
+def test_fallo_conserva_valores():
+    """Si la consulta falla se devuelven los últimos conteos conocidos"""
+    connector = ConnectorFalso()
+    servicio = DatabaseStatsService(lambda: connector, ttl=60)
+    servicio.get()
+
+    connector.fallar = True
+    assert servicio.get(force=True)["properties"] == 1357
+    print("✅ Conteos anteriores conservados ante un fallo")
+
+
+def test_refresco_en_segundo_plano():
+    """El hilo de refresco mantiene la caché vigente sin lecturas explícitas"""
+    connector = ConnectorFalso()
+    servicio = DatabaseStatsService(lambda: connector, ttl=0.1)
+    servicio.start_background_refresh(interval=0.05)
+    time.sleep(0.3)
+    servicio.stop_background_refresh()
+
+    assert connector.consultas >= 3
+    assert servicio.age() < 0.1
+    print(f"✅ Refresco en segundo plano: {connector.consultas} actualizaciones")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DEL SERVICIO DE ESTADÍSTICAS\n")
+
+    test_cache_con_ttl()
+    test_fallo_conserva_valores()
+    test_refresco_en_segundo_plano()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
@@ -0,0 +1,97 @@
+"""
+Test: Funciones de lógica difusa vectorizadas contra las versiones escalares
+No requiere Neo4j
+"""
+
+import numpy as np
+from fuzzy.fuzzy_logic import FuzzyLogic
+from fuzzy.fuzzy_evaluators import PriceFuzzyEvaluator, DistanceFuzzyEvaluator
+from fuzzy.transport_evaluation import TransportType
+
+
+def valores_de_prueba(bordes, n=20000, maximo=250000, semilla=0):
+    """Valores aleatorios más los bordes exactos de cada función (donde cambian las ramas)"""
+    rnd = np.random.default_rng(semilla)
+    return np.concatenate([rnd.uniform(-1000, maximo, n), np.array(bordes, dtype=np.float64)])
+
+
+def test_membresias_iguales_a_escalares():
+    """triangular, trapezoidal y gaussiana coinciden con las funciones escalares"""
+    x = valores_de_prueba([0, 20000, 40000, 95000, 120000, 160000, 200000])
+
+    casos = [
+        (FuzzyLogic.triangular_membership, FuzzyLogic.triangular_membership_array, (20000, 55000, 70000)),
+        (FuzzyLogic.trapezoidal_membership, FuzzyLogic.trapezoidal_membership_array, (95000, 120000, 160000, 200000)),
+        (FuzzyLogic.gaussian_membership, FuzzyLogic.gaussian_membership_array, (1500, 500)),
+    ]
+    for escalar, vectorial, params in casos:
+        esperado = [escalar(v, *params) for v in x.tolist()]
+        assert np.allclose(vectorial(x, *params), esperado, rtol=0, atol=1e-12), escalar.__name__
+
+    # Parámetros por elemento (broadcasting)
+    picos = np.array([10.0, 50.0, 90.0])
+    assert np.allclose(FuzzyLogic.triangular_membership_array(50.0, 0, picos, 100),
+                       [FuzzyLogic.triangular_membership(50.0, 0, p, 100) for p in picos])
+    print("✅ Membresías vectorizadas idénticas a las escalares")
+
+
+def test_operadores():
+    """fuzzy_and/or y weighted_average por columnas"""
+    valores = np.array([[0.2, 0.9, 0.0], [0.5, 0.1, 0.0], [0.7, 0.4, 0.0]])
+    pesos = [0.5, 0.3, 0.2]
+
+    for j in range(3):
+        columna = valores[:, j].tolist()
+        assert FuzzyLogic.fuzzy_and_array(valores)[j] == FuzzyLogic.fuzzy_and(columna)
+        assert FuzzyLogic.fuzzy_or_array(valores)[j] == FuzzyLogic.fuzzy_or(columna)
+        assert np.isclose(FuzzyLogic.weighted_average_array(valores, pesos)[j],
+                          FuzzyLogic.weighted_average(columna, pesos))
+
+    assert FuzzyLogic.fuzzy_and_array(np.empty((0, 4))).tolist() == [0.0] * 4
+    assert FuzzyLogic.weighted_average_array(valores, [0, 0, 0]).tolist() == [0.0] * 3
+    print("✅ Operadores difusos por lotes")
+
+
+def test_evaluadores():
+    """Los evaluadores de precio y distancia por lotes coinciden con los escalares"""
+    precios = valores_de_prueba([40000, 70000, 120000], n=2000)
+    evaluador = PriceFuzzyEvaluator()
+    lote = evaluador.evaluate_price_membership_array(precios)
+    for i, precio in enumerate(precios.tolist()):
+        for categoria, grado in evaluador.evaluate_price_membership(precio).items():
+            assert np.isclose(lote[categoria][i], grado), (precio, categoria)
+
+    distancias = valores_de_prueba([200, 500, 1000, 3000], n=2000, maximo=20000)
+    evaluador = DistanceFuzzyEvaluator()
+    for modo in (None, TransportType.WALK, TransportType.CAR):
+        lote = evaluador.evaluate_distance_membership_array(distancias, modo)
+        for i, distancia in enumerate(distancias.tolist()):
+            for categoria, grado in evaluador.evaluate_distance_membership(distancia, modo).items():
+                assert np.isclose(lote[categoria][i], grado), (distancia, modo, categoria)
+    print("✅ Evaluadores de precio y distancia por lotes")
+
+
+def test_lote_grande():
+    """Una sola llamada evalúa 100k precios con el mismo resultado que precio por precio"""
+    precios = valores_de_prueba([], n=100000)
+    evaluador = PriceFuzzyEvaluator()
+
+    lote = evaluador.evaluate_price_membership_array(precios)
+    for i, precio in enumerate(precios.tolist()):
+        for categoria, grado in evaluador.evaluate_price_membership(precio).items():
+            assert lote[categoria][i] == grado, (precio, categoria)
+    assert all(grados.shape == precios.shape for grados in lote.values())
+    print(f"✅ {len(precios)} precios evaluados en una llamada")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DE LÓGICA DIFUSA VECTORIZADA\n")
+
+    test_membresias_iguales_a_escalares()
+    test_operadores()
+    test_evaluadores()
+    test_lote_grande()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
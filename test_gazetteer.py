@@ -0,0 +1,109 @@
+"""
+Test: Gazetteer local (geocodificación sin conexión)
+No requiere conexión a internet: se construye desde data/coordenadas_cache.json
+"""
+
+import time
+import geocoding.geocoder as geocoder_mod
+from geocoding.geocoder import Geocoder
+from geocoding.geocode_cache import GeocodeCache
+from geocoding.gazetteer import Gazetteer, componentes_direccion, separar_altura
+
+
+def crear_gazetteer():
+    gazetteer = Gazetteer()
+    gazetteer.agregar_cache_coordenadas()
+    gazetteer.agregar("Parque General San Martín, Mendoza, Argentina", -32.8917, -68.8732)
+    return gazetteer
+
+
+def test_normalizacion_por_componentes():
+    """Contexto provincial, acentos, abreviaturas y repeticiones no cambian la clave"""
+    assert componentes_direccion("Av. San Martín 90, Ciudad de Mendoza, Mendoza") == \
+        componentes_direccion("Avenida San Martin 90, Ciudad de Mendoza, Ciudad de Mendoza, Mendoza, Argentina")
+    assert componentes_direccion("BELGRANO N° 72, Maipú, Mendoza") == ("belgrano 72", "maipu")
+    print("✅ Direcciones normalizadas por componentes")
+
+
+def test_busquedas_locales():
+    """Variantes de escritura y errores menores se resuelven sin red"""
+    gazetteer = crear_gazetteer()
+
+    assert gazetteer.buscar("33 orientales, godoy cruz") == (-32.9281592, -68.846801)
+    assert gazetteer.buscar("Avenida San Martin 2700, Ciudad de Mendoza, Mendoza, Argentina") == (-32.8714867, -68.8345089)
+    assert gazetteer.buscar("Rodrigez Peña 2260, Godoy Cruz") == (-32.9399688, -68.8263551)
+    assert gazetteer.buscar("Garibaldi 100, Mendoza, Argentina") == (-32.8908937, -68.8369228)
+    assert gazetteer.buscar("parque general san martin") == (-32.8917, -68.8732)
+    assert gazetteer.buscar("Plaza Independencia") is None
+    assert gazetteer.buscar("Rodriguez Peña 9999, Las Heras") is None
+    print("✅ Búsquedas exactas y aproximadas resueltas localmente")
+
+
+def test_altura_debe_coincidir():
+    """Los errores se toleran en los nombres, nunca en la altura"""
+    assert separar_altura("garibaldi 100") == ("garibaldi", "100")
+    assert separar_altura("25 de mayo 1200") == ("25 de mayo", "1200")
+    assert separar_altura("33 orientales") == ("33 orientales", None)
+
+    gazetteer = Gazetteer()
+    gazetteer.agregar("Calle 100, Godoy Cruz", -32.92, -68.84)
+    gazetteer.agregar("Tiburcio Benegas 100, Godoy Cruz", -32.93, -68.85)
+    assert gazetteer.buscar("Calle 1000, Godoy Cruz") is None
+    assert gazetteer.buscar("Calle 10, Godoy Cruz") is None
+    assert gazetteer.buscar("Calle 100, Godoy Cruz") == (-32.92, -68.84)
+    assert gazetteer.buscar("Tiburcio Benegaz 100, Godoy Cruz") == (-32.93, -68.85)
+    assert gazetteer.buscar("Tiburcio Benegaz 1000, Godoy Cruz") is None
+
+    # Contra las direcciones reales del caché
+    gazetteer = crear_gazetteer()
+    assert gazetteer.buscar("Garibaldi 1000, Mendoza, Argentina") is None
+    assert gazetteer.buscar("Almirante Brown 5000, Godoy Cruz") is None
+    assert gazetteer.buscar("Garibaldy 100, Mendoza, Argentina") == (-32.8908937, -68.8369228)
+    print("✅ Otra altura de la misma calle no se confunde (pasa a Nominatim)")
+
+
+def test_geocoder_usa_gazetteer_primero():
+    """Geocoder solo consulta Nominatim cuando el gazetteer no encuentra el lugar"""
+    llamadas = []
+
+    class Respuesta:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return [{"lat": "-32.8908", "lon": "-68.8272"}]
+
+    def get_falso(url, params=None, headers=None, timeout=None):
+        llamadas.append(params["q"])
+        return Respuesta()
+
+    original = geocoder_mod.requests.get
+    geocoder_mod.requests.get = get_falso
+    try:
+        geocoder = Geocoder(GeocodeCache(":memory:"), gazetteer=crear_gazetteer())
+
+        inicio = time.perf_counter()
+        for _ in range(1000):
+            assert geocoder.geocode_poi("Parque General San Martín") == (-32.8917, -68.8732)
+        por_consulta_us = (time.perf_counter() - inicio) / 1000 * 1e6
+
+        assert geocoder.geocode_poi("Plaza Independencia") == (-32.8908, -68.8272)
+        assert geocoder.geocode_poi("Plaza Independencia") == (-32.8908, -68.8272)
+    finally:
+        geocoder_mod.requests.get = original
+
+    assert llamadas == ["Plaza Independencia, Mendoza, Argentina"]
+    print(f"✅ Gazetteer: {por_consulta_us:.0f} µs por consulta, Nominatim solo como respaldo")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DEL GAZETTEER LOCAL\n")
+
+    test_normalizacion_por_componentes()
+    test_busquedas_locales()
+    test_altura_debe_coincidir()
+    test_geocoder_usa_gazetteer_primero()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
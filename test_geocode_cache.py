@@ -0,0 +1,105 @@
+"""
+Test: Caché persistente de geocodificación (SQLite)
+No requiere conexión a internet: Nominatim se reemplaza por una respuesta fija
+"""
+
+import os
+import tempfile
+import time
+import geocoding.geocoder as geocoder_mod
+from geocoding.geocoder import Geocoder
+from geocoding.geocode_cache import GeocodeCache, normalizar_consulta
+
+
+class RespuestaFalsa:
+    def __init__(self, datos):
+        self.datos = datos
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.datos
+
+
+def test_normalizacion():
+    """Variantes de mayúsculas, acentos y puntuación comparten clave"""
+    assert normalizar_consulta("Parque  San Martín, Mendoza") == normalizar_consulta("parque san martin mendoza")
+    assert normalizar_consulta("Plaza Independencia!") == "plaza independencia"
+    print("✅ Consultas normalizadas")
+
+
+def test_persistencia_y_negativos():
+    """Los resultados sobreviven a un reinicio y los 'no encontrado' también se cachean"""
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "geo.sqlite3")
+        cache = GeocodeCache(ruta)
+        cache.guardar("Parque San Martín, Mendoza, Argentina", (-32.89, -68.87))
+        cache.guardar("Lugar Inexistente, Mendoza, Argentina", None)
+        cache.cerrar()
+
+        cache = GeocodeCache(ruta)
+        assert cache.obtener("parque san martin, mendoza, argentina") == (True, (-32.89, -68.87))
+        assert cache.obtener("Lugar inexistente, Mendoza, Argentina") == (True, None)
+        assert cache.obtener("Otro lugar") == (False, None)
+        cache.cerrar()
+    print("✅ Caché persistente con resultados negativos")
+
+
+def test_ttl_y_lru():
+    """Las entradas vencidas se descartan y al superar el máximo salen las menos usadas"""
+    cache = GeocodeCache(":memory:", ttl_negativo=0.05, max_entradas=3)
+    cache.guardar("no existe", None)
+    time.sleep(0.1)
+    assert cache.obtener("no existe") == (False, None)
+
+    for i in range(5):
+        cache.guardar(f"lugar {i}", (float(i), float(i)))
+        time.sleep(0.01)
+    assert len(cache) == 3
+    assert cache.obtener("lugar 0") == (False, None)
+    assert cache.obtener("lugar 4")[0]
+    print("✅ TTL y desalojo LRU")
+
+
+def test_geocoder_sin_espera_en_cache():
+    """Un segundo Geocoder resuelve desde la caché compartida sin esperar ni consultar la API"""
+    llamadas = []
+    esperas = []
+
+    def get_falso(url, params=None, headers=None, timeout=None):
+        llamadas.append(params["q"])
+        return RespuestaFalsa([{"lat": "-32.8908", "lon": "-68.8272"}] if "Plaza" in params["q"] else [])
+
+    original = geocoder_mod.requests.get
+    geocoder_mod.requests.get = get_falso
+    # Cada turno pedido al limitador de Nominatim (1 req/s) es una espera posible
+    geocoder_mod.LIMITE_NOMINATIM.adquirir = lambda tokens=1.0: esperas.append(tokens)
+    try:
+        cache = GeocodeCache(":memory:")
+        assert Geocoder(cache, usar_gazetteer=False).geocode_poi("Plaza Independencia") == (-32.8908, -68.8272)
+        assert Geocoder(cache, usar_gazetteer=False).geocode_poi("Lugar inventado") is None
+
+        for _ in range(100):
+            assert Geocoder(cache, usar_gazetteer=False).geocode_poi("plaza independencia") == (-32.8908, -68.8272)
+            assert Geocoder(cache, usar_gazetteer=False).geocode_poi("Lugar Inventado") is None
+    finally:
+        geocoder_mod.requests.get = original
+        del geocoder_mod.LIMITE_NOMINATIM.adquirir
+
+    assert len(llamadas) == 2
+    assert len(esperas) == 2
+    print("✅ 200 búsquedas repetidas sin turnos del limitador, 2 consultas a Nominatim")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DE LA CACHÉ DE GEOCODIFICACIÓN\n")
+
+    test_normalizacion()
+    test_persistencia_y_negativos()
+    test_ttl_y_lru()
+    test_geocoder_sin_espera_en_cache()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
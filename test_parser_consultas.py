@@ -0,0 +1,131 @@
+"""
+Test: Parser determinístico de consultas (camino rápido sin LLM)
+No requiere Neo4j ni Ollama: usa un conector falso que registra el Cypher ejecutado
+"""
+
+from workflow.query_parser import compilar_cypher, es_recomendacion, parsear_consulta, responder_consulta_rapida
+
+
+def test_slots_reconocidos():
+    casos = {
+        "¿Cuántas propiedades hay en total?": dict(intencion='contar'),
+        "Busca casas en Ciudad de Mendoza": dict(ciudad='capital', tipo='casa'),
+        "¿Hay departamentos por menos de 600000?": dict(tipo='departamento', precio_max=600000, precio_max_inclusivo=False),
+        "Propiedades con 3 habitaciones": dict(ambientes_min=3),
+        "¿Qué barrios tienen más propiedades?": dict(intencion='barrios'),
+        "Busca departamentos de 2 ambientes por menos de $180,000": dict(tipo='departamento', ambientes_min=2, precio_max=180000),
+        "Lista las 5 propiedades más baratas": dict(limite=5, orden_descendente=False),
+        "las 3 más caras de Maipú": dict(limite=3, orden_descendente=True, ciudad='maipu'),
+        "casas en Luján entre 300 mil y 1,5 millones con al menos 2 dormitorios":
+            dict(ciudad='lujan de cuyo', tipo='casa', precio_min=300000, precio_max=1500000, dormitorios_min=2),
+        "deptos en Chacras de Coria hasta 450.000": dict(barrio='chacras de coria', tipo='departamento',
+                                                         precio_max=450000, precio_max_inclusivo=True),
+        "propiedades desde 200k con más de 2 ambientes": dict(precio_min=200000, ambientes_min=3),
+    }
+    for pregunta, esperado in casos.items():
+        consulta = parsear_consulta(pregunta)
+        assert consulta is not None, pregunta
+        for slot, valor in esperado.items():
+            assert getattr(consulta, slot) == valor, (pregunta, slot, getattr(consulta, slot))
+    print(f"✅ {len(casos)} consultas reconocidas con sus slots")
+
+
+def test_consultas_para_el_llm():
+    """Lo que el parser no entiende del todo sigue por el LLM"""
+    for pregunta in [
+        "Quiero una propiedad cerca del Parque San Martín",
+        "Busca inmuebles a 3 km de la Universidad Nacional de Cuyo",
+        "¿Qué amenidades están disponibles?",
+        "¿Cuántos usuarios hay registrados?",
+        "departamentos que acepten mascotas",
+        "casas de 300 m2",
+        "",
+    ]:
+        assert parsear_consulta(pregunta) is None, pregunta
+    print("✅ Consultas no reconocidas quedan para el LLM")
+
+
+def test_recomendaciones_fuera_del_parser():
+    """Los pedidos de recomendación siguen por el flujo que puntúa para el usuario"""
+    for pregunta in [
+        "Recomiéndame algo en Godoy Cruz",
+        "recomendame casas en maipu",
+        "sugerime departamentos hasta 300 mil",
+        "¿Cuál es la mejor opción con mi presupuesto de $180,000?",
+    ]:
+        assert es_recomendacion(pregunta), pregunta
+        assert parsear_consulta(pregunta) is None, pregunta
+        assert responder_consulta_rapida(pregunta, ConnectorFalso()) is None, pregunta
+    assert not es_recomendacion("casas en maipu hasta 400 mil")
+    print("✅ Pedidos de recomendación quedan para el flujo de recomendación")
+
+
+def test_cypher_parametrizado():
+    cypher, parametros = compilar_cypher(parsear_consulta("casas en Godoy Cruz por menos de 550000 con 2 habitaciones"))
+    assert cypher.startswith("MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address) WHERE coalesce(p.active, true) AND ")
+    assert "toLower(a.city) CONTAINS $ciudad" in cypher and "p.rooms >= $ambientes_min" in cypher
+    assert "p.price < $precio_max" in cypher and cypher.endswith("ORDER BY p.price LIMIT $limite")
+    assert parametros == {'ciudad': 'godoy cruz', 'tipo': 'casa', 'tipo_url': '-casa-en-',
+                          'ambientes_min': 2, 'precio_max': 550000.0, 'limite': 10}
+    # Los valores nunca se interpolan en el texto de la consulta
+    assert "godoy" not in cypher and "550000" not in cypher
+    # Las publicaciones inactivas (retiradas del CSV) nunca se listan ni se cuentan
+    assert compilar_cypher(parsear_consulta("¿Cuántas propiedades hay?"))[0] == \
+        "MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address) WHERE coalesce(p.active, true) RETURN count(p) AS total"
+    print("✅ Cypher parametrizado con la forma del prompt")
+
+
+class SesionFalsa:
+    def __init__(self, connector):
+        self.connector = connector
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def run(self, cypher, **parametros):
+        self.connector.ejecutadas.append((cypher, parametros))
+        if "count(p) AS total" in cypher:
+            return [{'total': 42}]
+        return [{'p.name': 'Propiedad #1 - Godoy Cruz', 'p.price': 450000, 'p.rooms': 2,
+                 'a.city': 'godoy cruz', 'a.neighborhood': 'godoy cruz'}]
+
+
+class ConnectorFalso:
+    def __init__(self):
+        self.ejecutadas = []
+
+    def is_connected(self):
+        return True
+
+    def get_session(self):
+        return SesionFalsa(self)
+
+
+def test_respuesta_sin_llm():
+    connector = ConnectorFalso()
+    resultado = responder_consulta_rapida("departamentos en Godoy Cruz hasta 500 mil", connector)
+    assert "Propiedad #1 - Godoy Cruz - $450,000" in resultado["respuesta"]
+    assert "sin LLM" in resultado["explicacion"]
+    assert connector.ejecutadas[0][1]['precio_max'] == 500000
+
+    assert responder_consulta_rapida("¿Cuántas propiedades hay?", connector)["respuesta"] == "Hay 42 propiedades en total."
+    assert responder_consulta_rapida("propiedades cerca del hospital", connector) is None
+    assert len(connector.ejecutadas) == 2
+    print("✅ Respuesta directa desde Neo4j")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DEL PARSER DE CONSULTAS\n")
+
+    test_slots_reconocidos()
+    test_consultas_para_el_llm()
+    test_recomendaciones_fuera_del_parser()
+    test_cypher_parametrizado()
+    test_respuesta_sin_llm()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
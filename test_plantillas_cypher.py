@@ -0,0 +1,111 @@
+"""
+Test: Plantillas de Cypher parametrizadas
+No requiere Neo4j ni Ollama
+"""
+
+from workflow.cypher_templates import bind_template, fill_template, parameterize_cypher, question_shape
+from workflow.langchain_integration import CypherCache
+
+GENERADO = '''MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address)
+where toLower(a.city) contains "godoy cruz" AND p.rooms >= 2 and p.price < 550000
+RETURN p.name, p.price, p.rooms, a.city, a.neighborhood ORDER BY p.price LIMIT 10'''
+
+
+def test_literales_a_parametros():
+    plantilla, parametros = parameterize_cypher(GENERADO)
+    assert plantilla == (
+        "MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address) WHERE toLower(a.city) CONTAINS $p0 "
+        "AND p.rooms >= $p1 AND p.price < $p2 "
+        "RETURN p.name, p.price, p.rooms, a.city, a.neighborhood ORDER BY p.price LIMIT $p3"
+    )
+    assert parametros == {"p0": "godoy cruz", "p1": 2, "p2": 550000, "p3": 10}
+
+    # Otros valores, mayúsculas y espacios distintos: misma plantilla
+    otra = GENERADO.replace('"godoy cruz"', "'maipu'").replace("550000", "700000.5").replace("\n", "  ")
+    assert parameterize_cypher(otra)[0] == plantilla
+    assert parameterize_cypher(otra)[1]["p2"] == 700000.5
+
+    # Rangos, propiedades con números, backticks y escapes no se tocan
+    plantilla, parametros = parameterize_cypher(
+        "MATCH (a)-[:R*1..3]->(b {name: 'O\\'Brien'}) WHERE a.`precio  2` = 1.5 AND a.p2 > 0 RETURN b")
+    assert plantilla == "MATCH (a)-[:R*1..3]->(b {name: $p0}) WHERE a.`precio  2` = $p1 AND a.p2 > $p2 RETURN b"
+    assert parametros == {"p0": "O'Brien", "p1": 1.5, "p2": 0}
+
+    # Funciones y alias conservan el nombre que escribió el LLM (son los nombres de las columnas)
+    assert parameterize_cypher("match (p) return count(p) as count")[0] == "MATCH (p) RETURN count(p) AS count"
+    assert parameterize_cypher("MATCH (p) RETURN count(p)")[0] == "MATCH (p) RETURN count(p)"
+    assert parameterize_cypher("MATCH (p) WITH p.price > 5 AS in RETURN in ORDER BY in desc")[0] == \
+        "MATCH (p) WITH p.price > $p0 AS in RETURN in ORDER BY in DESC"
+
+    # Los comentarios se quitan antes de unir las líneas (un // no se traga el resto de la consulta)
+    plantilla, parametros = parameterize_cypher(
+        "MATCH (p:Property)\nWHERE p.price < 100000 // menos de 100 mil\nRETURN p.name /* primeras 5 */ LIMIT 5")
+    assert plantilla == "MATCH (p:Property) WHERE p.price < $p0 RETURN p.name LIMIT $p1"
+    assert parametros == {"p0": 100000, "p1": 5}
+    # ... salvo dentro de un texto
+    plantilla, parametros = parameterize_cypher('MATCH (p) WHERE p.url STARTS WITH "https://x/*" RETURN p')
+    assert plantilla == "MATCH (p) WHERE p.url STARTS WITH $p0 RETURN p" and parametros == {"p0": "https://x/*"}
+
+    # Un Cypher que ya usa parámetros se deja igual
+    assert parameterize_cypher("MATCH (p) WHERE p.price < $max RETURN p") == \
+        ("MATCH (p) WHERE p.price < $max RETURN p", {})
+    print("✅ Literales pasados a parámetros con forma canónica")
+
+
+def test_reutilizar_plantilla():
+    _, parametros = parameterize_cypher(GENERADO)
+    forma, valores = question_shape("Casas en Godoy Cruz con 2 ambientes hasta $550.000")
+    assert forma == "casas en <ciudad> con <n> ambientes hasta <n>"
+    vinculos = bind_template(parametros, valores)
+    assert vinculos is not None
+
+    otra_forma, otros = question_shape("casas en Luján de Cuyo con 3 ambientes hasta 700 mil")
+    assert otra_forma == forma
+    assert fill_template(parametros, vinculos, otros) == \
+        {"p0": "lujan de cuyo", "p1": 3, "p2": 700000, "p3": 10}
+
+    # El LLM usó el nombre canónico ("capital") para un alias de la pregunta
+    _, parametros = parameterize_cypher('MATCH (p)-[:HAS_ADDRESS]->(a) WHERE a.city = "Capital" RETURN p')
+    _, valores = question_shape("casas en ciudad de mendoza")
+    vinculos = bind_template(parametros, valores)
+    _, otros = question_shape("casas en lujan")
+    assert fill_template(parametros, vinculos, otros) == {"p0": "Lujan De Cuyo"}
+    print("✅ Plantilla reutilizada con los valores de otra pregunta")
+
+
+def test_plantillas_no_reutilizables():
+    # El valor de la pregunta no aparece en el Cypher (el LLM lo tradujo)
+    _, parametros = parameterize_cypher('MATCH (p) WHERE p.name CONTAINS "parque" RETURN p LIMIT 5')
+    assert bind_template(parametros, question_shape("cerca del parque san martin")[1]) is None
+
+    # El mismo número se usa en dos parámetros: ambiguo
+    _, parametros = parameterize_cypher("MATCH (p) WHERE p.rooms >= 2 AND p.bedrooms >= 2 RETURN p")
+    assert bind_template(parametros, question_shape("casas con 2 ambientes")[1]) is None
+    print("✅ Valores traducidos o ambiguos no generan plantilla")
+
+
+def test_cache_por_forma():
+    cache = CypherCache()
+    cache.put("Casas en Godoy Cruz hasta 550000", "esquema", GENERADO.replace("AND p.rooms >= 2 ", ""))
+
+    plantilla, parametros = cache.get("casas en maipu hasta 300 mil", "esquema")
+    assert "$p0" in plantilla and parametros == {"p0": "maipu", "p1": 300000, "p2": 10}
+    assert cache.template_hits == 1 and cache.hits == 0
+
+    assert cache.get("casas en godoy cruz hasta 550.000", "esquema")[1]["p0"] == "godoy cruz"
+    assert cache.hits == 1
+    assert cache.get("departamentos en maipu hasta 300000", "esquema") is None
+    print("✅ El caché de Cypher acierta por forma de pregunta")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DE PLANTILLAS DE CYPHER\n")
+
+    test_literales_a_parametros()
+    test_reutilizar_plantilla()
+    test_plantillas_no_reutilizables()
+    test_cache_por_forma()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
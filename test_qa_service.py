@@ -0,0 +1,172 @@
+"""
+Test: Servicio de Q&A con cadena compartida
+No requiere Neo4j ni Ollama (la cadena y el grafo son falsos)
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+import workflow.qa_service as qa_service
+from neo4j.exceptions import ServiceUnavailable
+from workflow.qa_service import HousingQAService
+
+
+class GrafoFalso:
+    def __init__(self):
+        self.refrescos = 0
+        self.get_structured_schema = {"node_props": {}, "rel_props": {}, "relationships": []}
+        self.cerrado = False
+        self._driver = self
+
+    def refresh_schema(self):
+        self.refrescos += 1
+
+    def query(self, cypher, params=None):
+        return [{"1": 1}]
+
+    def close(self):
+        self.cerrado = True
+
+
+class CadenaFalsa:
+    def __init__(self, error=None):
+        self.graph_schema = ""
+        self.error = error
+        self.llamadas = 0
+
+    def invoke(self, inputs):
+        self.llamadas += 1
+        if self.error:
+            raise self.error
+        return {"result": f"respuesta a {inputs['query']}", "intermediate_steps": []}
+
+
+class FabricaFalsa:
+    def __init__(self, error=None):
+        self.construidas = []
+        self.error = error
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        time.sleep(0.05)  # Simula la conexión e introspección del esquema
+        with self._lock:
+            par = (CadenaFalsa(self.error), GrafoFalso())
+            self.construidas.append(par)
+            return par
+
+
+def test_cadena_construida_una_vez():
+    """Muchos hilos preguntando a la vez comparten una única cadena"""
+    fabrica = FabricaFalsa()
+    servicio = HousingQAService(factory=fabrica)
+    respuestas = []
+
+    def preguntar(i):
+        respuestas.append(servicio.invoke({"query": f"pregunta {i}"}))
+
+    hilos = [threading.Thread(target=preguntar, args=(i,)) for i in range(20)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(fabrica.construidas) == 1
+    assert len(respuestas) == 20
+    assert fabrica.construidas[0][0].llamadas == 20
+    print("✅ 20 preguntas concurrentes, 1 cadena construida")
+
+
+def test_refresco_de_esquema():
+    fabrica = FabricaFalsa()
+    servicio = HousingQAService(factory=fabrica, schema_refresh_interval=0.1)
+    servicio.invoke({"query": "a"})
+    servicio.invoke({"query": "b"})
+    cadena, grafo = fabrica.construidas[0]
+    assert grafo.refrescos == 0
+
+    time.sleep(0.15)
+    servicio.invoke({"query": "c"})
+    assert grafo.refrescos == 1
+    assert "Node properties" in cadena.graph_schema
+    servicio.invoke({"query": "d"})
+    assert grafo.refrescos == 1
+    assert len(fabrica.construidas) == 1
+    print("✅ El esquema se relee solo al vencer el intervalo")
+
+
+def test_reset_concurrente():
+    """Un reset() desde otro hilo en medio de get_chain, query o health_check no los rompe"""
+    servicio = HousingQAService(factory=lambda: (CadenaFalsa(), GrafoFalso()))
+    servicio.get_chain()
+    reloj = qa_service.time.monotonic
+
+    def reloj_con_reset():
+        # Otro hilo descarta la cadena justo cuando get_chain consulta el reloj
+        hilo = threading.Thread(target=servicio.reset)
+        hilo.start()
+        hilo.join(timeout=0.1)
+        return reloj()
+
+    qa_service.time = SimpleNamespace(monotonic=reloj_con_reset)
+    try:
+        assert servicio.get_chain() is not None
+    finally:
+        qa_service.time = time
+
+    # El reset llega entre que se lee la cadena y se usa su grafo
+    servicio = HousingQAService(factory=lambda: (CadenaFalsa(), GrafoFalso()), schema_refresh_interval=0)
+    servicio.refresh_schema = servicio.reset
+    assert servicio.query("RETURN 1") == [{"1": 1}]
+    assert servicio.health_check(force=True)["neo4j"] is True
+    print("✅ get_chain, query y health_check no fallan si otro hilo hace reset() a la vez")
+
+
+def test_health_check_cacheado():
+    fabrica = FabricaFalsa()
+    servicio = HousingQAService(factory=fabrica, ollama_url="http://127.0.0.1:9")
+    salud = servicio.health_check()
+    assert salud == {"neo4j": True, "ollama": False}
+
+    fabrica.construidas[0][1].query = lambda cypher, params=None: 1 / 0
+    assert servicio.health_check() == salud  # Todavía cacheado
+    assert servicio.health_check(force=True)["neo4j"] is False
+    assert not servicio.is_ready()
+    print("✅ Health check cacheado y forzable")
+
+
+def test_error_de_conexion_reconstruye():
+    fabrica = FabricaFalsa(error=ServiceUnavailable("sin conexión"))
+    servicio = HousingQAService(factory=fabrica)
+    for _ in range(2):
+        try:
+            servicio.invoke({"query": "x"})
+            assert False, "debería propagar el error"
+        except ServiceUnavailable:
+            pass
+    assert len(fabrica.construidas) == 2
+    assert fabrica.construidas[0][1].cerrado
+
+    # Otros errores no descartan la cadena
+    fabrica.error = ValueError("cypher inválido")
+    servicio.reset()
+    for _ in range(2):
+        try:
+            servicio.invoke({"query": "x"})
+        except ValueError:
+            pass
+    assert len(fabrica.construidas) == 3
+    print("✅ Un error de conexión descarta la cadena y se reconstruye al próximo uso")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DEL SERVICIO DE Q&A\n")
+
+    test_cadena_construida_una_vez()
+    test_refresco_de_esquema()
+    test_reset_concurrente()
+    test_health_check_cacheado()
+    test_error_de_conexion_reconstruye()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
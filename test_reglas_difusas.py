@@ -0,0 +1,198 @@
+"""
+Test: Base de reglas difusas compilada (fuzzy/rule_base.py)
+No requiere Neo4j
+"""
+
+import numpy as np
+import models.housing_frames as hf
+from fuzzy.fuzzy_logic import FuzzyLogic
+from fuzzy.rule_base import FuzzyRuleBase, FuzzyVariable, create_housing_rule_base
+from models.housing_frames import (AMENIDADES_PESOS, BloquePropiedades, RANGOS_AREA, RANGOS_PRECIO, UserFrame,
+                                   calcular_membership_distancia, calcular_score_propiedad,
+                                   calcular_scores_propiedades, plan_reglas)
+
+ESCALARES = {
+    'triangular': FuzzyLogic.triangular_membership,
+    'trapezoidal': FuzzyLogic.trapezoidal_membership,
+    'gaussian': FuzzyLogic.gaussian_membership,
+}
+
+
+def base_de_ejemplo():
+    """Reglas de precio y distancia con combinaciones (promedio ponderado, estilo Sugeno)"""
+    base = FuzzyRuleBase()
+    base.add_variable(FuzzyVariable('precio')
+                      .add_term('very_cheap', 'triangular', 0, 20000, 40000)
+                      .add_term('cheap', 'triangular', 20000, 55000, 70000)
+                      .add_term('moderate', 'triangular', 55000, 95000, 120000)
+                      .add_term('expensive', 'trapezoidal', 95000, 120000, 160000, 200000))
+    base.add_variable(FuzzyVariable('distancia')
+                      .add_term('very_close', 'triangular', 0, 100, 200)
+                      .add_term('close', 'triangular', 100, 350, 500)
+                      .add_term('moderate', 'triangular', 350, 750, 1000)
+                      .add_term('far', 'gaussian', 1500, 500))
+    for term, value in (('very_cheap', 1.0), ('cheap', 0.8), ('moderate', 0.5), ('expensive', 0.2)):
+        base.add_rule([('precio', term)], 'score', value)
+    for term, value in (('very_close', 1.0), ('close', 0.75), ('moderate', 0.4), ('far', 0.1)):
+        base.add_rule([('distancia', term)], 'score', value)
+    base.add_rule([('precio', 'cheap'), ('distancia', 'very_close')], 'score', 1.0, weight=2.0)
+    base.add_rule([('precio', 'cheap'), ('distancia', 'close')], 'score', 0.9, weight=1.5)
+    base.add_rule([('precio', 'moderate'), ('distancia', 'very_close')], 'score', 0.7, weight=1.5)
+    base.add_rule([('precio', 'expensive'), ('distancia', 'far')], 'score', 0.0, weight=2.0)
+    return base
+
+
+def evaluar_sin_compilar(base, entradas):
+    """Evaluación directa regla por regla (referencia)"""
+    numerador, denominador = 0.0, 0.0
+    for regla in base.rules:
+        grados = []
+        for variable, termino in regla.antecedents:
+            t = base.variables[variable].terms[termino]
+            grados.append(ESCALARES[t.kind](entradas[variable], *t.params))
+        activacion = FuzzyLogic.fuzzy_and(grados) * regla.weight
+        numerador += activacion * regla.value
+        denominador += activacion
+    return numerador / denominador if denominador > 0 else 0.0
+
+
+def test_igual_a_evaluacion_directa():
+    base = base_de_ejemplo()
+    # Reglas redundantes: duplicada, antecedente repetido y muerta
+    base.add_rule([('precio', 'cheap'), ('distancia', 'close')], 'score', 0.9, weight=1.5)
+    base.add_rule([('precio', 'cheap'), ('precio', 'cheap')], 'score', 0.8)
+    base.add_rule([('precio', 'very_cheap'), ('precio', 'expensive')], 'score', 1.0)
+    plan = base.compile()
+
+    rnd = np.random.default_rng(0)
+    precios = np.concatenate([rnd.uniform(0, 250000, 3000), [20000, 55000, 70000, 120000, 200000]])
+    distancias = np.concatenate([rnd.uniform(0, 4000, 3000), [100, 200, 350, 500, 1000]])
+
+    scores = plan.evaluate({'precio': precios, 'distancia': distancias})['score']
+    for i in range(len(precios)):
+        esperado = evaluar_sin_compilar(base, {'precio': precios[i], 'distancia': distancias[i]})
+        assert abs(scores[i] - esperado) < 1e-12, (precios[i], distancias[i])
+
+    assert abs(plan.evaluate_one(precio=55000, distancia=200)['score'] - scores[-4]) < 1e-12
+    print("✅ El plan compilado coincide con la evaluación regla por regla")
+
+
+def test_optimizaciones_del_plan():
+    base = base_de_ejemplo()
+    plan_original = base.compile()
+
+    base.add_rule([('precio', 'cheap'), ('distancia', 'close')], 'score', 0.9)  # duplicada → se fusiona
+    base.add_rule([('precio', 'very_cheap'), ('precio', 'expensive')], 'score', 1.0)  # disjunta → muerta
+    base.add_rule([('distancia', 'far')], 'score', 1.0, weight=0)  # peso 0 → muerta
+    plan = base.compile()
+
+    assert plan.active_rules == plan_original.active_rules
+    assert len(plan.dead_rules) == 2
+    # Cada membresía se calcula una vez y las conjunciones comparten prefijos
+    assert len(plan.terms) == 8
+    assert len(plan.steps) == len({s for s in plan.steps})
+    print(f"✅ {len(base.rules)} reglas → {plan.active_rules} activas, {len(plan.steps)} pasos")
+
+
+def test_errores():
+    base = FuzzyRuleBase()
+    base.add_variable(FuzzyVariable('precio').add_term('cheap', 'triangular', 0, 1, 2))
+    for antecedentes in ([('area', 'grande')], [('precio', 'caro')]):
+        try:
+            base.add_rule(antecedentes, 'score', 1.0)
+            assert False, antecedentes
+        except ValueError:
+            pass
+    try:
+        FuzzyVariable('x').add_term('t', 'triangular', 0, 1)
+        assert False
+    except ValueError:
+        pass
+
+    base.add_rule([('precio', 'cheap')], 'score', 1.0)
+    try:
+        base.compile().evaluate({'distancia': np.zeros(3)})
+        assert False
+    except ValueError:
+        pass
+    print("✅ Errores de definición y entradas faltantes")
+
+
+def test_base_desde_las_tablas():
+    """La base de la recomendación sale de RANGOS_PRECIO, RANGOS_AREA, AMENIDADES_PESOS y DISTANCIAS_IDEALES"""
+    plan = create_housing_rule_base()
+    for variable, rangos in (('precio', RANGOS_PRECIO), ('area', RANGOS_AREA)):
+        for nombre, rango in rangos.items():
+            for valor in (rango.min_val - 1, rango.target, rango.target + rango.tolerancia, rango.max_val + 1):
+                grado = plan.evaluate_one(**{variable: valor})[f'{variable}_{nombre}']
+                assert grado == rango.membership_ok(valor), (variable, nombre, valor)
+
+    # Aporte de una amenidad: peso × pertenencia, también para tipos fuera de las tablas
+    for tipo in list(AMENIDADES_PESOS) + ['bus_stop']:
+        distancias = np.array([0.0, 250.0, 700.0, 1500.0, 2600.0, 9000.0])
+        entradas = {v: np.full(len(distancias), np.inf) for v in plan.required_inputs(['amenidades'])}
+        entradas[hf.variable_distancia(tipo)] = distancias
+        aportes = plan.evaluate(entradas, ['amenidades'])['amenidades']
+        esperado = [calcular_membership_distancia(d, tipo) * AMENIDADES_PESOS.get(tipo, 0.5) for d in distancias]
+        assert np.allclose(aportes, esperado, rtol=0, atol=1e-12), tipo
+
+    # Las salidas de amenidades no necesitan precio ni área
+    assert 'precio' not in plan.required_inputs(['amenidades'])
+    print(f"✅ Base de la recomendación: {plan.active_rules} reglas construidas desde las tablas")
+
+
+def test_scorer_por_lotes_usa_el_plan():
+    """calcular_scores_propiedades evalúa las amenidades con el plan compilado y sigue los cambios de las tablas"""
+    propiedades = [{'name': 'A', 'price': 120000, 'rooms': 2,
+                    'nearby_amenities': [{'type': 'parque', 'distance': 600}, {'type': 'hospital', 'distance': 100}]},
+                   {'name': 'B', 'price': 90000, 'rooms': 1,
+                    'nearby_amenities': [{'type': 'cancha', 'distance': 1200}]}]
+    usuario = UserFrame(name="Ana", budget=100000, min_rooms=2)
+
+    def comparar():
+        lote = calcular_scores_propiedades(BloquePropiedades.desde_dicts(propiedades), usuario)
+        escalares = [calcular_score_propiedad(p, usuario) for p in propiedades]
+        assert np.allclose(lote, escalares, rtol=0, atol=1e-12)
+        return lote
+
+    antes = comparar()
+    plan = plan_reglas()
+    AMENIDADES_PESOS['parque'] += 0.2
+    try:
+        assert plan_reglas() is not plan
+        despues = comparar()
+        assert despues[0] != antes[0] and despues[1] == antes[1]
+    finally:
+        AMENIDADES_PESOS['parque'] -= 0.2
+    assert np.allclose(comparar(), antes)
+    print("✅ El scorer por lotes usa la base compilada y se recompila al cambiar los pesos")
+
+
+def test_lote_grande():
+    """20k propiedades en una evaluación del plan, igual que regla por regla"""
+    base = base_de_ejemplo()
+    plan = base.compile()
+    rnd = np.random.default_rng(1)
+    precios = rnd.uniform(0, 250000, 20000)
+    distancias = rnd.uniform(0, 4000, 20000)
+
+    scores = plan.evaluate({'precio': precios, 'distancia': distancias})['score']
+    assert scores.shape == precios.shape
+    for precio, distancia, score in zip(precios.tolist(), distancias.tolist(), scores.tolist()):
+        assert abs(score - evaluar_sin_compilar(base, {'precio': precio, 'distancia': distancia})) < 1e-12
+    print(f"✅ {len(precios)} propiedades × {len(base.rules)} reglas en una evaluación")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DE LA BASE DE REGLAS DIFUSAS\n")
+
+    test_igual_a_evaluacion_directa()
+    test_optimizaciones_del_plan()
+    test_errores()
+    test_base_desde_las_tablas()
+    test_scorer_por_lotes_usa_el_plan()
+    test_lote_grande()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
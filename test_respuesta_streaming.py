@@ -0,0 +1,140 @@
+"""
+Test: Respuesta por etapas (streaming) para la UI
+No requiere Neo4j ni Ollama (la cadena, el LLM y el grafo son falsos)
+"""
+
+import workflow.langchain_integration as integracion
+import workflow.qa_service as qa_service
+import workflow.query_parser as query_parser
+from workflow.langchain_integration import CypherCache, stream_answer_markdown, stream_question
+
+GENERADO = ('MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address) WHERE toLower(a.city) CONTAINS "maipu" '
+            'RETURN p.name, p.price ORDER BY p.price LIMIT 10')
+TOKENS = ["Encontré ", "2 casas ", "en Maipú."]
+
+# Lo que hace el LLM falso y lo que recibe quien consume el stream, en orden
+REGISTRO = []
+
+
+class GrafoFalso:
+    _driver = None
+
+    def __init__(self):
+        self.consultas = []
+
+    def query(self, cypher, params=None):
+        self.consultas.append((cypher, params))
+        return [{"p.name": "Casa 1", "p.price": 150000}, {"p.name": "Casa 2", "p.price": 180000}]
+
+
+class GeneracionFalsa:
+    output_key = "text"
+
+    def invoke(self, inputs):
+        REGISTRO.append("llm: cypher")
+        return {"text": f"Cypher: ```cypher\n{GENERADO}\n```"}
+
+
+class LLMFalso:
+    def stream(self, prompt):
+        for token in TOKENS:
+            REGISTRO.append("llm: token")
+            yield token
+
+
+class RespuestaFalsa:
+    class prompt:
+        @staticmethod
+        def format(question, context):
+            return f"{question} {context}"
+
+    llm = LLMFalso()
+
+
+class CadenaBase:
+    graph_schema = "Node properties: Property {name, price}"
+    top_k = 10
+    cypher_generation_chain = GeneracionFalsa()
+    qa_chain = RespuestaFalsa()
+
+
+class CadenaFalsa:
+    base_chain = CadenaBase()
+
+
+def con_servicio_falso(prueba):
+    def ejecutar():
+        grafo = GrafoFalso()
+        servicio_original = qa_service._qa_service
+        rapida_original = query_parser.responder_consulta_rapida
+        cache_original = integracion._cypher_cache
+        qa_service._qa_service = qa_service.HousingQAService(factory=lambda: (CadenaFalsa(), grafo))
+        query_parser.responder_consulta_rapida = lambda pregunta, connector=None: None
+        integracion._cypher_cache = CypherCache()
+        try:
+            prueba(grafo)
+        finally:
+            qa_service._qa_service = servicio_original
+            query_parser.responder_consulta_rapida = rapida_original
+            integracion._cypher_cache = cache_original
+    return ejecutar
+
+
+@con_servicio_falso
+def test_etapas_en_orden(grafo):
+    REGISTRO.clear()
+    eventos = []
+    for evento in stream_question("¿Por qué las casas en maipu son tan baratas?"):
+        eventos.append(evento)
+        REGISTRO.append(evento["stage"])
+
+    etapas = [e["stage"] for e in eventos]
+    assert etapas == ["intent", "cypher", "rows", "token", "token", "token", "answer"]
+    assert eventos[0]["source"] == "llm"
+    assert eventos[1]["parameters"] == {"p0": "maipu", "p1": 10}
+    assert grafo.consultas == [(eventos[1]["cypher"], eventos[1]["parameters"])]
+    assert [e["text"] for e in eventos if e["stage"] == "token"] == TOKENS
+    assert eventos[-1]["answer"] == "Encontré 2 casas en Maipú."
+
+    # La intención llega antes de que el LLM haga nada y cada fragmento apenas se genera
+    assert REGISTRO == ["intent", "llm: cypher", "cypher", "rows",
+                        "llm: token", "token", "llm: token", "token", "llm: token", "token", "answer"]
+    print("✅ Cada etapa llega apenas está lista, sin esperar al resto de la cadena")
+
+
+@con_servicio_falso
+def test_segunda_vez_desde_cache(grafo):
+    primera = list(stream_question("casas baratas en maipu"))
+    eventos = list(stream_question("Casas baratas en Maipú"))
+    # Un listado se arma desde las filas: ni la primera vez se redacta con el LLM
+    assert [e["stage"] for e in primera] == ["intent", "cypher", "rows", "answer"]
+    assert [e["stage"] for e in eventos] == ["intent", "cypher", "rows", "answer"]
+    assert eventos[0]["source"] == "cache"
+    assert eventos[-1]["answer"] == primera[-1]["answer"]
+    assert "1. Casa 1 - $150,000" in eventos[-1]["answer"]
+    print("✅ Con el Cypher cacheado no se llama al LLM")
+
+
+@con_servicio_falso
+def test_markdown_para_la_ui(grafo):
+    pantallas = list(stream_answer_markdown("¿Conviene alquilar en maipu?"))
+    respuestas = [r for r, _ in pantallas]
+    assert respuestas[0].startswith("⏳")
+    assert any("| name | price |" in r and "Casa 2" in r for r in respuestas)
+    assert any(r.endswith("▌") for r in respuestas)
+    respuesta, explicacion = pantallas[-1]
+    assert respuesta == "Encontré 2 casas en Maipú."
+    assert "```cypher" in explicacion and "**Filas devueltas:** 2" in explicacion
+    print(f"✅ {len(pantallas)} actualizaciones de pantalla para la UI")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DE RESPUESTA POR ETAPAS\n")
+
+    test_etapas_en_orden()
+    test_segunda_vez_desde_cache()
+    test_markdown_para_la_ui()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
@@ -0,0 +1,62 @@
+"""
+Test: Respuestas armadas desde las filas (sin la segunda llamada al LLM)
+No requiere Neo4j ni Ollama
+"""
+
+from workflow.answer_renderer import es_pregunta_abierta, renderizar_respuesta
+
+FILAS = [
+    {"p.name": "Casa con patio", "p.price": 450000.0, "p.rooms": 3, "a.city": "godoy cruz", "a.neighborhood": "godoy cruz"},
+    {"p.name": "Duplex nuevo", "p.price": 520000.0, "p.rooms": 2, "a.city": "godoy cruz", "a.neighborhood": "villa marini"},
+]
+
+
+def test_listado_de_propiedades():
+    respuesta = renderizar_respuesta("Casas en Godoy Cruz con 2 ambientes a menos de 550000", FILAS)
+    assert respuesta == (
+        "Encontré 2 propiedades:\n\n"
+        "1. Casa con patio - $450,000 - 3 ambientes - Godoy Cruz\n"
+        "2. Duplex nuevo - $520,000 - 2 ambientes - Godoy Cruz - Villa Marini"
+    )
+    # Nodos devueltos enteros (RETURN p)
+    respuesta = renderizar_respuesta("departamentos baratos", [{"p": {"name": "Depto", "price": 90000, "area": 45.5}}])
+    assert respuesta == "Encontré 1 propiedad:\n\n1. Depto - $90,000 - 45.5 m²"
+    assert renderizar_respuesta("casas en lavalle", []) == \
+        "No encontré propiedades que cumplan con todos los criterios."
+    print("✅ Listados de propiedades armados desde las filas")
+
+
+def test_conteos_y_agrupados():
+    assert renderizar_respuesta("¿Cuántas propiedades hay en Maipú?", [{"count(p)": 42}]) == "Hay 42 propiedades."
+    assert renderizar_respuesta("¿Cuántas amenidades hay?", [{"total": 1234}]) == "Hay 1,234 resultados."
+    assert renderizar_respuesta("¿Cuántas casas hay en Lavalle?", [{"total": 1}]) == "Hay 1 propiedad."
+    assert renderizar_respuesta("precio promedio en capital", [{"avg(p.price)": 312345.6}]) == \
+        "avg(p.price): $312,346"
+    agrupado = renderizar_respuesta("propiedades por ciudad",
+                                    [{"a.city": "capital", "count(p)": 30}, {"a.city": "maipu", "count(p)": 12}])
+    assert agrupado == "1. Capital - 30 propiedades\n2. Maipu - 12 propiedades"
+    print("✅ Conteos, promedios y agrupados armados desde las filas")
+
+
+def test_preguntas_abiertas_usan_el_llm():
+    for pregunta in ("¿Por qué Godoy Cruz es más caro?", "Comparame Maipú con Luján",
+                     "¿Conviene alquilar en Capital?", "¿Cuál es el mejor barrio para familias?"):
+        assert es_pregunta_abierta(pregunta), pregunta
+        assert renderizar_respuesta(pregunta, FILAS) is None
+    assert not es_pregunta_abierta("Casas en Godoy Cruz hasta 500 mil")
+
+    # Columnas que no sabe presentar
+    assert renderizar_respuesta("datos de usuarios", [{"u.name": "Maria", "u.preferences": "[...]"}]) is None
+    print("✅ Preguntas abiertas y resultados desconocidos quedan para el LLM")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DE RESPUESTAS ARMADAS DESDE LAS FILAS\n")
+
+    test_listado_de_propiedades()
+    test_conteos_y_agrupados()
+    test_preguntas_abiertas_usan_el_llm()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
@@ -0,0 +1,107 @@
+"""
+Test: Scoring por lotes de propiedades y selección top-k
+No requiere Neo4j
+"""
+
+import random
+import numpy as np
+from models.housing_frames import (
+    AMENIDADES_PESOS, BloquePropiedades, UserFrame,
+    calcular_score_propiedad, calcular_scores_propiedades, top_k_propiedades,
+)
+
+
+def propiedades_aleatorias(n, semilla=0):
+    rnd = random.Random(semilla)
+    tipos = list(AMENIDADES_PESOS) + ["bar", ""]
+    propiedades = []
+    for i in range(n):
+        propiedad = {
+            'name': f'Propiedad {i}',
+            'price': rnd.randint(20, 400) * 1000,
+            'rooms': rnd.randint(0, 5),
+            'nearby_amenities': [
+                {'type': rnd.choice(tipos), 'distance': rnd.uniform(0, 10000)}
+                for _ in range(rnd.randint(0, 6))
+            ],
+        }
+        if rnd.random() < 0.7:
+            propiedad['transport_accessibility'] = {
+                modo: {'accessibility_score': rnd.choice([1.0, 0.8, 0.6, 0.3, 0.0])}
+                for modo in rnd.sample(['walking', 'bus', 'bicycle', 'car'], rnd.randint(0, 4))
+            }
+        propiedades.append(propiedad)
+    # Casos borde: amenidad sin distancia y propiedades con scores empatados
+    propiedades.append({'name': 'Sin distancia', 'price': 100000, 'rooms': 2, 'nearby_amenities': [{'type': 'parque'}]})
+    propiedades.append({'name': 'Empate A', 'price': 150000, 'rooms': 3})
+    propiedades.append({'name': 'Empate B', 'price': 150000, 'rooms': 3})
+    return propiedades
+
+
+USUARIOS = [
+    UserFrame(name="Ana", budget=150000, min_rooms=2),
+    UserFrame(name="Sin presupuesto", min_rooms=3),
+    UserFrame(name="Sin mínimo", budget=90000, min_rooms=0),
+]
+
+
+def test_scores_iguales_a_escalar():
+    """Cada score del lote coincide con calcular_score_propiedad"""
+    propiedades = propiedades_aleatorias(3000)
+    bloque = BloquePropiedades.desde_dicts(propiedades)
+
+    for usuario in USUARIOS:
+        for incluir_transporte in (False, True):
+            scores = calcular_scores_propiedades(bloque, usuario, incluir_transporte)
+            esperado = [calcular_score_propiedad(p, usuario, incluir_transporte) for p in propiedades]
+            assert np.allclose(scores, esperado, rtol=0, atol=1e-12), (usuario.name, incluir_transporte)
+    print("✅ Scores por lotes idénticos a los escalares")
+
+
+def test_top_k():
+    """top_k devuelve lo mismo que ordenar todos los scores"""
+    propiedades = propiedades_aleatorias(3000, semilla=1)
+    bloque = BloquePropiedades.desde_dicts(propiedades)
+    usuario = USUARIOS[0]
+
+    scores = [calcular_score_propiedad(p, usuario, True) for p in propiedades]
+    completo = sorted(range(len(scores)), key=lambda i: (-scores[i], i))
+
+    for k in (1, 10, 100, len(propiedades), len(propiedades) + 5):
+        top = top_k_propiedades(bloque, usuario, k, incluir_transporte=True)
+        assert [i for i, _ in top] == completo[:k], k
+        assert all(abs(s - scores[i]) < 1e-12 for i, s in top)
+
+    # Empates: se respeta el orden original
+    empates = BloquePropiedades.desde_dicts(propiedades[-2:] * 3)
+    assert [i for i, _ in top_k_propiedades(empates, usuario, 4)] == [0, 1, 2, 3]
+
+    assert top_k_propiedades(bloque, usuario, 0) == []
+    assert top_k_propiedades(BloquePropiedades.desde_dicts([]), usuario, 5) == []
+    print("✅ Top-k por selección parcial")
+
+
+def test_lote_grande():
+    """El top 10 de 50k propiedades en una llamada es el mismo que puntuándolas de a una"""
+    propiedades = propiedades_aleatorias(50000, semilla=2)
+    bloque = BloquePropiedades.desde_dicts(propiedades)
+    usuario = USUARIOS[0]
+
+    escalares = [calcular_score_propiedad(p, usuario, True) for p in propiedades]
+    esperado = sorted(range(len(propiedades)), key=lambda i: (-escalares[i], i))[:10]
+    top = top_k_propiedades(bloque, usuario, 10, incluir_transporte=True)
+    assert [i for i, _ in top] == esperado
+    assert all(abs(s - escalares[i]) < 1e-12 for i, s in top)
+    print(f"✅ {len(propiedades)} propiedades, top 10 en una llamada")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DE SCORING POR LOTES\n")
+
+    test_scores_iguales_a_escalar()
+    test_top_k()
+    test_lote_grande()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
@@ -0,0 +1,121 @@
+"""
+Test: Índice espacial de grilla contra la búsqueda lineal con Haversine
+No requiere Neo4j ni conexión a internet
+"""
+
+import json
+import random
+import time
+import numpy as np
+from geocoding.geocoder import Geocoder
+from geocoding.spatial_index import SpatialIndex
+
+CENTRO_MENDOZA = (-32.8895, -68.8458)
+
+
+def puntos_aleatorios(n, semilla=7):
+    rnd = random.Random(semilla)
+    return [(i, CENTRO_MENDOZA[0] + rnd.uniform(-0.3, 0.3), CENTRO_MENDOZA[1] + rnd.uniform(-0.3, 0.3))
+            for i in range(n)]
+
+
+def lineal(puntos, origen, radio_km):
+    distancias = [(Geocoder.haversine_distance(origen, (lat, lon)), clave) for clave, lat, lon in puntos]
+    return sorted((d, c) for d, c in distancias if d <= radio_km)
+
+
+def test_haversine_vectorizado():
+    """haversine_many y haversine_matrix coinciden con la versión escalar"""
+    puntos = puntos_aleatorios(100000, semilla=5)
+    lats = np.array([lat for _, lat, _ in puntos])
+    lons = np.array([lon for _, _, lon in puntos])
+
+    inicio = time.perf_counter()
+    escalar = [Geocoder.haversine_distance(CENTRO_MENDOZA, (lat, lon)) for _, lat, lon in puntos]
+    t_escalar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    vectorizado = Geocoder.haversine_many(CENTRO_MENDOZA, lats, lons)
+    t_vectorizado = time.perf_counter() - inicio
+
+    assert np.allclose(vectorizado, escalar, rtol=0, atol=1e-9)
+    assert int(np.argmin(vectorizado)) == int(np.argmin(escalar))
+    assert Geocoder.haversine_many(CENTRO_MENDOZA, np.array([CENTRO_MENDOZA[0]]), np.array([CENTRO_MENDOZA[1]]))[0] == 0
+
+    matriz = Geocoder.haversine_matrix(lats[:50], lons[:50], lats[:80], lons[:80])
+    assert matriz.shape == (50, 80)
+    assert np.allclose(matriz[7], Geocoder.haversine_many((lats[7], lons[7]), lats[:80], lons[:80]))
+    assert np.allclose(np.diag(matriz[:, :50]), 0)
+    print(f"✅ Haversine vectorizado: {t_escalar*1000:.0f} ms → {t_vectorizado*1000:.1f} ms (100k puntos)")
+
+
+def test_radio_igual_a_busqueda_lineal():
+    """Las consultas por radio devuelven exactamente lo mismo que el recorrido completo"""
+    puntos = puntos_aleatorios(20000)
+    indice = SpatialIndex(puntos)
+
+    for origen, radio in [(CENTRO_MENDOZA, 0.5), (CENTRO_MENDOZA, 5.0), ((-33.1, -68.6), 12.0),
+                          ((-32.0, -68.0), 3.0), (CENTRO_MENDOZA, 200.0)]:
+        esperado = [c for _, c in lineal(puntos, origen, radio)]
+        obtenido = [c for c, _ in indice.consultar_radio(origen[0], origen[1], radio)]
+        assert obtenido == esperado, (origen, radio)
+    print("✅ Consultas por radio idénticas a la búsqueda lineal")
+
+
+def test_k_vecinos():
+    """Los k vecinos coinciden con los k primeros del recorrido completo"""
+    puntos = puntos_aleatorios(5000, semilla=11)
+    indice = SpatialIndex(puntos)
+
+    for origen in [CENTRO_MENDOZA, (-32.6, -69.1), (-34.0, -70.0)]:
+        esperado = [c for _, c in lineal(puntos, origen, float("inf"))[:15]]
+        obtenido = [c for c, _ in indice.k_vecinos(origen[0], origen[1], 15)]
+        assert obtenido == esperado, origen
+
+    assert indice.k_vecinos(-34.0, -70.0, 5, max_km=10) == []
+    print("✅ k vecinos idénticos a la búsqueda lineal")
+
+
+def test_cache_real():
+    """El índice se construye desde data/coordenadas_cache.json"""
+    with open("data/coordenadas_cache.json", "r", encoding="utf-8") as f:
+        cache = json.load(f)
+    indice = SpatialIndex.desde_cache(cache)
+
+    assert len(indice) == len(cache)
+    resultados = indice.consultar_radio(CENTRO_MENDOZA[0], CENTRO_MENDOZA[1], 50)
+    assert all(idx in cache for idx, _ in resultados)
+    print(f"✅ Caché real indexado: {len(resultados)} propiedades a menos de 50 km del centro")
+
+
+def test_candidatos_revisados():
+    """Con 200k puntos una consulta de 2 km revisa solo unas pocas celdas"""
+    puntos = puntos_aleatorios(200000, semilla=3)
+    indice = SpatialIndex(puntos)
+    revisados = []
+    distancias = indice._distancias
+
+    def contar(origen, posiciones):
+        revisados.append(len(posiciones))
+        return distancias(origen, posiciones)
+
+    indice._distancias = contar
+    obtenido = [c for c, _ in indice.consultar_radio(CENTRO_MENDOZA[0], CENTRO_MENDOZA[1], 2.0)]
+
+    assert obtenido == [c for _, c in lineal(puntos, CENTRO_MENDOZA, 2.0)]
+    assert revisados[0] < len(puntos) / 100
+    print(f"✅ 200k puntos: la consulta de 2 km revisa {revisados[0]} candidatos para {len(obtenido)} resultados")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DEL ÍNDICE ESPACIAL\n")
+
+    test_haversine_vectorizado()
+    test_radio_igual_a_busqueda_lineal()
+    test_k_vecinos()
+    test_cache_real()
+    test_candidatos_revisados()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
@@ -0,0 +1,161 @@
+"""
+Test: Sub-scores de amenidades y transporte materializados (Neo4j + caché local)
+No requiere Neo4j: usa un conector falso que guarda las propiedades en memoria
+"""
+
+import os
+import tempfile
+from database.score_materializer import (
+    EXPORT_SCORES_QUERY, STALE_SCORES_QUERY, PropertyScoreMaterializer,
+)
+from models.housing_frames import (
+    AMENIDADES_PESOS, BloquePropiedades, UserFrame, calcular_score_propiedad, calcular_scores_propiedades,
+)
+
+
+class SesionFalsa:
+    def __init__(self, nodos):
+        self.nodos = nodos
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def run(self, query, signature=None):
+        if query == STALE_SCORES_QUERY:
+            return [{'name': nombre, 'amenities': [dict(a) for a in nodo['amenities']]}
+                    for nombre, nodo in self.nodos.items() if nodo.get('score_signature') != signature]
+        if query == EXPORT_SCORES_QUERY:
+            return [dict(nodo, name=nombre) for nombre, nodo in self.nodos.items()
+                    if nodo.get('score_signature') == signature]
+        raise AssertionError(query)
+
+
+class ConnectorFalso:
+    def __init__(self, nodos):
+        self.nodos = nodos
+        self.escritas = 0
+
+    def is_connected(self):
+        return True
+
+    def get_session(self):
+        return SesionFalsa(self.nodos)
+
+    def write_in_batches(self, query, rows, batch_size=500, label="filas"):
+        for row in rows:
+            nodo = self.nodos[row['name']]
+            nodo.update({k: v for k, v in row.items() if k != 'name'})
+        self.escritas += len(rows)
+        return {'written': len(rows), 'failed': 0, 'failed_batches': []}
+
+
+def grafo():
+    return {
+        'Casa Parque': {'price': 140000, 'rooms': 3, 'amenities': [
+            {'type': 'parque', 'distance': 300}, {'type': 'hospital', 'distance': 2500},
+            {'type': 'bus_stop', 'distance': 250}]},
+        'Depto Centro': {'price': 90000, 'rooms': 1, 'amenities': [
+            {'type': 'supermercado', 'distance': 900}, {'type': 'transporte', 'distance': 1200}]},
+        'Loft Sin Nada': {'price': 200000, 'rooms': 2, 'amenities': []},
+    }
+
+
+def propiedad(nombre, nodo, con_amenidades=True):
+    datos = {'name': nombre, 'price': nodo['price'], 'rooms': nodo['rooms']}
+    if con_amenidades:
+        datos['nearby_amenities'] = nodo['amenities']
+    return datos
+
+
+def test_refresco_incremental():
+    nodos = grafo()
+    connector = ConnectorFalso(nodos)
+    with tempfile.TemporaryDirectory() as carpeta:
+        materializador = PropertyScoreMaterializer(lambda: connector, os.path.join(carpeta, 'scores.json'))
+
+        assert materializador.refresh()['written'] == 3
+        assert materializador.refresh()['stale'] == 0
+
+        # Reescribir una propiedad (PROPERTY_QUERY quita la firma) vence solo esa
+        del nodos['Depto Centro']['score_signature']
+        assert materializador.refresh()['written'] == 1
+
+        # Cambiar los pesos vence todas
+        AMENIDADES_PESOS['parque'] += 0.1
+        try:
+            assert materializador.refresh()['written'] == 3
+        finally:
+            AMENIDADES_PESOS['parque'] -= 0.1
+        assert materializador.refresh()['written'] == 3
+        assert connector.escritas == 10
+    print("✅ Solo se recalculan los sub-scores vencidos")
+
+
+def test_score_igual_con_materializados():
+    """Puntuar con sub-scores materializados da lo mismo que recorrer las amenidades"""
+    nodos = grafo()
+    connector = ConnectorFalso(nodos)
+    usuario = UserFrame(name="Ana", budget=150000, min_rooms=2)
+    with tempfile.TemporaryDirectory() as carpeta:
+        PropertyScoreMaterializer(lambda: connector, os.path.join(carpeta, 'scores.json')).refresh()
+
+        for nombre, nodo in nodos.items():
+            completa = propiedad(nombre, nodo)
+            materializada = dict(propiedad(nombre, nodo, con_amenidades=False),
+                                 **{k: nodo.get(k) for k in ('amenity_score', 'amenity_count',
+                                                             'transport_score', 'score_signature')})
+            assert abs(calcular_score_propiedad(completa, usuario) -
+                       calcular_score_propiedad(materializada, usuario)) < 1e-12, nombre
+
+            # Transporte: la parada más cercana evaluada en todos los modos, materializada o no
+            con_transporte = calcular_score_propiedad(materializada, usuario, incluir_transporte=True)
+            assert abs(con_transporte -
+                       calcular_score_propiedad(completa, usuario, incluir_transporte=True)) < 1e-12, nombre
+
+            lote = BloquePropiedades.desde_dicts([materializada, completa])
+            scores = calcular_scores_propiedades(lote, usuario, incluir_transporte=True)
+            assert abs(scores[0] - con_transporte) < 1e-12
+            assert abs(scores[1] - con_transporte) < 1e-12
+    print("✅ Scores idénticos con y sin sub-scores materializados")
+
+
+def test_cache_local():
+    nodos = grafo()
+    connector = ConnectorFalso(nodos)
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, 'scores.json')
+        PropertyScoreMaterializer(lambda: connector, ruta).refresh()
+
+        # Otro proceso lee el caché sin Neo4j
+        lector = PropertyScoreMaterializer(lambda: None, ruta)
+        propiedades = [propiedad(n, nodo, con_amenidades=False) for n, nodo in nodos.items()]
+        assert lector.apply_local_scores(propiedades) == 3
+        assert propiedades[0]['amenity_score'] == nodos['Casa Parque']['amenity_score']
+
+        # Amenidades distintas a las usadas al materializar: no se aplica
+        cambiada = propiedad('Casa Parque', nodos['Casa Parque'])
+        cambiada['nearby_amenities'] = [{'type': 'parque', 'distance': 50}]
+        assert lector.apply_local_scores([cambiada]) == 0
+
+        # Con otros pesos el caché completo queda vencido
+        AMENIDADES_PESOS['hospital'] -= 0.2
+        try:
+            assert lector.load_local_cache() == {}
+        finally:
+            AMENIDADES_PESOS['hospital'] += 0.2
+    print("✅ Caché local de sub-scores con invalidación")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DE SUB-SCORES MATERIALIZADOS\n")
+
+    test_refresco_incremental()
+    test_score_igual_con_materializados()
+    test_cache_local()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
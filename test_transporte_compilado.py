@@ -0,0 +1,97 @@
+"""
+Test: Evaluador de transporte precompilado (evaluate_many) contra TransportAccessibilityEvaluator
+No requiere Neo4j
+"""
+
+import numpy as np
+from fuzzy.transport_evaluation import (
+    CLASSIFICATIONS, CompiledTransportEvaluator, TransportAccessibilityEvaluator, TransportType,
+)
+
+MODOS = list(TransportType)
+
+
+def distancias_de_prueba(n=5000, semilla=0):
+    """Distancias aleatorias más todos los límites de rango (donde cambia la clasificación)"""
+    rnd = np.random.default_rng(semilla)
+    bordes = [0, 200, 300, 500, 800, 1000, 1500, 2000, 3000, 5000, 8000, 15000]
+    return np.concatenate([rnd.uniform(0, 20000, n), bordes])
+
+
+def test_igual_a_evaluate_accessibility():
+    evaluador = TransportAccessibilityEvaluator()
+    compilado = CompiledTransportEvaluator(evaluador)
+    distancias = distancias_de_prueba()
+
+    for modo in MODOS:
+        resultado = compilado.evaluate_many(distancias, modo)
+        for i, distancia in enumerate(distancias.tolist()):
+            esperado = evaluador.evaluate_accessibility(distancia, modo)
+            obtenido = compilado.to_dict(resultado[i])
+            assert obtenido['classification'] == esperado['classification'], (modo, distancia)
+            assert obtenido['accessibility_score'] == esperado['accessibility_score']
+            assert obtenido['transport_mode'] == esperado['transport_mode']
+            assert abs(obtenido['estimated_time_minutes'] - esperado['estimated_time_minutes']) < 0.051
+            assert abs(obtenido['distance_km'] - esperado['distance_km']) < 0.0051
+            for label in CLASSIFICATIONS:
+                assert np.isclose(obtenido['fuzzy_memberships'][label], esperado['fuzzy_memberships'][label])
+    print("✅ evaluate_many coincide con evaluate_accessibility en los 4 modos")
+
+
+def test_modos_por_elemento():
+    """Un modo distinto por distancia y broadcasting distancias × modos"""
+    compilado = CompiledTransportEvaluator()
+    distancias = distancias_de_prueba(200)
+    modos = [MODOS[i % 4] for i in range(len(distancias))]
+
+    por_elemento = compilado.evaluate_many(distancias, modos)
+    for modo in MODOS:
+        mascara = np.array([m is modo for m in modos])
+        assert np.array_equal(por_elemento[mascara], compilado.evaluate_many(distancias[mascara], modo))
+
+    matriz = compilado.evaluate_many(distancias[:, None], MODOS)
+    assert matriz.shape == (len(distancias), 4)
+    print("✅ Modos por elemento y matriz distancias × modos")
+
+
+def test_best_modes():
+    evaluador = TransportAccessibilityEvaluator()
+    compilado = CompiledTransportEvaluator(evaluador)
+    distancias = distancias_de_prueba(1000)
+    disponibles = [TransportType.WALK, TransportType.BUS, TransportType.BIKE]
+
+    mejores = compilado.best_modes(distancias, disponibles)
+    for distancia, mejor in zip(distancias.tolist(), mejores.tolist()):
+        esperado = evaluador.compare_accessibility_modes(distancia, disponibles)['best_transport']
+        assert disponibles[mejor].value == esperado, distancia
+    print("✅ best_modes coincide con compare_accessibility_modes")
+
+
+def test_lote_grande():
+    """50k pares distancia/modo en una llamada, con el mismo resultado que de a uno"""
+    evaluador = TransportAccessibilityEvaluator()
+    compilado = CompiledTransportEvaluator(evaluador)
+    distancias = distancias_de_prueba(50000)
+    modos = [MODOS[i % 4] for i in range(len(distancias))]
+
+    resultado = compilado.evaluate_many(distancias, modos)
+    assert resultado.shape == distancias.shape
+    for i, (distancia, modo) in enumerate(zip(distancias.tolist(), modos)):
+        esperado = evaluador.evaluate_accessibility(distancia, modo)
+        obtenido = compilado.to_dict(resultado[i])
+        assert obtenido['classification'] == esperado['classification'], (modo, distancia)
+        assert obtenido['accessibility_score'] == esperado['accessibility_score']
+    print(f"✅ {len(distancias)} pares distancia/modo evaluados en una llamada")
+
+
+if __name__ == "__main__":
+    print("\n🧪 PRUEBA DEL EVALUADOR DE TRANSPORTE PRECOMPILADO\n")
+
+    test_igual_a_evaluate_accessibility()
+    test_modos_por_elemento()
+    test_best_modes()
+    test_lote_grande()
+
+    print("\n" + "="*60)
+    print("✅ PRUEBAS COMPLETADAS")
+    print("="*60)
@@ -9,23 +9,46 @@ import webbrowser
 import json
 import os
 from workflow.langgraph_workflow import ejecutar_consulta, LANGCHAIN_DISPONIBLE
-from database.neo4j_connector import Neo4jConnector
+from workflow.langchain_integration import stream_answer_markdown
+from workflow.query_parser import es_recomendacion
+from database.neo4j_connector import get_connector
+from database.stats_service import get_stats_service
 from geocoding.geocoder import Geocoder
 from geocoding.map_generator import MapGenerator
+from geocoding.spatial_index import SpatialIndex
+from geocoding.coordinates_store import CoordinatesStore
 
 # Cargar caché de coordenadas al inicio (solo una vez)
 CACHE_COORDENADAS = None
+INDICE_ESPACIAL = None
 def cargar_cache_coordenadas():
-    """Carga el caché de coordenadas pre-calculadas"""
-    global CACHE_COORDENADAS
+    """
+    Carga el caché de coordenadas pre-calculadas y construye su índice espacial
+    
+    Usa el formato columnar (data/coordenadas/, memory-mapped) si existe y no es
+    más viejo que el JSON; si no, parsea data/coordenadas_cache.json.
+    """
+    global CACHE_COORDENADAS, INDICE_ESPACIAL
     if CACHE_COORDENADAS is None:
         cache_file = 'data/coordenadas_cache.json'
-        if os.path.exists(cache_file):
+        store_dir = 'data/coordenadas'
+        store_vigente = CoordinatesStore.existe(store_dir) and (
+            not os.path.exists(cache_file)
+            or os.path.getmtime(os.path.join(store_dir, 'meta.json')) >= os.path.getmtime(cache_file)
+        )
+        if store_vigente:
+            CACHE_COORDENADAS = CoordinatesStore(store_dir)
+            INDICE_ESPACIAL = SpatialIndex.desde_cache(CACHE_COORDENADAS)
+            print(f"✅ Caché de coordenadas (columnar) cargado: {len(CACHE_COORDENADAS)} propiedades")
+        elif os.path.exists(cache_file):
             with open(cache_file, 'r', encoding='utf-8') as f:
                 CACHE_COORDENADAS = json.load(f)
+            INDICE_ESPACIAL = SpatialIndex.desde_cache(CACHE_COORDENADAS)
             print(f"✅ Caché de coordenadas cargado: {len(CACHE_COORDENADAS)} propiedades")
+            print("   💡 Para un arranque más rápido: python generar_coordenadas_cache.py --convertir")
         else:
             CACHE_COORDENADAS = {}
+            INDICE_ESPACIAL = SpatialIndex()
             print(f"⚠️  Caché no encontrado: {cache_file}")
             print(f"   Ejecuta: python generar_coordenadas_cache.py")
     return CACHE_COORDENADAS
@@ -35,12 +58,11 @@ usuario_actual = None
 
 def obtener_usuarios():
     """Obtiene lista de usuarios existentes desde Neo4j"""
-    connector = Neo4jConnector()
+    connector = get_connector()
     try:
         with connector.get_session() as session:
             result = session.run("MATCH (u:User) RETURN u.name AS nombre ORDER BY nombre")
             usuarios = [record['nombre'] for record in result]
-        connector.close()
         return usuarios
     except:
         return []
@@ -53,7 +75,7 @@ def crear_usuario(nombre: str):
         return "⚠️ Por favor ingresa un nombre", obtener_usuarios(), None
     
     nombre = nombre.strip()
-    connector = Neo4jConnector()
+    connector = get_connector()
     
     try:
         with connector.get_session() as session:
@@ -75,7 +97,6 @@ def crear_usuario(nombre: str):
             
             session.execute_write(create_user_tx, nombre)
         
-        connector.close()
         usuario_actual = nombre
         return f"✅ Usuario '{nombre}' creado exitosamente!\n\n🎯 Ahora eres: **{nombre}**", obtener_usuarios(), nombre
     
@@ -97,7 +118,7 @@ def registrar_click_propiedad(usuario: str, nombre_propiedad: str):
     if not usuario or not nombre_propiedad:
         return "⚠️ Selecciona un usuario y una propiedad"
     
-    connector = Neo4jConnector()
+    connector = get_connector()
     try:
         with connector.get_session() as session:
             def click_tx(tx, usuario, prop_nombre):
@@ -107,7 +128,7 @@ def registrar_click_propiedad(usuario: str, nombre_propiedad: str):
                 tx.run("""
                     MATCH (u:User {name: $usuario})
                     MATCH (p:Property)
-                    WHERE p.name CONTAINS $prop_nombre OR p.name = $prop_nombre
+                    WHERE coalesce(p.active, true) AND (p.name CONTAINS $prop_nombre OR p.name = $prop_nombre)
                     MERGE (u)-[c:CLICKED]->(p)
                     ON CREATE SET c.timestamp = datetime(), c.count = 1
                     ON MATCH SET c.timestamp = datetime(), c.count = c.count + 1
@@ -115,12 +136,10 @@ def registrar_click_propiedad(usuario: str, nombre_propiedad: str):
                 """, usuario=usuario, prop_nombre=prop_base)
             
             result = session.execute_write(click_tx, usuario, nombre_propiedad)
-            connector.close()
             
             return f"✅ Click registrado: {nombre_propiedad}\n\n💡 El sistema aprenderá de tus preferencias en 60 segundos"
     
     except Exception as e:
-        connector.close()
         return f"❌ Error: {e}"
 
 def buscar_propiedades_cercanas(pregunta: str, usuario: str):
@@ -199,32 +218,23 @@ def buscar_propiedades_cercanas(pregunta: str, usuario: str):
                 ""
             )
         
-        # 3. Filtrar propiedades por distancia (RÁPIDO - sin llamadas API)
-        propiedades_cercanas = []
-        
-        print(f"📊 Analizando {len(cache)} propiedades desde caché...")
+        # 3. Filtrar propiedades por distancia (índice espacial: solo celdas dentro del radio)
+        print(f"📊 Buscando en {len(cache)} propiedades desde caché...")
         
-        for idx, prop_data in cache.items():
-            prop_coords = (prop_data['lat'], prop_data['lon'])
-            
-            # Calcular distancia
-            distancia = geocoder.haversine_distance(poi_coords, prop_coords)
-            
-            if distancia <= max_distancia_km:
-                propiedades_cercanas.append({
-                    'nombre': f"Propiedad #{idx}",
-                    'precio': prop_data['precio'],
-                    'habitaciones': prop_data['habitaciones'],
-                    'ubicacion': prop_data['ubicacion'],
-                    'tipo': prop_data['tipo'],
-                    'ambientes': prop_data.get('ambientes', 1),
-                    'lat': prop_data['lat'],  # Para MapGenerator
-                    'lon': prop_data['lon'],  # Para MapGenerator
-                    'distance_km': distancia  # Para MapGenerator
-                })
-        
-        # Ordenar por distancia
-        propiedades_cercanas.sort(key=lambda x: x['distance_km'])
+        propiedades_cercanas = []
+        for idx, distancia in INDICE_ESPACIAL.consultar_radio(poi_coords[0], poi_coords[1], max_distancia_km):
+            prop_data = cache[idx]
+            propiedades_cercanas.append({
+                'nombre': f"Propiedad #{idx}",
+                'precio': prop_data['precio'],
+                'habitaciones': prop_data['habitaciones'],
+                'ubicacion': prop_data['ubicacion'],
+                'tipo': prop_data['tipo'],
+                'ambientes': prop_data.get('ambientes', 1),
+                'lat': prop_data['lat'],  # Para MapGenerator
+                'lon': prop_data['lon'],  # Para MapGenerator
+                'distance_km': distancia  # Para MapGenerator (ya ordenadas por distancia)
+            })
         
         if not propiedades_cercanas:
             return (
@@ -245,7 +255,7 @@ def buscar_propiedades_cercanas(pregunta: str, usuario: str):
         webbrowser.open(f"file:///{mapa_path}")
         
         # 6. Registrar interacciones en Neo4j (VIEWED para las top 10)
-        connector = Neo4jConnector()
+        connector = get_connector()
         try:
             with connector.get_session() as session:
                 for prop in propiedades_cercanas[:10]:
@@ -269,8 +279,6 @@ def buscar_propiedades_cercanas(pregunta: str, usuario: str):
                 """, usuario=usuario)
         except:
             pass
-        finally:
-            connector.close()
         
         # 7. Crear respuesta
         respuesta = f"## 🗺️ Propiedades cerca de: **{poi_nombre}**\n\n"
@@ -313,77 +321,79 @@ def buscar_propiedades_cercanas(pregunta: str, usuario: str):
             f"**Error técnico:** {type(e).__name__}\n{str(e)}"
         )
 
+def registrar_busqueda(usuario: str, pregunta: str):
+    """Registra la búsqueda en Neo4j (para que los demonios aprendan)"""
+    try:
+        get_connector().record_search(usuario, pregunta)
+    except:
+        pass
+
 def procesar_consulta(pregunta: str, usuario: str, mostrar_detalles: bool = True):
     """
-    Procesa consulta del usuario y retorna respuesta + explicación
+    Procesa consulta del usuario y va mostrando respuesta + explicación
+    
+    Es un generador: Gradio actualiza la pantalla con cada etapa (intención,
+    Cypher, primeras filas y la respuesta del LLM a medida que la escribe) en
+    lugar de esperar a que termine toda la cadena. Solo los pedidos de
+    recomendación esperan al flujo con LangGraph, que puntúa para el usuario y
+    guarda sus preferencias.
     
     Args:
         pregunta: Pregunta en lenguaje natural
         usuario: Nombre del usuario actual
         mostrar_detalles: Si mostrar explicación técnica
     
-    Returns:
+    Yields:
         tuple: (respuesta, explicacion)
     """
     
     if not usuario or usuario.strip() == "":
-        return "⚠️ Primero selecciona o crea un usuario arriba ⬆️", ""
+        yield "⚠️ Primero selecciona o crea un usuario arriba ⬆️", ""
+        return
     
     if not pregunta or pregunta.strip() == "":
-        return "⚠️ Por favor ingresa una consulta", ""
+        yield "⚠️ Por favor ingresa una consulta", ""
+        return
+    
+    def con_usuario(explicacion):
+        if not mostrar_detalles:
+            return ""
+        return f"👤 **Usuario activo:** {usuario}\n\n" + explicacion if explicacion else explicacion
+    
+    yield "⏳ Analizando consulta...", ""
     
     try:
         # PRIMERO: Detectar si es búsqueda de proximidad (mapas)
         resultado_proximidad = buscar_propiedades_cercanas(pregunta, usuario)
         if resultado_proximidad:
             respuesta, explicacion = resultado_proximidad
-            if not mostrar_detalles:
-                explicacion = ""
-            elif explicacion:
-                explicacion = f"👤 **Usuario activo:** {usuario}\n\n" + explicacion
-            return respuesta, explicacion
+            yield respuesta, con_usuario(explicacion)
+            return
         
-        # SEGUNDO: Flujo normal con LangGraph
-        resultado = ejecutar_consulta(pregunta, usuario=usuario)
-        
-        # Registrar la búsqueda en Neo4j (para que los demonios aprendan)
-        connector = Neo4jConnector()
-        try:
-            with connector.get_session() as session:
-                def register_search_tx(tx, usuario, pregunta):
-                    tx.run("""
-                        MATCH (u:User {name: $usuario})
-                        CREATE (u)-[:SEARCHED {
-                            query: $pregunta,
-                            timestamp: datetime()
-                        }]->(:SearchQuery {text: $pregunta})
-                    """, usuario=usuario, pregunta=pregunta)
-                
-                session.execute_write(register_search_tx, usuario, pregunta)
-        except:
-            pass
-        finally:
-            connector.close()
-        
-        respuesta = resultado.get("respuesta", "❌ No se pudo procesar la consulta")
-        explicacion = resultado.get("explicacion", "") if mostrar_detalles else ""
-        
-        # Agregar info del usuario a la explicación
-        if explicacion and mostrar_detalles:
-            explicacion = f"👤 **Usuario activo:** {usuario}\n\n" + explicacion
+        # SEGUNDO: Recomendaciones con lógica difusa (flujo con LangGraph)
+        if es_recomendacion(pregunta) or not LANGCHAIN_DISPONIBLE:
+            yield "⏳ Buscando y evaluando propiedades para tu perfil...", ""
+            resultado = ejecutar_consulta(pregunta, usuario=usuario)
+            registrar_busqueda(usuario, pregunta)
+            
+            respuesta = resultado.get("respuesta", "❌ No se pudo procesar la consulta")
+            yield respuesta, con_usuario(resultado.get("explicacion", ""))
+            return
         
-        return respuesta, explicacion
+        # TERCERO: Búsquedas y preguntas libres, por etapas (parser, caché o LLM token a token)
+        for respuesta, explicacion in stream_answer_markdown(pregunta):
+            yield respuesta, con_usuario(explicacion)
+        registrar_busqueda(usuario, pregunta)
     
     except Exception as e:
-        return f"❌ Error: {e}", f"Tipo de error: {type(e).__name__}"
+        yield f"❌ Error: {e}", f"Tipo de error: {type(e).__name__}"
 
 def verificar_conexion():
     """Verifica estado de conexión a Neo4j"""
-    connector = Neo4jConnector()
+    connector = get_connector()
     
-    if connector.is_connected():
-        stats = connector.get_database_stats()
-        connector.close()
+    if connector.is_alive():
+        stats = get_stats_service().get()
         
         return (
             f"✅ **Conectado a Neo4j**\n\n"
@@ -11,47 +11,65 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import gradio as gr
 from workflow.langgraph_workflow import ejecutar_consulta, LANGCHAIN_DISPONIBLE
-from database.neo4j_connector import Neo4jConnector
+from workflow.langchain_integration import stream_answer_markdown
+from workflow.query_parser import es_recomendacion
+from database.neo4j_connector import get_connector
+from database.stats_service import get_stats_service
 
 def procesar_consulta(pregunta: str, usuario_seleccionado: str, mostrar_detalles: bool = True):
-    """Procesa consulta - USA LANGCHAIN DIRECTAMENTE con Ollama"""
+    """Procesa consulta - USA LANGCHAIN DIRECTAMENTE con Ollama, mostrando cada etapa apenas está lista"""
     
     if not pregunta or pregunta.strip() == "":
-        return "⚠️ Por favor ingresa una consulta", ""
+        yield "⚠️ Por favor ingresa una consulta", ""
+        return
     
     print(f"\n{'='*60}")
     print(f"🔍 PROCESANDO: {pregunta}")
     print(f"{'='*60}\n")
     
+    yield "⏳ Analizando consulta...", ""
+    
     try:
-        # Usar el flujo completo que guarda preferencias en Neo4j
         print(f"👤 Usuario: {usuario_seleccionado}")
-        print("⏳ Procesando consulta con IA y guardando preferencias...")
-        
-        resultado = ejecutar_consulta(pregunta, usuario=usuario_seleccionado)
-        
-        respuesta = resultado.get("respuesta", "No hay respuesta disponible")
-        explicacion = resultado.get("explicacion", "")
         
-        if mostrar_detalles:
-            explicacion += f"\n\n👤 **Preferencias guardadas para:** {usuario_seleccionado}"
+        # Recomendaciones: flujo completo que puntúa y guarda preferencias en Neo4j
+        if es_recomendacion(pregunta) or not LANGCHAIN_DISPONIBLE:
+            print("⏳ Procesando consulta con IA y guardando preferencias...")
+            yield "⏳ Buscando y evaluando propiedades para tu perfil...", ""
+            resultado = ejecutar_consulta(pregunta, usuario=usuario_seleccionado)
+            
+            respuesta = resultado.get("respuesta", "No hay respuesta disponible")
+            explicacion = resultado.get("explicacion", "")
+            
+            if mostrar_detalles:
+                explicacion += f"\n\n👤 **Preferencias guardadas para:** {usuario_seleccionado}"
+            
+            print("✅ Respuesta generada exitosamente\n")
+            yield respuesta, explicacion
+            return
         
-        print(f"✅ Respuesta generada exitosamente\n")
-        return respuesta, explicacion
+        # Búsquedas y preguntas libres, por etapas (parser, caché o LLM token a token)
+        for respuesta, explicacion in stream_answer_markdown(pregunta):
+            yield respuesta, explicacion if mostrar_detalles else ""
+        # Registrar la búsqueda en Neo4j (para que los demonios aprendan)
+        try:
+            get_connector().record_search(usuario_seleccionado, pregunta)
+        except Exception:
+            pass
+        print("✅ Respuesta generada exitosamente\n")
     
     except Exception as e:
         print(f"❌ EXCEPCIÓN: {e}\n")
         import traceback
         traceback.print_exc()
-        return f"❌ **Error técnico:**\n\n{str(e)}\n\n💡 **Posibles causas:**\n• Ollama no está corriendo\n• Neo4j no está activo\n• Error de conexión", f"**Tipo de error:** `{type(e).__name__}`"
+        yield f"❌ **Error técnico:**\n\n{str(e)}\n\n💡 **Posibles causas:**\n• Ollama no está corriendo\n• Neo4j no está activo\n• Error de conexión", f"**Tipo de error:** `{type(e).__name__}`"
 
 def verificar_conexion():
     """Verifica estado de conexión a Neo4j"""
-    connector = Neo4jConnector()
+    connector = get_connector()
     
-    if connector.is_connected():
-        stats = connector.get_database_stats()
-        connector.close()
+    if connector.is_alive():
+        stats = get_stats_service().get()
         
         return (
             f"✅ **Conectado a Neo4j**\n\n"
@@ -0,0 +1,144 @@
+"""
+Respuestas armadas desde las filas - Sistema de Recomendación de Viviendas
+Evita la segunda llamada al LLM de GraphCypherQAChain (la que redacta la respuesta).
+
+Para una búsqueda de propiedades la respuesta es la lista de filas que devolvió
+el Cypher (p.name, p.price, p.rooms, a.city, a.neighborhood), y para un conteo
+es un número: redactarlas con el LLM tarda tanto como generar el Cypher y no
+agrega información. renderizar_respuesta() las arma directamente con el mismo
+formato que las respuestas del parser, y devuelve None cuando hace falta el LLM:
+
+- la pregunta es abierta ("¿por qué...?", "compará...", "¿conviene...?")
+- el resultado tiene columnas que no sabe presentar
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional
+from workflow.query_parser import normalizar_texto
+
+# Preguntas que piden una explicación u opinión, no un listado
+PREGUNTA_ABIERTA = re.compile(
+    r'\b(por que|porque|explica\w*|compar\w*|conviene\w*|opin\w*|recomend\w*|recomiend\w*|'
+    r'mejor|mejores|peor|peores|diferencia\w*|describ\w*|resum\w*|vale la pena|analiz\w*|que tal|'
+    r'como es|como son|ventajas?|desventajas?)\b'
+)
+
+PALABRAS_PROPIEDAD = re.compile(r'\b(propiedad\w*|casas?|departamentos?|deptos?|inmuebles?|viviendas?|lofts?|duplex)\b')
+
+
+def _dinero(valor: Any) -> str:
+    return f"${valor:,.0f}" if isinstance(valor, (int, float)) else str(valor)
+
+
+def _lugar(valor: Any) -> str:
+    return str(valor).title()
+
+
+# Columna (sin prefijo de variable) → cómo se muestra su valor
+CAMPOS: Dict[str, Callable[[Any], str]] = {
+    'name': str,
+    'price': _dinero,
+    'rooms': lambda v: f"{v} ambientes",
+    'bedrooms': lambda v: f"{v} dormitorios",
+    'bathrooms': lambda v: f"{v} baños",
+    'area': lambda v: f"{v:g} m²" if isinstance(v, (int, float)) else f"{v} m²",
+    'property_type': _lugar,
+    'city': _lugar,
+    'neighborhood': _lugar,
+    'location': str,
+    'street': str,
+    'url': str,
+    'amenity_type': str,
+    'distance': lambda v: f"a {v:,.0f} m" if isinstance(v, (int, float)) else f"a {v} m",
+}
+
+AGREGADO = re.compile(r'^(count|avg|sum|min|max)\(|^(total|cantidad|promedio|minimo|maximo)(_\w+)?$', re.IGNORECASE)
+
+
+def es_pregunta_abierta(pregunta: str) -> bool:
+    """Indica si la pregunta pide una explicación u opinión (la responde el LLM)"""
+    return bool(PREGUNTA_ABIERTA.search(normalizar_texto(pregunta)))
+
+
+def _aplanar(fila: Dict[str, Any]) -> Dict[str, Any]:
+    """Quita el prefijo de variable ('p.price' → 'price') y abre los nodos devueltos enteros"""
+    plana: Dict[str, Any] = {}
+    for clave, valor in fila.items():
+        if isinstance(valor, dict):
+            plana.update(valor)
+        elif AGREGADO.search(clave):
+            plana[clave] = valor
+        else:
+            plana[clave.split('.')[-1]] = valor
+    return plana
+
+
+SINGULAR = {'propiedades': 'propiedad', 'resultados': 'resultado'}
+
+
+def _cantidad(n: Any, sustantivo: str) -> str:
+    """'1 propiedad', '12 propiedades'"""
+    return f"{n:,.0f} {SINGULAR[sustantivo] if n == 1 else sustantivo}"
+
+
+def _agregado(clave: str, valor: Any, sustantivo: str) -> str:
+    if not isinstance(valor, (int, float)):
+        return str(valor)
+    if clave.lower().startswith('count(') or clave.lower().startswith(('total', 'cantidad')):
+        return _cantidad(valor, sustantivo)
+    if 'price' in clave.lower() or 'precio' in clave.lower():
+        return _dinero(valor)
+    return f"{valor:,.2f}".rstrip('0').rstrip('.')
+
+
+def renderizar_respuesta(pregunta: str, filas: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Arma la respuesta directamente desde las filas del Cypher
+
+    Args:
+        pregunta: Pregunta original
+        filas: Filas devueltas por Neo4jGraph.query
+
+    Returns:
+        str: Respuesta en texto, o None si la pregunta necesita que el LLM la redacte
+    """
+    if es_pregunta_abierta(pregunta):
+        return None
+    if not filas:
+        return "No encontré propiedades que cumplan con todos los criterios."
+
+    filas = [_aplanar(fila) for fila in filas]
+    columnas = list(filas[0].keys())
+    agregados = [c for c in columnas if AGREGADO.search(c)]
+    if any(c not in CAMPOS and c not in agregados for c in columnas):
+        return None
+
+    sustantivo = "propiedades" if PALABRAS_PROPIEDAD.search(normalizar_texto(pregunta)) else "resultados"
+
+    # Conteo o promedio sueltos
+    if len(filas) == 1 and columnas == agregados:
+        valores = [_agregado(c, filas[0][c], sustantivo) for c in columnas]
+        if len(columnas) == 1 and columnas[0].lower().startswith(('count(', 'total', 'cantidad')):
+            return f"Hay {valores[0]}."
+        return "\n".join(f"{c}: {v}" for c, v in zip(columnas, valores))
+
+    lineas = []
+    for i, fila in enumerate(filas, 1):
+        partes = []
+        for columna in columnas:
+            valor = fila.get(columna)
+            if valor is None or valor == '':
+                continue
+            # El barrio se carga igual a la ciudad cuando el aviso no lo trae
+            if columna == 'neighborhood' and str(valor).lower() == str(fila.get('city', '')).lower():
+                continue
+            if columna in agregados:
+                partes.append(_agregado(columna, valor, sustantivo))
+            else:
+                partes.append(CAMPOS[columna](valor))
+        lineas.append(f"{i}. " + " - ".join(partes))
+
+    if agregados:
+        return "\n".join(lineas)
+    titulo = "propiedades" if 'name' in columnas or 'price' in columnas else sustantivo
+    return f"Encontré {_cantidad(len(filas), titulo)}:\n\n" + "\n".join(lineas)
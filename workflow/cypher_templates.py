@@ -0,0 +1,203 @@
+"""
+Plantillas de Cypher parametrizadas - Sistema de Recomendación de Viviendas
+Post-procesa el Cypher que genera el LLM (después de clean_cypher_query).
+
+El LLM escribe los valores como literales (`CONTAINS "godoy cruz"`,
+`p.price < 550000`): para Neo4j cada variante es una consulta distinta que
+hay que volver a planificar, y para el caché de Cypher cada pregunta con otros
+valores es una entrada nueva. Este módulo:
+
+- parameterize_cypher(): pasa los literales a parámetros ($p0, $p1, ...), quita
+  los comentarios y normaliza espacios y palabras clave, así la misma forma de
+  consulta da siempre el mismo texto y reutiliza el plan cacheado de Neo4j
+- question_shape(): separa una pregunta en su forma ("casas en <ciudad> hasta <n>")
+  y sus valores (ciudades, barrios y números)
+- bind_template() / fill_template(): relacionan cada valor de la pregunta con
+  el parámetro de la plantilla que lo usa, para responder otra pregunta con la
+  misma forma y otros valores sin volver a llamar al LLM
+
+Una plantilla solo se reutiliza si cada valor de la pregunta corresponde a un
+único parámetro; si el LLM tradujo o repitió un valor, se cachea solo la
+pregunta exacta.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from workflow.query_parser import BARRIOS, CIUDADES, normalizar_texto
+
+# Literales de texto y números sueltos (no parte de un identificador, propiedad,
+# parámetro ni rango de longitud de relación como *1..3), y comentarios // y /* */
+LITERAL = re.compile(
+    r"""(?P<texto>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')"""
+    r"""|(?P<identificador>`[^`]*`)"""
+    r"""|(?P<comentario>//[^\n]*|/\*[\s\S]*?\*/)"""
+    r"""|(?P<numero>(?<![\w.$*])\d+(?:\.\d+)?(?![\w.]))"""
+)
+
+# Palabras clave que se escriben siempre en mayúsculas (fuera de propiedades y etiquetas).
+# Los nombres de función (count, toLower...) no: darían otro nombre a las columnas devueltas
+PALABRAS_CLAVE = (
+    'match', 'optional', 'where', 'and', 'or', 'xor', 'not', 'return', 'with', 'as', 'order', 'by',
+    'limit', 'skip', 'desc', 'asc', 'distinct', 'contains', 'starts', 'ends', 'in', 'is', 'null',
+    'unwind', 'case', 'when', 'then', 'else', 'end', 'true', 'false',
+)
+PALABRA_CLAVE = re.compile(r'(?<![\w.:$])(' + '|'.join(PALABRAS_CLAVE) + r')(?!\w)', re.IGNORECASE)
+
+# Alias declarados con AS: se dejan como los escribió el LLM aunque coincidan con una palabra clave
+ALIAS = re.compile(r'\bAS\s+(\w+)', re.IGNORECASE)
+
+ESCAPES = {'"': '"', "'": "'", '\\': '\\', 'n': '\n', 't': '\t'}
+
+# Lugares reconocidos en la pregunta: primero los nombres más largos ("lujan de cuyo" antes que "lujan")
+LUGARES = sorted([(alias, 'ciudad') for alias in CIUDADES] + [(barrio, 'barrio') for barrio in BARRIOS],
+                 key=lambda lugar: len(lugar[0]), reverse=True)
+LUGAR_O_NUMERO = re.compile(
+    r'(?<!\w)(' + '|'.join(re.escape(alias) for alias, _ in LUGARES) + r')(?!\w)|(?<![\w.])(\d+(?:\.\d+)?)(?![\w.])'
+)
+TIPO_LUGAR = dict(LUGARES)
+
+
+def _desescapar(literal: str) -> str:
+    return re.sub(r'\\(.)', lambda m: ESCAPES.get(m.group(1), m.group(1)), literal[1:-1])
+
+
+def parameterize_cypher(cypher: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Pasa los literales de un Cypher a parámetros y normaliza su forma
+
+    Args:
+        cypher: Consulta con valores literales (salida de clean_cypher_query)
+
+    Returns:
+        (plantilla, parámetros): p.ej. ('... CONTAINS $p0 AND p.price < $p1 ...',
+        {'p0': 'godoy cruz', 'p1': 550000}). Si el Cypher ya usa parámetros se
+        devuelve tal cual.
+    """
+    if '$' in cypher:
+        return cypher, {}
+
+    parametros: Dict[str, Any] = {}
+    alias = set(ALIAS.findall(LITERAL.sub('', cypher)))
+    partes = []
+    # Texto entre literales; los comentarios se quitan antes de unir las líneas
+    pendiente = ''
+    ultimo = 0
+    for literal in LITERAL.finditer(cypher):
+        if literal.group('identificador'):
+            continue
+        pendiente += cypher[ultimo:literal.start()]
+        ultimo = literal.end()
+        if literal.group('comentario'):
+            pendiente += ' '
+            continue
+        partes.append(_normalizar_forma(pendiente, alias))
+        pendiente = ''
+        nombre = f'p{len(parametros)}'
+        if literal.group('texto'):
+            parametros[nombre] = _desescapar(literal.group('texto'))
+        else:
+            numero = literal.group('numero')
+            parametros[nombre] = float(numero) if '.' in numero else int(numero)
+        partes.append('$' + nombre)
+    partes.append(_normalizar_forma(pendiente + cypher[ultimo:], alias))
+    return ''.join(partes).strip(), parametros
+
+
+def _normalizar_forma(fragmento: str, alias: set) -> str:
+    # Los identificadores entre backticks y los alias se dejan como están
+    def mayusculas(palabra: re.Match) -> str:
+        return palabra.group(1) if palabra.group(1) in alias else palabra.group(1).upper()
+
+    piezas = re.split(r'(`[^`]*`)', fragmento)
+    return ''.join(p if p.startswith('`') else PALABRA_CLAVE.sub(mayusculas, re.sub(r'\s+', ' ', p))
+                   for p in piezas)
+
+
+def question_shape(pregunta: str) -> Tuple[str, List[Tuple[str, Any]]]:
+    """
+    Separa una pregunta en su forma y sus valores
+
+    Returns:
+        (forma, valores): p.ej. ('casas en <ciudad> hasta <n>',
+        [('ciudad', 'godoy cruz'), ('n', 550000.0)])
+    """
+    valores: List[Tuple[str, Any]] = []
+
+    def reemplazar(coincidencia: re.Match) -> str:
+        if coincidencia.group(1):
+            tipo = TIPO_LUGAR[coincidencia.group(1)]
+            valores.append((tipo, coincidencia.group(1)))
+            return f'<{tipo}>'
+        valores.append(('n', float(coincidencia.group(2))))
+        return '<n>'
+
+    forma = LUGAR_O_NUMERO.sub(reemplazar, normalizar_texto(pregunta))
+    return forma, valores
+
+
+def _coincide(valor: Any, tipo: str, dato: Any) -> Optional[str]:
+    """Modo en que el parámetro `valor` usa el valor de la pregunta, o None"""
+    if tipo == 'n':
+        if isinstance(valor, (int, float)) and not isinstance(valor, bool) and float(valor) == dato:
+            return 'entero' if isinstance(valor, int) else 'decimal'
+        return None
+    if not isinstance(valor, str):
+        return None
+    texto = normalizar_texto(valor)
+    if texto == dato:
+        return 'alias'
+    if tipo == 'ciudad' and texto == CIUDADES[dato]:
+        return 'ciudad'
+    return None
+
+
+def bind_template(parametros: Dict[str, Any],
+                  valores: List[Tuple[str, Any]]) -> Optional[Dict[str, Tuple[int, str]]]:
+    """
+    Relaciona cada valor de la pregunta con el parámetro de la plantilla que lo usa
+
+    Returns:
+        {parámetro: (índice del valor, modo)}, o None si algún valor no se
+        encontró o es ambiguo (la plantilla no es reutilizable)
+    """
+    vinculos: Dict[str, Tuple[int, str]] = {}
+    usados = set()
+    for nombre, valor in parametros.items():
+        candidatos = [(i, modo) for i, (tipo, dato) in enumerate(valores)
+                      for modo in [_coincide(valor, tipo, dato)] if modo]
+        if len(candidatos) > 1:
+            return None
+        if candidatos:
+            indice = candidatos[0][0]
+            if indice in usados:
+                return None
+            usados.add(indice)
+            vinculos[nombre] = candidatos[0]
+    if len(usados) != len(valores):
+        return None
+    return vinculos
+
+
+def _como(original: str, texto: str) -> str:
+    if original.isupper():
+        return texto.upper()
+    if original.istitle():
+        return texto.title()
+    return texto
+
+
+def fill_template(parametros: Dict[str, Any], vinculos: Dict[str, Tuple[int, str]],
+                  valores: List[Tuple[str, Any]]) -> Dict[str, Any]:
+    """Parámetros de la plantilla para los valores de otra pregunta con la misma forma"""
+    nuevos = dict(parametros)
+    for nombre, (indice, modo) in vinculos.items():
+        dato = valores[indice][1]
+        if modo == 'entero':
+            nuevos[nombre] = int(dato) if dato == int(dato) else dato
+        elif modo == 'decimal':
+            nuevos[nombre] = float(dato)
+        elif modo == 'ciudad':
+            nuevos[nombre] = _como(parametros[nombre], CIUDADES[dato])
+        else:
+            nuevos[nombre] = _como(parametros[nombre], dato)
+    return nuevos
@@ -3,43 +3,75 @@ Integración de LangChain con Neo4j para consultas en lenguaje natural
 Usa Ollama (LLM local) optimizado
 """
 
+import hashlib
 import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 from langchain_community.graphs import Neo4jGraph
 from langchain_community.chains.graph_qa.cypher import GraphCypherQAChain
 from langchain_core.prompts import PromptTemplate
-from langchain_ollama import OllamaLLM
+from workflow.answer_renderer import renderizar_respuesta
+from workflow.llm_backends import create_llm
+from workflow.cypher_templates import bind_template, fill_template, parameterize_cypher, question_shape
+from workflow.query_parser import normalizar_texto
 
 load_dotenv()
 
 # Variable global para controlar qué LLM usar
 LANGCHAIN_DISPONIBLE = True
 
-def create_housing_qa():
+# Caché del Cypher generado por el LLM
+CYPHER_CACHE_TTL = 3600.0
+CYPHER_CACHE_MAX_ENTRIES = 256
+
+# Un Cypher que escribe en la base nunca se reutiliza desde el caché
+WRITE_CLAUSES = re.compile(r'\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|LOAD\s+CSV)\b', re.IGNORECASE)
+
+class ParameterizedNeo4jGraph(Neo4jGraph):
+    """
+    Neo4jGraph que ejecuta el Cypher generado con sus literales como parámetros,
+    así las variantes de una misma consulta reutilizan el plan cacheado de Neo4j
+    """
+
+    def query(self, query: str, params: dict = {}) -> List[Dict[str, Any]]:
+        if not params:
+            query, params = parameterize_cypher(query)
+        return super().query(query, params)
+
+
+def create_housing_qa(llm=None, graph=None):
     """
     Crea un sistema de Q&A que usa Ollama (local) + Neo4j
     
+    Args:
+        llm: LLM de LangChain a usar (por defecto el backend de LLM_BACKEND, ver llm_backends)
+        graph: Grafo a consultar (por defecto ParameterizedNeo4jGraph con las variables NEO4J_*)
+    
     Returns:
         tuple: (chain, graph) - Cadena de preguntas y conexión a Neo4j
+    
+    Construirla reconecta Neo4jGraph e introspecta el esquema: para responder
+    preguntas usar get_qa_service(), que la crea una sola vez y la reutiliza.
     """
     
     # 1. Conectar a Neo4j
-    print("🔗 Conectando a Neo4j...")
-    graph = Neo4jGraph(
-        url=os.getenv("NEO4J_URI", "bolt://localhost:7687"),
-        username=os.getenv("NEO4J_USER", "neo4j"),
-        password=os.getenv("NEO4J_PASSWORD"),
-        database=os.getenv("NEO4J_DATABASE", "neo4j")
-    )
+    if graph is None:
+        print("🔗 Conectando a Neo4j...")
+        graph = ParameterizedNeo4jGraph(
+            url=os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+            username=os.getenv("NEO4J_USER", "neo4j"),
+            password=os.getenv("NEO4J_PASSWORD"),
+            database=os.getenv("NEO4J_DATABASE", "neo4j")
+        )
     
-    # 2. Configurar LLM con Ollama (LOCAL pero con timeouts más largos)
-    print("🤖 Configurando Ollama...")
-    llm = OllamaLLM(
-        model="mistral",
-        temperature=0.1,
-        base_url="http://localhost:11434",
-        timeout=120  # 2 minutos de timeout para consultas complejas
-    )
+    # 2. Configurar LLM (Ollama por defecto, con timeouts más largos)
+    if llm is None:
+        print("🤖 Configurando LLM...")
+        llm = create_llm()
     
     # 3. Template para generar consultas Cypher - MEJORADO CON ENFOQUE EN FILTROS DE PRECIO
     cypher_prompt = PromptTemplate(
@@ -66,16 +98,17 @@ Rules:
 7. Always end with: RETURN p.name, p.price, p.rooms, a.city, a.neighborhood ORDER BY p.price LIMIT 10
 8. DO NOT wrap query in quotes
 9. ALWAYS apply price filters strictly when mentioned
+10. ALWAYS include: WHERE coalesce(p.active, true) (withdrawn listings are inactive)
 
 Examples:
 Houses in Godoy Cruz under 550000 with 2 rooms:
-MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address) WHERE toLower(a.city) CONTAINS "godoy cruz" AND p.rooms >= 2 AND p.price < 550000 RETURN p.name, p.price, p.rooms, a.city, a.neighborhood ORDER BY p.price LIMIT 10
+MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address) WHERE coalesce(p.active, true) AND toLower(a.city) CONTAINS "godoy cruz" AND p.rooms >= 2 AND p.price < 550000 RETURN p.name, p.price, p.rooms, a.city, a.neighborhood ORDER BY p.price LIMIT 10
 
 Properties under 300000:
-MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address) WHERE p.price < 300000 RETURN p.name, p.price, p.rooms, a.city, a.neighborhood ORDER BY p.price LIMIT 10
+MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address) WHERE coalesce(p.active, true) AND p.price < 300000 RETURN p.name, p.price, p.rooms, a.city, a.neighborhood ORDER BY p.price LIMIT 10
 
 2 rooms in any city under 500000:
-MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address) WHERE p.rooms >= 2 AND p.price < 500000 RETURN p.name, p.price, p.rooms, a.city, a.neighborhood ORDER BY p.price LIMIT 10
+MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address) WHERE coalesce(p.active, true) AND p.rooms >= 2 AND p.price < 500000 RETURN p.name, p.price, p.rooms, a.city, a.neighborhood ORDER BY p.price LIMIT 10
 
 Cypher query:"""
     )
@@ -151,32 +184,173 @@ def clean_cypher_query(raw_cypher: str) -> str:
     return cypher
 
 
-def ask_question(question: str):
+def normalize_question(question: str) -> str:
+    """
+    Clave de caché de una pregunta: minúsculas, sin acentos ni signos y con
+    los números normalizados ("$550.000", "550 mil" y "550k" → 550000)
+    """
+    return normalizar_texto(question)
+
+
+class CypherCache:
+    """
+    Caché del Cypher limpio (clean_cypher_query) que generó el LLM para cada pregunta
+
+    El Cypher se guarda como plantilla parametrizada (parameterize_cypher). Además
+    de la pregunta exacta se guarda su forma ("casas en <ciudad> hasta <n>")
+    cuando cada valor de la pregunta corresponde a un parámetro: otra pregunta
+    con la misma forma y otros valores reutiliza la plantilla con sus valores.
+
+    Las entradas vencen a los `ttl` segundos y, al superar `max_entries`, se
+    descartan las menos usadas (LRU). Cada consulta al caché recibe el esquema
+    actual del grafo: si cambió, todo el Cypher guardado se descarta.
+    """
+
+    def __init__(self, ttl: float = CYPHER_CACHE_TTL, max_entries: int = CYPHER_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            ttl: Segundos de validez de un Cypher cacheado
+            max_entries: Entradas máximas antes de descartar las menos usadas
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.template_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._schema_hash: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _check_schema(self, schema: str):
+        schema_hash = hashlib.sha1(schema.encode('utf-8')).hexdigest()
+        if schema_hash != self._schema_hash:
+            self._entries.clear()
+            self._schema_hash = schema_hash
+
+    def _lookup(self, key: str) -> Optional[tuple]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[-1] > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, entry: tuple):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, question: str, schema: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Devuelve el Cypher cacheado para la pregunta
+
+        Returns:
+            (plantilla, parámetros) de la pregunta exacta o de otra con la misma
+            forma, o None si no hay uno vigente
+        """
+        key = "question:" + normalize_question(question)
+        shape, values = question_shape(question)
+        with self._lock:
+            self._check_schema(schema)
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[0], dict(entry[1])
+            entry = self._lookup("shape:" + shape) if values else None
+            if entry is not None:
+                self.template_hits += 1
+                template, params, bindings, _ = entry
+                return template, fill_template(params, bindings, values)
+            self.misses += 1
+            return None
+
+    def put(self, question: str, schema: str, cypher: str) -> bool:
+        """Guarda el Cypher de una pregunta; los vacíos o que escriben en la base se ignoran"""
+        if not cypher or WRITE_CLAUSES.search(cypher):
+            return False
+        template, params = parameterize_cypher(cypher)
+        shape, values = question_shape(question)
+        bindings = bind_template(params, values) if values else None
+        now = time.monotonic()
+        with self._lock:
+            self._check_schema(schema)
+            self._store("question:" + normalize_question(question), (template, params, now))
+            if bindings is not None:
+                self._store("shape:" + shape, (template, params, bindings, now))
+        return True
+
+    def discard(self, question: str):
+        """Quita las entradas de una pregunta (por ejemplo si su Cypher dejó de funcionar)"""
+        with self._lock:
+            self._entries.pop("question:" + normalize_question(question), None)
+            self._entries.pop("shape:" + question_shape(question)[0], None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+_cypher_cache: Optional[CypherCache] = None
+_cypher_cache_lock = threading.Lock()
+
+
+def get_cypher_cache() -> CypherCache:
+    """Devuelve el caché de Cypher compartido del proceso"""
+    global _cypher_cache
+    with _cypher_cache_lock:
+        if _cypher_cache is None:
+            _cypher_cache = CypherCache()
+        return _cypher_cache
+
+
+def ask_question(question: str, connector=None):
     """
     Hace una pregunta al sistema con limpieza automática de Cypher
     
     Args:
         question (str): Pregunta en lenguaje natural
+        connector: Neo4jConnector para las búsquedas estructuradas (por defecto el compartido)
         
     Returns:
-        dict: Respuesta con resultado y pasos intermedios
+        dict: Respuesta con resultado y pasos intermedios; "timings" tiene los
+        milisegundos de cada etapa de stream_question y el "total"
     """
-    chain, graph = create_housing_qa()
+    result = {"success": True, "question": question}
+    timings: Dict[str, float] = {}
     
     try:
-        result = chain.invoke({"query": question})
-        
-        # Extraer Cypher generado
-        raw_cypher = result.get("intermediate_steps", [{}])[0].get("query", "") if result.get("intermediate_steps") else ""
-        cleaned_cypher = clean_cypher_query(raw_cypher)
+        start = last = time.perf_counter()
+        for event in stream_question(question, connector):
+            stage = event["stage"]
+            # Los fragmentos del LLM cuentan como parte de la etapa "answer"
+            if stage == "token":
+                continue
+            now = time.perf_counter()
+            timings[stage] = timings.get(stage, 0.0) + (now - last) * 1000
+            last = now
+            
+            if stage == "intent":
+                result["cached"] = event["source"] == "cache"
+            elif stage == "cypher":
+                result["cypher"] = event["cypher"]
+                result["parameters"] = event["parameters"]
+                if "raw_cypher" in event:
+                    result["raw_cypher"] = event["raw_cypher"]  # Para debugging
+                    result["cached"] = False
+            elif stage == "answer":
+                result["answer"] = event["answer"]
+                result["llm_answer"] = event["llm_answer"]
         
-        return {
-            "success": True,
-            "question": question,
-            "answer": result.get("result", "No se encontró respuesta"),
-            "cypher": cleaned_cypher,
-            "raw_cypher": raw_cypher  # Para debugging
-        }
+        timings["total"] = (time.perf_counter() - start) * 1000
+        result["timings"] = timings
+        return result
     except Exception as e:
         error_msg = str(e)
         
@@ -184,18 +358,18 @@ def ask_question(question: str):
         if "SyntaxError" in error_msg or "Invalid input" in error_msg:
             try:
                 # Fallback: hacer consulta directa a Neo4j
-                from database.neo4j_connector import Neo4jConnector
-                connector = Neo4jConnector()
+                if connector is None:
+                    from database.neo4j_connector import get_connector
+                    connector = get_connector()
                 
                 # Detectar tipo de consulta y generar Cypher manualmente
                 question_lower = question.lower()
                 
                 if "cuántas" in question_lower or "total" in question_lower:
-                    cypher = "MATCH (p:Property) RETURN count(p) as total"
+                    cypher = "MATCH (p:Property) WHERE coalesce(p.active, true) RETURN count(p) as total"
                     with connector.get_session() as session:
                         result = session.run(cypher)
                         total = result.single()['total']
-                    connector.close()
                     return {
                         "success": True,
                         "question": question,
@@ -209,11 +383,10 @@ def ask_question(question: str):
                     numeros = re.findall(r'\d+', question)
                     if numeros:
                         num_rooms = int(numeros[0])
-                        cypher = f"MATCH (p:Property) WHERE p.rooms = {num_rooms} RETURN p.name, p.price, p.rooms, p.location LIMIT 10"
+                        cypher = f"MATCH (p:Property) WHERE coalesce(p.active, true) AND p.rooms = {num_rooms} RETURN p.name, p.price, p.rooms, p.location LIMIT 10"
                         with connector.get_session() as session:
                             result = session.run(cypher)
                             props = [dict(r) for r in result]
-                        connector.close()
                         
                         if props:
                             respuesta = f"Encontré {len(props)} propiedades con {num_rooms} habitaciones:\n\n"
@@ -237,7 +410,6 @@ def ask_question(question: str):
                                 "cypher": cypher
                             }
                 
-                connector.close()
             except Exception as fallback_error:
                 pass
         
@@ -248,6 +420,120 @@ def ask_question(question: str):
         }
 
 
+def stream_question(question: str, connector=None) -> Iterator[Dict[str, Any]]:
+    """
+    Responde una pregunta por etapas, entregando cada una apenas está lista
+    
+    Args:
+        question (str): Pregunta en lenguaje natural
+        connector: Neo4jConnector para las búsquedas estructuradas (por defecto el compartido)
+        
+    Yields:
+        dict: Eventos con clave "stage":
+            - "intent": cómo se va a resolver ("parser", "cache" o "llm")
+            - "cypher": Cypher a ejecutar con sus "parameters" (y "raw_cypher" si lo generó el LLM)
+            - "rows": filas devueltas por Neo4j
+            - "token": fragmento de la respuesta que va escribiendo el LLM
+            - "answer": respuesta completa (último evento)
+    """
+    from workflow.query_parser import responder_consulta_rapida
+    rapida = responder_consulta_rapida(question, connector)
+    if rapida is not None:
+        consulta = rapida["consulta"]
+        yield {"stage": "intent", "source": "parser", "intent": consulta.intencion, "filters": consulta.filtros()}
+        yield {"stage": "cypher", "cypher": rapida["cypher"], "parameters": rapida["parametros"]}
+        yield {"stage": "rows", "rows": rapida["resultados"]}
+        yield {"stage": "answer", "answer": rapida["respuesta"], "llm_answer": False}
+        return
+    
+    from workflow.qa_service import get_qa_service
+    service = get_qa_service()
+    cache = get_cypher_cache()
+    
+    # Pregunta repetida (o con la misma forma y otros valores): reutilizar el Cypher sin llamar al LLM
+    cached = cache.get(question, service.schema())
+    yield {"stage": "intent", "source": "cache" if cached else "llm"}
+    rows = None
+    if cached is not None:
+        template, params = cached
+        yield {"stage": "cypher", "cypher": template, "parameters": params}
+        try:
+            rows = service.query(template, params)
+        except Exception:
+            cache.discard(question)
+    
+    if rows is None:
+        raw_cypher = service.generate_cypher(question)
+        cleaned_cypher = clean_cypher_query(raw_cypher)
+        template, params = parameterize_cypher(cleaned_cypher)
+        yield {"stage": "cypher", "cypher": template, "parameters": params, "raw_cypher": raw_cypher}
+        rows = service.query(template, params)
+        cache.put(question, service.schema(), cleaned_cypher)
+    yield {"stage": "rows", "rows": rows}
+    
+    # Listados y conteos se arman desde las filas; el LLM solo redacta preguntas abiertas
+    answer = renderizar_respuesta(question, rows)
+    if answer is not None:
+        yield {"stage": "answer", "answer": answer, "llm_answer": False}
+        return
+    
+    chunks = []
+    for chunk in service.stream_answer(question, rows):
+        chunks.append(chunk)
+        yield {"stage": "token", "text": chunk}
+    yield {"stage": "answer", "answer": "".join(chunks).strip() or "No se encontró respuesta", "llm_answer": True}
+
+
+def rows_table(rows: List[Dict[str, Any]], limit: int = 5) -> str:
+    """Tabla Markdown con las primeras filas de un resultado"""
+    if not rows:
+        return "_Sin resultados_"
+    columns = list(rows[0].keys())
+    lines = ["| " + " | ".join(c.split('.')[-1] for c in columns) + " |",
+             "|" + "---|" * len(columns)]
+    for row in rows[:limit]:
+        lines.append("| " + " | ".join(str(row.get(c, "")) for c in columns) + " |")
+    if len(rows) > limit:
+        lines.append(f"\n_... y {len(rows) - limit} filas más_")
+    return "\n".join(lines)
+
+
+def stream_answer_markdown(question: str) -> Iterator[Tuple[str, str]]:
+    """
+    Versión de stream_question para la UI: (respuesta, explicación) en Markdown,
+    actualizadas con cada etapa
+    """
+    sources = {
+        "parser": "⚡ Búsqueda estructurada, resuelta sin LLM",
+        "cache": "♻️ Pregunta ya conocida, Cypher desde el caché",
+        "llm": "🤖 Consulta libre, el LLM genera el Cypher",
+    }
+    details = []
+    answer = ""
+    written = ""
+    for event in stream_question(question):
+        stage = event["stage"]
+        if stage == "intent":
+            details.append(f"**Intención:** {sources[event['source']]}")
+            if event.get("filters"):
+                details.append("**Filtros:** " + ", ".join(f"{k}={v}" for k, v in event["filters"].items()))
+            answer = "⏳ Generando la consulta Cypher..." if event["source"] == "llm" else "⏳ Consultando Neo4j..."
+        elif stage == "cypher":
+            details.append(f"**Cypher:**\n```cypher\n{event['cypher']}\n```")
+            if event["parameters"]:
+                details.append(f"**Parámetros:** `{event['parameters']}`")
+            answer = "⏳ Consultando Neo4j..."
+        elif stage == "rows":
+            details.append(f"**Filas devueltas:** {len(event['rows'])}")
+            answer = f"📊 **Primeros resultados:**\n\n{rows_table(event['rows'])}\n\n⏳ Redactando respuesta..."
+        elif stage == "token":
+            written += event["text"]
+            answer = written + " ▌"
+        elif stage == "answer":
+            answer = event["answer"]
+        yield answer, "\n\n".join(details)
+
+
 # === EJEMPLOS DE USO ===
 if __name__ == "__main__":
     print("=" * 60)
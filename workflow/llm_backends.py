@@ -0,0 +1,142 @@
+"""
+Backends de LLM para la cadena de Q&A - Sistema de Recomendación de Viviendas
+Permite cambiar el modelo que usa create_housing_qa() sin tocar la cadena.
+
+Un backend es cualquier LLM de LangChain (invoke + stream): GraphCypherQAChain
+lo usa para generar el Cypher y para redactar la respuesta. Se elige con la
+variable LLM_BACKEND:
+
+- "ollama" (por defecto): OllamaLLM local en OLLAMA_BASE_URL
+- "local": LocalCypherLLM, un reemplazo determinístico que no necesita Ollama.
+  Genera el Cypher con el parser de consultas (o desde un guion
+  pregunta → Cypher) y agrega una latencia artificial configurable, para
+  probar y medir la cadena sin que pese la velocidad del modelo.
+
+Otros backends se agregan con register_llm_backend(nombre, fábrica).
+"""
+
+import json
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+from langchain_ollama import OllamaLLM
+from workflow.query_parser import compilar_cypher, normalizar_texto, parsear_consulta
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+
+# Cypher del backend local cuando la pregunta no está en el guion ni la reconoce el parser
+CYPHER_POR_DEFECTO = ("MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address) WHERE coalesce(p.active, true) "
+                      "RETURN p.name, p.price, p.rooms, a.city, a.neighborhood ORDER BY p.price LIMIT 10")
+
+
+def _literal(valor: Any) -> str:
+    if isinstance(valor, str):
+        return json.dumps(valor, ensure_ascii=False)
+    if isinstance(valor, float) and valor == int(valor):
+        return str(int(valor))
+    return str(valor)
+
+
+class LocalCypherLLM(LLM):
+    """
+    LLM determinístico para pruebas y benchmarks de la cadena de Q&A
+
+    - Prompt de generación de Cypher: devuelve el Cypher del guion para la
+      pregunta, o el que arma el parser de consultas (con los valores escritos
+      como literales, igual que un modelo), o CYPHER_POR_DEFECTO
+    - Prompt de respuesta: una oración fija sobre la pregunta
+    - Cada llamada espera `latency` segundos y, al transmitir, `token_latency`
+      segundos por palabra
+    """
+
+    latency: float = 0.0
+    token_latency: float = 0.0
+    script: Dict[str, str] = {}
+
+    @property
+    def _llm_type(self) -> str:
+        return "local-cypher"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"latency": self.latency, "token_latency": self.token_latency}
+
+    def generate_cypher(self, question: str) -> str:
+        """Cypher que devuelve el backend para una pregunta"""
+        guion = {normalizar_texto(p): cypher for p, cypher in self.script.items()}
+        if normalizar_texto(question) in guion:
+            return guion[normalizar_texto(question)]
+        consulta = parsear_consulta(question)
+        if consulta is None:
+            return CYPHER_POR_DEFECTO
+        cypher, parametros = compilar_cypher(consulta)
+        for nombre in sorted(parametros, key=len, reverse=True):
+            cypher = cypher.replace('$' + nombre, _literal(parametros[nombre]))
+        return cypher
+
+    def respond(self, prompt: str) -> str:
+        """Respuesta completa al prompt (sin latencia)"""
+        preguntas = re.findall(r'Question:\s*(.+)', prompt)
+        pregunta = preguntas[-1].strip() if preguntas else prompt.strip()
+        if "Helpful Answer:" in prompt:
+            return f"Según los datos de la base, esta es la información disponible sobre: {pregunta}"
+        return self.generate_cypher(pregunta)
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None,
+              run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> str:
+        time.sleep(self.latency)
+        return self.respond(prompt)
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        time.sleep(self.latency)
+        for token in re.findall(r'\S+\s*', self.respond(prompt)):
+            time.sleep(self.token_latency)
+            chunk = GenerationChunk(text=token)
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+def crear_ollama() -> LLM:
+    return OllamaLLM(
+        model=os.getenv("OLLAMA_MODEL", "mistral"),
+        temperature=0.1,
+        base_url=OLLAMA_BASE_URL,
+        timeout=120  # 2 minutos de timeout para consultas complejas
+    )
+
+
+def crear_local() -> LLM:
+    return LocalCypherLLM(
+        latency=float(os.getenv("LOCAL_LLM_LATENCY", "0")),
+        token_latency=float(os.getenv("LOCAL_LLM_TOKEN_LATENCY", "0")),
+    )
+
+
+LLM_BACKENDS: Dict[str, Callable[[], LLM]] = {
+    "ollama": crear_ollama,
+    "local": crear_local,
+}
+
+
+def register_llm_backend(name: str, factory: Callable[[], LLM]):
+    """Registra un backend: `factory` devuelve un LLM de LangChain"""
+    LLM_BACKENDS[name] = factory
+
+
+def create_llm(backend: Optional[str] = None) -> LLM:
+    """
+    Crea el LLM del backend pedido (por defecto el de LLM_BACKEND, u "ollama")
+
+    Raises:
+        ValueError: Si el backend no está registrado
+    """
+    backend = backend or os.getenv("LLM_BACKEND", "ollama")
+    if backend not in LLM_BACKENDS:
+        raise ValueError(f"Backend de LLM desconocido: {backend} (disponibles: {', '.join(LLM_BACKENDS)})")
+    return LLM_BACKENDS[backend]()
@@ -0,0 +1,230 @@
+"""
+Servicio de Q&A - Sistema de Recomendación de Viviendas
+Mantiene viva la cadena LangChain (Neo4jGraph + OllamaLLM + GraphCypherQAChain).
+
+create_housing_qa() reconecta Neo4j, introspecta el esquema y recrea el
+cliente de Ollama: hacerlo en cada pregunta suma segundos antes de llamar al
+LLM. Este servicio la construye la primera vez que se usa y la comparte entre
+todos los pedidos de la UI (la cadena no guarda estado por pregunta, así que
+se puede invocar desde varios hilos a la vez):
+
+- el esquema del grafo se vuelve a leer cada `schema_refresh_interval` segundos
+- health_check() verifica Neo4j y Ollama (resultado cacheado unos segundos)
+- si una pregunta falla por un error de conexión, la cadena se descarta y se
+  reconstruye en el próximo pedido
+- generate_cypher() / query() / stream_answer() ejecutan las etapas de la
+  cadena por separado, para mostrar cada una en la UI apenas está lista
+
+Uso:
+    result = get_qa_service().invoke({"query": pregunta})
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import httpx
+import requests
+from neo4j.exceptions import ServiceUnavailable, SessionExpired
+from langchain_community.chains.graph_qa.cypher import construct_schema, extract_cypher
+from database.neo4j_connector import register_shutdown_hook
+from workflow.langchain_integration import create_housing_qa
+from workflow.llm_backends import OLLAMA_BASE_URL
+
+# Segundos entre relecturas del esquema del grafo
+SCHEMA_REFRESH_INTERVAL = 600.0
+
+# Segundos que se reutiliza el último health check
+HEALTH_CHECK_INTERVAL = 30.0
+
+# Errores que indican que el driver de Neo4j o el cliente de Ollama quedaron inservibles
+CONNECTION_ERRORS = (ServiceUnavailable, SessionExpired, httpx.TransportError, ConnectionError)
+
+
+class HousingQAService:
+    """Cadena de Q&A construida una vez, con refresco de esquema y health checks"""
+
+    def __init__(self, factory: Callable[[], Tuple[Any, Any]] = create_housing_qa,
+                 schema_refresh_interval: float = SCHEMA_REFRESH_INTERVAL,
+                 health_check_interval: float = HEALTH_CHECK_INTERVAL,
+                 ollama_url: str = OLLAMA_BASE_URL):
+        """
+        Args:
+            factory: Construye (chain, graph); por defecto create_housing_qa
+            schema_refresh_interval: Segundos entre relecturas del esquema
+            health_check_interval: Segundos de validez del último health check
+            ollama_url: URL base del servidor de Ollama
+        """
+        self.factory = factory
+        self.schema_refresh_interval = schema_refresh_interval
+        self.health_check_interval = health_check_interval
+        self.ollama_url = ollama_url
+        self._chain = None
+        self._graph = None
+        self._schema_refreshed_at: Optional[float] = None
+        self._health: Dict[str, bool] = {}
+        self._health_checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def is_ready(self) -> bool:
+        """Indica si la cadena ya está construida"""
+        return self._chain is not None
+
+    def get_chain(self):
+        """Devuelve la cadena compartida, construyéndola la primera vez"""
+        return self._chain_and_graph()[0]
+
+    def _chain_and_graph(self) -> Tuple[Any, Any]:
+        """(cadena, grafo) compartidos, construidos la primera vez"""
+        # Se leen juntos, con su marca de refresco: reset() puede vaciarlos desde otro hilo
+        with self._lock:
+            if self._chain is None:
+                self._chain, self._graph = self.factory()
+                self._schema_refreshed_at = time.monotonic()
+            chain, graph = self._chain, self._graph
+            vencido = time.monotonic() - self._schema_refreshed_at >= self.schema_refresh_interval
+        if vencido:
+            self.refresh_schema()
+        return chain, graph
+
+    def refresh_schema(self) -> bool:
+        """Vuelve a leer el esquema del grafo y lo pasa a la cadena"""
+        with self._lock:
+            if self._graph is None:
+                return False
+            # Aunque falle, no reintentar en cada pregunta
+            self._schema_refreshed_at = time.monotonic()
+            try:
+                self._graph.refresh_schema()
+                base_chain = getattr(self._chain, "base_chain", self._chain)
+                if hasattr(base_chain, "graph_schema"):
+                    base_chain.graph_schema = construct_schema(self._graph.get_structured_schema, [], [])
+                return True
+            except Exception as e:
+                print(f"⚠️ No se pudo actualizar el esquema del grafo: {e}")
+                return False
+
+    def invoke(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Ejecuta una pregunta en la cadena compartida
+
+        Raises:
+            Las excepciones de la cadena; ante errores de conexión además se
+            descarta la cadena para reconstruirla en el próximo pedido
+        """
+        chain = self.get_chain()
+        try:
+            return chain.invoke(inputs)
+        except CONNECTION_ERRORS:
+            self.reset()
+            raise
+
+    def schema(self) -> str:
+        """Esquema del grafo con el que la cadena genera el Cypher"""
+        chain = self.get_chain()
+        return getattr(getattr(chain, "base_chain", chain), "graph_schema", "")
+
+    def query(self, cypher: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Ejecuta un Cypher directamente sobre el grafo de la cadena (sin LLM)"""
+        graph = self._chain_and_graph()[1]
+        try:
+            return graph.query(cypher, params or {})
+        except CONNECTION_ERRORS:
+            self.reset()
+            raise
+
+    def generate_cypher(self, question: str) -> str:
+        """Primera etapa de la cadena: el Cypher que genera el LLM para la pregunta"""
+        base_chain = self.get_chain().base_chain
+        generation = base_chain.cypher_generation_chain
+        try:
+            result = generation.invoke({"question": question, "schema": base_chain.graph_schema})
+        except CONNECTION_ERRORS:
+            self.reset()
+            raise
+        return extract_cypher(result[generation.output_key])
+
+    def stream_answer(self, question: str, rows: List[Dict[str, Any]]) -> Iterator[str]:
+        """
+        Última etapa de la cadena: la respuesta del LLM a partir de las filas,
+        fragmento por fragmento a medida que Ollama la genera
+        """
+        base_chain = self.get_chain().base_chain
+        qa_chain = base_chain.qa_chain
+        prompt = qa_chain.prompt.format(question=question, context=rows[:base_chain.top_k])
+        try:
+            for chunk in qa_chain.llm.stream(prompt):
+                yield chunk
+        except CONNECTION_ERRORS:
+            self.reset()
+            raise
+
+    def health_check(self, force: bool = False) -> Dict[str, bool]:
+        """
+        Verifica que Neo4j (a través del grafo de la cadena) y Ollama respondan
+
+        Returns:
+            Dict {'neo4j': bool, 'ollama': bool}
+        """
+        if not force and self._health_checked_at is not None and \
+                time.monotonic() - self._health_checked_at < self.health_check_interval:
+            return dict(self._health)
+
+        health = {"neo4j": False, "ollama": False}
+        try:
+            self._chain_and_graph()[1].query("RETURN 1")
+            health["neo4j"] = True
+        except Exception:
+            pass
+        try:
+            health["ollama"] = requests.get(f"{self.ollama_url}/api/tags", timeout=2).ok
+        except requests.RequestException:
+            pass
+
+        if not health["neo4j"] and self.is_ready():
+            self.reset()
+        self._health = health
+        self._health_checked_at = time.monotonic()
+        return dict(health)
+
+    def reset(self):
+        """Descarta la cadena (y cierra el driver de su grafo); se reconstruye al próximo uso"""
+        with self._lock:
+            graph, self._chain, self._graph = self._graph, None, None
+            self._schema_refreshed_at = None
+        driver = getattr(graph, "_driver", None)
+        if driver is not None:
+            try:
+                driver.close()
+            except Exception:
+                pass
+
+
+_qa_service: Optional[HousingQAService] = None
+_service_lock = threading.Lock()
+
+
+def get_qa_service() -> HousingQAService:
+    """Devuelve el servicio de Q&A compartido del proceso"""
+    global _qa_service
+    with _service_lock:
+        if _qa_service is None:
+            _qa_service = HousingQAService()
+            register_shutdown_hook(_qa_service.reset)
+        return _qa_service
+
+
+def set_qa_service(service: HousingQAService) -> Optional[HousingQAService]:
+    """
+    Reemplaza el servicio compartido (por ejemplo con otro backend de LLM o
+    grafo, ver benchmark_qa.py) y descarta la cadena del anterior
+
+    Returns:
+        El servicio que estaba en uso, o None si todavía no se había creado
+    """
+    global _qa_service
+    with _service_lock:
+        previous, _qa_service = _qa_service, service
+        register_shutdown_hook(service.reset)
+    if previous is not None:
+        previous.reset()
+    return previous
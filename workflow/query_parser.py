@@ -0,0 +1,361 @@
+"""
+Parser determinístico de consultas (camino rápido sin LLM)
+Reconoce las consultas de búsqueda habituales ("departamentos en Godoy Cruz por
+menos de 600000", "propiedades con 3 habitaciones", "¿cuántas propiedades hay?")
+y las compila a Cypher parametrizado con la misma forma que genera el prompt de
+create_housing_qa, sin pasar por Ollama.
+
+El parser es conservador: extrae los slots que conoce (ciudad, barrio, tipo,
+ambientes/dormitorios, rango de precio, orden y límite) y si queda alguna palabra
+que no sabe interpretar devuelve None, así la consulta sigue por el LLM. Los
+pedidos de recomendación ("recomendame casas en Maipú") también devuelven None:
+los resuelve el flujo de recomendación, que puntúa para el usuario.
+
+Uso:
+    resultado = responder_consulta_rapida("casas en Maipú hasta 400 mil")
+    if resultado is None:
+        resultado = ejecutar_consulta(pregunta)   # LLM
+"""
+
+import re
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# Alias → valor de Address.city tal como se carga desde el CSV (minúsculas, sin acentos)
+CIUDADES = {
+    'ciudad de mendoza': 'capital', 'mendoza capital': 'capital', 'capital': 'capital',
+    'godoy cruz': 'godoy cruz',
+    'guaymallen': 'guaymallen',
+    'lujan de cuyo': 'lujan de cuyo', 'lujan': 'lujan de cuyo',
+    'maipu': 'maipu',
+    'las heras': 'las heras',
+    'san martin': 'san martin',
+    'san rafael': 'san rafael',
+    'tupungato': 'tupungato',
+    'tunuyan': 'tunuyan',
+    'lavalle': 'lavalle',
+    'rivadavia': 'rivadavia',
+    'la paz': 'la paz',
+    'junin': 'junin',
+    'santa rosa': 'santa rosa',
+}
+
+# Distritos/barrios frecuentes en las publicaciones (se filtran por Address.neighborhood)
+BARRIOS = (
+    'chacras de coria', 'villa nueva', 'quinta seccion', 'cuarta seccion', 'sexta seccion',
+    'quinta', 'dorrego', 'san jose', 'rodeo de la cruz', 'san francisco del monte', 'el challao',
+    'luzuriaga', 'vistalba', 'carrodilla', 'barrio civico', 'jesus nazareno', 'general gutierrez',
+    'los corralitos', 'coquimbito', 'mayor drummond', 'las canas', 'villa marini', 'russell',
+    'rodeo del medio', 'perdriel', 'palmares', 'bombal', 'villa hipodromo',
+)
+
+# Palabra de la consulta → tipo de propiedad (p.property_type o segmento de la URL)
+TIPOS = {
+    'casa': 'casa', 'casas': 'casa',
+    'departamento': 'departamento', 'departamentos': 'departamento', 'depto': 'departamento',
+    'deptos': 'departamento', 'dpto': 'departamento', 'dptos': 'departamento',
+    'duplex': 'duplex', 'loft': 'loft', 'lofts': 'loft',
+    'oficina': 'oficina', 'oficinas': 'oficina', 'local': 'local', 'locales': 'local',
+}
+
+NUMEROS_TEXTO = {'un': 1, 'una': 1, 'uno': 1, 'dos': 2, 'tres': 3, 'cuatro': 4, 'cinco': 5, 'seis': 6}
+
+# Palabras que no cambian el significado de una búsqueda
+RELLENO = {
+    'busca', 'buscar', 'busco', 'buscame', 'quiero', 'queria', 'necesito', 'mostrame', 'muestrame',
+    'muestra', 'mostrar', 'lista', 'listar', 'dame', 'ver', 'hay', 'tenes', 'tienen', 'tiene',
+    'existen', 'algo', 'alguna', 'algun',
+    'propiedades', 'propiedad', 'inmuebles', 'inmueble', 'opciones', 'viviendas', 'vivienda',
+    'alquiler', 'alquileres', 'alquilar', 'disponibles', 'disponible', 'en', 'de', 'del', 'la', 'las',
+    'el', 'los', 'un', 'una', 'unos', 'unas', 'con', 'por', 'para', 'que', 'y', 'a', 'me', 'mi', 'se',
+    'zona', 'mendoza', 'total', 'en total', 'hola', 'porfa', 'favor', 'gracias', 'o', 'al', 'cual', 'cuales',
+}
+
+# Pedidos de recomendación o con preferencias personales: van al flujo de recomendación
+# (puntaje difuso por usuario y preferencias guardadas), nunca al parser
+RECOMENDACION = re.compile(r'\b(recomend\w*|recomiend\w*|suger\w*|sugier\w*|aconsej\w*|'
+                           r'me gusta\w*|mi presupuesto|mi perfil|mejor opcion)\b')
+
+LIMITE_DEFECTO = 10
+LIMITE_MAXIMO = 50
+
+NUM = r'(\d+(?:\.\d+)?)'
+PALABRAS_HABITACION = r'(habitaciones|habitacion|ambientes|ambiente|cuartos|cuarto|piezas|pieza|dormitorios|dormitorio)'
+
+
+@dataclass
+class ConsultaEstructurada:
+    """Intención y slots reconocidos en una consulta"""
+    intencion: str = 'buscar'  # 'buscar' | 'contar' | 'barrios'
+    ciudad: Optional[str] = None
+    barrio: Optional[str] = None
+    tipo: Optional[str] = None
+    ambientes_min: Optional[int] = None
+    dormitorios_min: Optional[int] = None
+    precio_min: Optional[float] = None
+    precio_min_inclusivo: bool = True
+    precio_max: Optional[float] = None
+    precio_max_inclusivo: bool = True
+    orden_descendente: bool = False
+    limite: int = LIMITE_DEFECTO
+
+    def filtros(self) -> Dict[str, Any]:
+        """Slots con valor (para mostrar en la explicación)"""
+        return {nombre: valor for nombre, valor in (
+            ('ciudad', self.ciudad), ('barrio', self.barrio), ('tipo', self.tipo),
+            ('ambientes_min', self.ambientes_min), ('dormitorios_min', self.dormitorios_min),
+            ('precio_min', self.precio_min), ('precio_max', self.precio_max),
+        ) if valor is not None}
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas, sin acentos, sin signos y con los números escritos como dígitos sin separadores"""
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    texto = texto.replace('$', ' ')
+    # Separadores de miles: 1.500.000 / 180,000 → 1500000 / 180000
+    texto = re.sub(r'(?<=\d)[.,](?=\d{3}\b)', '', texto)
+    texto = re.sub(r'(?<=\d),(?=\d)', '.', texto)
+    # Multiplicadores: 600 mil, 600k, 1.5 millones
+    texto = re.sub(NUM + r'\s*(mil|k)\b', lambda m: _numero(float(m.group(1)) * 1000), texto)
+    texto = re.sub(NUM + r'\s*(millones|millon|palos)\b', lambda m: _numero(float(m.group(1)) * 1000000), texto)
+    texto = re.sub(r'[^\w.\s]', ' ', texto)
+    texto = re.sub(r'(?<!\d)\.|\.(?!\d)', ' ', texto)
+    return ' '.join(texto.split())
+
+
+def _numero(valor: float) -> str:
+    return str(int(valor)) if valor == int(valor) else str(valor)
+
+
+def _cantidad(token: str) -> int:
+    return NUMEROS_TEXTO[token] if token in NUMEROS_TEXTO else int(float(token))
+
+
+class _Texto:
+    """Texto normalizado del que se van consumiendo los fragmentos reconocidos"""
+
+    def __init__(self, texto: str):
+        self.texto = f' {texto} '
+
+    def extraer(self, patron: str) -> Optional[re.Match]:
+        coincidencia = re.search(patron, self.texto)
+        if coincidencia:
+            self.texto = self.texto[:coincidencia.start()] + ' ' + self.texto[coincidencia.end():]
+        return coincidencia
+
+    def sobrantes(self) -> List[str]:
+        restante = self.texto
+        for frase in sorted((r for r in RELLENO if ' ' in r), key=len, reverse=True):
+            restante = restante.replace(f' {frase} ', ' ')
+        return [palabra for palabra in restante.split() if palabra not in RELLENO]
+
+
+def es_recomendacion(pregunta: str) -> bool:
+    """True si la consulta pide una recomendación personalizada ("recomendame casas en Maipú")"""
+    return RECOMENDACION.search(normalizar_texto(pregunta)) is not None
+
+
+def parsear_consulta(pregunta: str) -> Optional[ConsultaEstructurada]:
+    """
+    Interpreta una consulta de búsqueda sin LLM
+
+    Returns:
+        ConsultaEstructurada, o None si la consulta tiene algo que el parser no
+        entiende o pide una recomendación
+    """
+    normalizada = normalizar_texto(pregunta)
+    if not normalizada or RECOMENDACION.search(normalizada):
+        return None
+    texto = _Texto(normalizada)
+    consulta = ConsultaEstructurada()
+    cantidad = r'(\d+|' + '|'.join(NUMEROS_TEXTO) + r')'
+
+    # Intención
+    if texto.extraer(r' (que|cuales son los|cuales) (barrios|zonas|ciudades) (tienen|con) (mas|mayor cantidad de) (propiedades|inmuebles|publicaciones|oferta) '):
+        consulta.intencion = 'barrios'
+    elif texto.extraer(r' (cuantas|cuantos|cantidad de|numero de) '):
+        consulta.intencion = 'contar'
+
+    # Ambientes / dormitorios ("al menos 2 habitaciones", "3 dormitorios")
+    while True:
+        m = texto.extraer(r' (?:(?:al menos|como minimo|minimo|mas de|de) )?' + cantidad + r' ' + PALABRAS_HABITACION + r' ')
+        if not m:
+            break
+        minimo = _cantidad(m.group(1)) + (1 if m.group(0).strip().startswith('mas de') else 0)
+        if m.group(2).startswith('dormitorio'):
+            consulta.dormitorios_min = minimo
+        else:
+            consulta.ambientes_min = minimo
+
+    # Límite ("las 5 propiedades más baratas")
+    m = texto.extraer(r' (\d{1,2}) (?=(propiedades|inmuebles|opciones|casas|departamentos|deptos|lofts|oficinas|locales|mas) )')
+    if m:
+        consulta.limite = max(1, min(int(m.group(1)), LIMITE_MAXIMO))
+
+    # Precio
+    m = texto.extraer(r' entre ' + NUM + r' y ' + NUM + r' ')
+    if m:
+        consulta.precio_min, consulta.precio_max = sorted((float(m.group(1)), float(m.group(2))))
+    patrones_precio = (
+        (r' (?:por )?(?:menos de|menor(?:es)? (?:a|que|de)|por debajo de|debajo de|inferior(?:es)? a) ' + NUM + ' ', 'max', False),
+        (r' (?:hasta|como maximo|maximo|no mas de|tope|tope de) ' + NUM + ' ', 'max', True),
+        (r' (?:mas de|mayor(?:es)? (?:a|que|de)|por encima de|superior(?:es)? a) ' + NUM + ' ', 'min', False),
+        (r' (?:desde|como minimo|minimo|a partir de) ' + NUM + ' ', 'min', True),
+    )
+    for patron, limite, inclusivo in patrones_precio:
+        m = texto.extraer(patron)
+        if m:
+            if limite == 'max':
+                consulta.precio_max, consulta.precio_max_inclusivo = float(m.group(1)), inclusivo
+            else:
+                consulta.precio_min, consulta.precio_min_inclusivo = float(m.group(1)), inclusivo
+    texto.extraer(r' (pesos|ars|por mes|mensuales|al mes) ')
+
+    # Orden
+    if texto.extraer(r' (?:mas )?(caras|caros|cara|caro) '):
+        consulta.orden_descendente = True
+    texto.extraer(r' (?:mas )?(baratas|baratos|barata|barato|economicas|economicos|economica|economico) ')
+
+    # Ubicación (alias más largos primero: "ciudad de mendoza" antes que "mendoza")
+    for alias in sorted(CIUDADES, key=len, reverse=True):
+        if texto.extraer(r' ' + alias + r' '):
+            consulta.ciudad = CIUDADES[alias]
+            break
+    texto.extraer(r' (?:el )?barrio ')
+    for barrio in sorted(BARRIOS, key=len, reverse=True):
+        if texto.extraer(r' ' + barrio + r' '):
+            consulta.barrio = barrio
+            break
+
+    # Tipo
+    for palabra in sorted(TIPOS, key=len, reverse=True):
+        if texto.extraer(r' ' + palabra + r' '):
+            consulta.tipo = TIPOS[palabra]
+            break
+
+    if texto.sobrantes():
+        return None
+    return consulta
+
+
+def compilar_cypher(consulta: ConsultaEstructurada) -> Tuple[str, Dict[str, Any]]:
+    """
+    Cypher parametrizado de una consulta estructurada
+
+    Returns:
+        (cypher, parámetros)
+    """
+    # Las publicaciones que salieron del CSV quedan inactivas (load_csv_data --incremental)
+    condiciones: List[str] = ["coalesce(p.active, true)"]
+    parametros: Dict[str, Any] = {}
+
+    if consulta.ciudad:
+        condiciones.append("toLower(a.city) CONTAINS $ciudad")
+        parametros['ciudad'] = consulta.ciudad
+    if consulta.barrio:
+        condiciones.append("toLower(a.neighborhood) CONTAINS $barrio")
+        parametros['barrio'] = consulta.barrio
+    if consulta.tipo:
+        # Las propiedades del CSV no tienen property_type: el tipo está en la URL de la publicación
+        condiciones.append("(p.property_type = $tipo OR p.url CONTAINS $tipo_url)")
+        parametros['tipo'] = consulta.tipo
+        parametros['tipo_url'] = f"-{consulta.tipo}-en-"
+    if consulta.ambientes_min is not None:
+        condiciones.append("p.rooms >= $ambientes_min")
+        parametros['ambientes_min'] = consulta.ambientes_min
+    if consulta.dormitorios_min is not None:
+        condiciones.append("p.bedrooms >= $dormitorios_min")
+        parametros['dormitorios_min'] = consulta.dormitorios_min
+    if consulta.precio_min is not None:
+        condiciones.append(f"p.price {'>=' if consulta.precio_min_inclusivo else '>'} $precio_min")
+        parametros['precio_min'] = consulta.precio_min
+    if consulta.precio_max is not None:
+        condiciones.append(f"p.price {'<=' if consulta.precio_max_inclusivo else '<'} $precio_max")
+        parametros['precio_max'] = consulta.precio_max
+
+    cypher = "MATCH (p:Property)-[:HAS_ADDRESS]->(a:Address) WHERE " + " AND ".join(condiciones)
+
+    if consulta.intencion == 'contar':
+        return cypher + " RETURN count(p) AS total", parametros
+    if consulta.intencion == 'barrios':
+        parametros['limite'] = consulta.limite
+        return cypher + (" RETURN a.neighborhood AS barrio, count(p) AS cantidad"
+                         " ORDER BY cantidad DESC LIMIT $limite"), parametros
+
+    parametros['limite'] = consulta.limite
+    orden = "DESC" if consulta.orden_descendente else ""
+    return cypher + (" RETURN p.name, p.price, p.rooms, a.city, a.neighborhood"
+                     f" ORDER BY p.price {orden}".rstrip() + " LIMIT $limite"), parametros
+
+
+def _formatear_respuesta(consulta: ConsultaEstructurada, filas: List[Dict[str, Any]]) -> str:
+    if consulta.intencion == 'contar':
+        total = filas[0]['total'] if filas else 0
+        return f"Hay {total} propiedades que cumplen con la búsqueda." if consulta.filtros() \
+            else f"Hay {total} propiedades en total."
+
+    if consulta.intencion == 'barrios':
+        if not filas:
+            return "No encontré propiedades cargadas."
+        lineas = [f"{i}. {(f['barrio'] or 'Sin barrio').title()}: {f['cantidad']} propiedades"
+                  for i, f in enumerate(filas, 1)]
+        return "Barrios con más propiedades:\n\n" + "\n".join(lineas)
+
+    if not filas:
+        return "No encontré propiedades que cumplan con todos los criterios."
+    lineas = []
+    for i, f in enumerate(filas, 1):
+        ubicacion = (f.get('a.neighborhood') or f.get('a.city') or 'N/A').title()
+        lineas.append(f"{i}. {f.get('p.name', 'Sin nombre')} - ${f.get('p.price') or 0:,.0f} - "
+                      f"{f.get('p.rooms', '?')} ambientes - {ubicacion}")
+    return f"Encontré {len(filas)} propiedades:\n\n" + "\n".join(lineas)
+
+
+def responder_consulta_rapida(pregunta: str, connector=None) -> Optional[Dict[str, Any]]:
+    """
+    Responde una consulta reconocida por el parser ejecutando su Cypher directamente
+
+    Args:
+        pregunta: Consulta en lenguaje natural
+        connector: Neo4jConnector (por defecto el compartido)
+
+    Returns:
+        Dict con respuesta, explicacion, cypher, parametros y resultados (mismas claves
+        'respuesta'/'explicacion' que ejecutar_consulta), o None si hay que usar el LLM
+    """
+    consulta = parsear_consulta(pregunta)
+    if consulta is None:
+        return None
+
+    if connector is None:
+        from database.neo4j_connector import get_connector
+        connector = get_connector()
+    if not connector.is_connected():
+        return None
+
+    cypher, parametros = compilar_cypher(consulta)
+    inicio = time.perf_counter()
+    with connector.get_session() as session:
+        filas = [dict(registro) for registro in session.run(cypher, **parametros)]
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+
+    filtros = ", ".join(f"{k}={v:g}" if isinstance(v, float) else f"{k}={v}"
+                        for k, v in consulta.filtros().items()) or "ninguno"
+    explicacion = (
+        f"⚡ **Consulta resuelta sin LLM** (parser determinístico, {duracion_ms:.0f} ms)\n\n"
+        f"**Intención:** {consulta.intencion}\n\n"
+        f"**Filtros:** {filtros}\n\n"
+        f"**Cypher:**\n```cypher\n{cypher}\n```\n"
+        f"**Parámetros:** `{parametros}`"
+    )
+    return {
+        "respuesta": _formatear_respuesta(consulta, filas),
+        "explicacion": explicacion,
+        "cypher": cypher,
+        "parametros": parametros,
+        "resultados": filas,
+        "consulta": consulta,
+    }